@@ -134,12 +134,15 @@ make -C docs %{?_smp_mflags} html
 %py3_build
 PYTHONPATH=`pwd` argparse-manpage --pyfile run/copr-backend-resultdir-cleaner \
     --function _get_arg_parser > copr-backend-resultdir-cleaner.1
+PYTHONPATH=`pwd` argparse-manpage --pyfile run/copr-backend-resultdir-inventory \
+    --function _get_arg_parser > copr-backend-resultdir-inventory.1
 
 %install
 %py3_install
 
 
 install -d %{buildroot}%{_sharedstatedir}/copr/public_html/results
+install -d %{buildroot}%{_sharedstatedir}/copr/backend
 install -d %{buildroot}%{_pkgdocdir}/lighttpd/
 install -d %{buildroot}%{_sysconfdir}/copr
 install -d %{buildroot}%{_sysconfdir}/logrotate.d/
@@ -184,6 +187,7 @@ cp -a docs/build/html %{buildroot}%{_pkgdocdir}/
 
 install -d %{buildroot}%{_mandir}/man1
 install -p -m 644 copr-backend-resultdir-cleaner.1 %{buildroot}/%{_mandir}/man1/
+install -p -m 644 copr-backend-resultdir-inventory.1 %{buildroot}/%{_mandir}/man1/
 
 
 %check
@@ -214,6 +218,7 @@ useradd -r -g copr -G lighttpd -s /bin/bash -c "COPR user" copr
 %dir %{_sharedstatedir}/copr
 %dir %attr(0755, copr, copr) %{_sharedstatedir}/copr/public_html/
 %dir %attr(0755, copr, copr) %{_sharedstatedir}/copr/public_html/results
+%dir %attr(0755, copr, copr) %{_sharedstatedir}/copr/backend
 %dir %attr(0755, copr, copr) %{_var}/run/copr-backend
 %dir %attr(0755, copr, copr) %{_var}/log/copr-backend
 
@@ -6,8 +6,6 @@ import time
 import traceback
 import base64
 
-from distutils.dir_util import copy_tree
-from distutils.errors import DistutilsFileError
 from urllib.request import urlretrieve
 from copr.exceptions import CoprRequestException
 from requests import RequestException
@@ -19,6 +17,8 @@ from copr_common.rpm import splitFilename
 from copr_common.enums import ActionTypeEnum, BackendResultEnum, StorageEnum
 from copr_common.worker_manager import WorkerManager
 
+from copr_backend.inventory import get_inventory
+from copr_backend.manifest import MANIFEST_NAME, write_manifest
 from copr_backend.worker_manager import BackendQueueTask
 from copr_backend.storage import storage_for_enum, BackendStorage
 
@@ -26,8 +26,9 @@ from .sign import create_user_keys, CoprKeygenRequestError
 from .exceptions import CreateRepoError, CoprSignError, FrontendClientException
 from .helpers import (get_redis_logger, silent_remove, ensure_dir_exists,
                       get_chroot_arch, format_filename,
-                      call_copr_repo, copy2_but_hardlink_rpms)
-from .sign import sign_rpms_in_dir, unsign_rpms_in_dir, get_pubkey
+                      call_copr_repo, copy2_but_hardlink_rpms, link_tree)
+from .frontend import FrontendClient
+from .sign import resign_rpms, get_pubkey
 
 
 class Action(object):
@@ -154,7 +155,59 @@ class GPGMixin(object):
             return False
 
 
-class Fork(Action, GPGMixin):
+class ProgressMixin(object):
+    """
+    Report the progress of long-running actions to frontend
+    """
+
+    # Seconds between the progress reports sent to frontend
+    progress_period = 60
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._frontend_client = None
+        self._last_progress = time.time()
+        self._progress_reported = False
+
+    def report_progress(self, message):
+        """
+        Let the user know (in the action message) how far we are, but don't
+        flood the frontend
+        """
+        now = time.time()
+        if now - self._last_progress < self.progress_period:
+            return
+        self._last_progress = now
+        self._progress_reported = True
+        self._send_message(message)
+
+    def report_finished(self, message):
+        """
+        Replace the last progress message (if any was reported) by the final
+        MESSAGE, so the finished action doesn't look like still in progress
+        """
+        if self._progress_reported:
+            self._send_message(message)
+
+    def _send_message(self, message):
+        self.log.info("Action progress: %s", message)
+        if not self._frontend_client:
+            self._frontend_client = FrontendClient(self.opts, self.log)
+        try:
+            self._frontend_client.update({"actions": [
+                {"id": self.data["id"], "message": message}]})
+        except FrontendClientException:
+            self.log.warning("Can't report action progress to frontend")
+
+
+class Fork(ProgressMixin, Action, GPGMixin):
+    """
+    Fork the builds into another project.  The build results are hardlinked
+    (not copied), only the RPMs are cloned because they need to be re-signed
+    by the new project key.  The re-signing is done in one parallel batch, and
+    createrepo is run once per chroot at the end.
+    """
+
     def run(self):
         sign = self.opts.do_sign
         self.log.info("Action fork %s", self.data["object_type"])
@@ -162,6 +215,8 @@ class Fork(Action, GPGMixin):
         old_path = os.path.join(self.destdir, self.data["old_value"])
         new_path = os.path.join(self.destdir, self.data["new_value"])
         builds_map = json.loads(self.data["data"])["builds_map"]
+        new_owner, _, new_project = self.data["new_value"].partition("/")
+        inventory = get_inventory(self.opts, self.log)
 
         if not os.path.exists(old_path):
             self.log.info("Source copr directory doesn't exist: %s", old_path)
@@ -178,6 +233,11 @@ class Fork(Action, GPGMixin):
                 # Put the new public key into forked build directory.
                 get_pubkey(data["user"], data["copr"], self.log, self.opts.sign_domain, pubkey_path)
 
+            builds_count = sum(len(src_dst_dir or {})
+                               for src_dst_dir in builds_map.values())
+            forked_builds = []
+            manifests = []
+            rpms = []
             chroot_paths = set()
             for chroot, src_dst_dir in builds_map.items():
 
@@ -200,29 +260,56 @@ class Fork(Action, GPGMixin):
                     ensure_dir_exists(dst_path, self.log)
 
                     try:
-                        copy_tree(src_path, dst_path)
-                    except DistutilsFileError as e:
+                        # RPMs are cloned, we drop the old signatures
+                        # from them and re-sign
+                        cloned = link_tree(
+                            src_path, dst_path,
+                            private=lambda path: path.endswith(".rpm"))
+                    except (OSError, shutil.Error) as e:
                         self.log.error(str(e))
                         continue
 
-                    # Drop old signatures coming from original repo and re-sign.
-                    unsign_rpms_in_dir(dst_path, opts=self.opts, log=self.log)
-                    if sign:
-                        sign_rpms_in_dir(data["user"], data["copr"], dst_path,
-                                         chroot, opts=self.opts, log=self.log)
+                    # The hardlinked manifest describes the original RPMs,
+                    # re-generated below once the RPMs are re-signed
+                    try:
+                        os.unlink(os.path.join(dst_path, MANIFEST_NAME))
+                        manifests.append(dst_path)
+                    except FileNotFoundError:
+                        pass
 
+                    rpms.extend((rpm, chroot) for rpm in cloned)
+                    forked_builds.append((chroot, dst_dir))
                     self.log.info("Forked build %s as %s", src_path, dst_path)
+                    self.report_progress("Forked {0}/{1} builds".format(
+                        len(forked_builds), builds_count))
+
+            resign_rpms(data["user"], data["copr"], rpms, self.opts, self.log,
+                        workers=self.opts.get("fork_sign_workers", 4),
+                        progress=lambda done, total: self.report_progress(
+                            "Re-signed {0}/{1} RPMs".format(done, total)))
+
+            for dst_path in manifests:
+                write_manifest(dst_path)
+
+            if inventory:
+                for chroot, dst_dir in forked_builds:
+                    inventory.add_build_dir(new_owner, new_project, chroot,
+                                            dst_dir)
 
             result = BackendResultEnum("success")
             for chroot_path in chroot_paths:
                 if not call_copr_repo(chroot_path, logger=self.log):
                     result = BackendResultEnum("failure")
 
+            self.report_finished("Forked {0} builds, re-signed {1} RPMs".format(
+                len(forked_builds), len(rpms)))
+
         except (CoprSignError, CreateRepoError, CoprRequestException, IOError) as ex:
             self.log.error("Failure during project forking")
             self.log.error(str(ex))
             self.log.error(traceback.format_exc())
             result = BackendResultEnum("failure")
+            self.report_finished("Forking failed: {0}".format(ex))
         return result
 
 
@@ -279,7 +366,11 @@ class CompsUpdate(Action):
         return result
 
 
-class DeleteMultipleBuilds(Action):
+class DeleteMultipleBuilds(ProgressMixin, Action):
+    """
+    Delete builds in bulk, possibly thousands of them.  See
+    BackendStorage.delete_builds().
+    """
     def run(self):
         self.log.debug("Action delete multiple builds.")
 
@@ -298,13 +389,23 @@ class DeleteMultipleBuilds(Action):
         result = BackendResultEnum("success")
         for project_dirname, chroot_builddirs in project_dirnames.items():
             args = [project_dirname, chroot_builddirs, build_ids]
-            success = self.storage.delete_builds(*args)
+
+            def _progress(done, total, dirname=project_dirname):
+                self.report_progress(
+                    "Deleted builds in {0}/{1} chroots of {2}".format(
+                        done, total, dirname))
+
+            success = self.storage.delete_builds(*args, progress=_progress)
 
             if not isinstance(self.storage, BackendStorage):
-                success = self.backend_storage.delete_builds(*args) and success
+                success = self.backend_storage.delete_builds(
+                    *args, progress=_progress) and success
 
             if not success:
                 result = BackendResultEnum("failure")
+
+        self.report_finished("Deleted builds in {0} project directories".format(
+            len(project_dirnames)))
         return result
 
 
@@ -474,6 +575,7 @@ class RemoveDirs(Action):
     """
     def _run_internal(self):
         copr_dirs = json.loads(self.data["data"])
+        inventory = get_inventory(self.opts, self.log)
         for copr_dir in copr_dirs:
             assert len(copr_dir.split('/')) == 2
             assert ':pr:' in copr_dir
@@ -483,6 +585,8 @@ class RemoveDirs(Action):
                 shutil.rmtree(directory)
             except FileNotFoundError:
                 self.log.error("RemoveDirs: %s not found", directory)
+            if inventory:
+                inventory.remove_project(*copr_dir.split("/"))
 
     def run(self):
         result = BackendResultEnum("failure")
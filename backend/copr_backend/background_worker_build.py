@@ -11,6 +11,7 @@ import statistics
 import time
 import json
 import shlex
+import threading
 
 from datetime import datetime
 from packaging import version
@@ -34,7 +35,16 @@ from copr_backend.exceptions import (
 from copr_backend.helpers import (
     run_cmd, register_build_result, format_evr,
 )
+from copr_backend.inventory import get_inventory
 from copr_backend.job import BuildJob
+from copr_backend.livelog import CompressingLogWriter, finish_compressed_log
+from copr_backend.manifest import (
+    MANIFEST_NAME,
+    load_manifest,
+    missing_files,
+    verified_files,
+    write_manifest,
+)
 from copr_backend.msgbus import MessageSender
 from copr_backend.sign import sign_rpms_in_dir, get_pubkey
 from copr_backend.sshcmd import SSHConnection, SSHConnectionError
@@ -44,6 +54,8 @@ from copr_backend.storage import storage_for_job
 
 MAX_HOST_ATTEMPTS = 3
 MAX_SSH_ATTEMPTS = 5
+MAX_TAR_DOWNLOAD_ATTEMPTS = 3
+TAR_DOWNLOAD_CHUNK = 1000
 MIN_BUILDER_VERSION = "0.68.dev"
 CANCEL_CHECK_PERIOD = 5
 DATETIME_FORMAT = "%Y-%m-%d %H:%M"
@@ -87,6 +99,11 @@ class BackendError(Exception):
         return "Backend process error: {}".format(super().__str__())
 
 
+def _chunks(items, size):
+    """ Split the ITEMS list into lists of at most SIZE items """
+    return [items[i:i+size] for i in range(0, len(items), size)]
+
+
 def _average_step(values):
     """
     Calculate average step between ``values``.  It's expected that
@@ -158,6 +175,8 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
         self.canceled = False
         self.last_hostname = None
         self.storage = None
+        # result files verified by _tar_download_results()
+        self.verified_files = None
 
     @classmethod
     def adjust_arg_parser(cls, parser):
@@ -306,7 +325,11 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
         for topic in ['build.start', 'chroot.start']:
             self.sender.announce(topic, self.job, self.last_hostname)
 
-    def _mark_finished(self):
+    def _finish_job(self):
+        """
+        Set the final job state.  This is separated from _mark_finished(), so
+        it is logged into backend.log before the log is compressed.
+        """
         self.job.ended_on = time.time()
 
         # At this point, NEVER want to re-try the build by subsequent
@@ -319,6 +342,8 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
         text_status = StatusEnum(self.job.status)
         self.log.info("Worker %s build, took %s", text_status,
                       self.job.took_seconds)
+
+    def _mark_finished(self):
         data = {"builds": [self.job.to_dict()]}
         self._update_frontend_task(data)
         self.sender.announce("build.end", self.job, self.last_hostname)
@@ -541,6 +566,9 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
     def _tail_log_file(self):
         """ Return None if OK, or failure reason as str """
         live_cmd = "copr-rpmbuild-log"
+        if self.opts.compress_live_logs:
+            return self._tail_log_file_compressed(live_cmd)
+
         with open(self.job.builder_log, 'w') as logfile:
             # We can not use 'max_retries' here because that would concatenate
             # the attempts to the same log file.
@@ -549,6 +577,32 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
                 return "{} shouldn't exit != 0".format(live_cmd)
         return None
 
+    def _tail_log_file_compressed(self, live_cmd):
+        """
+        Same as _tail_log_file(), but the log stream is also compressed on the
+        fly.  The plain log is served while the build is running, and it is
+        replaced by the compressed one in _compress_logs().
+        """
+        read_fd, write_fd = os.pipe()
+        with CompressingLogWriter(self.job.builder_log) as writer:
+            thread = threading.Thread(target=writer.consume, args=(read_fd,))
+            thread.start()
+            try:
+                with os.fdopen(write_fd, "w") as logfile:
+                    retval = self.ssh.run(live_cmd, stdout=logfile,
+                                          stderr=logfile,
+                                          subprocess_timeout=None)
+            finally:
+                thread.join()
+                os.close(read_fd)
+
+        if writer.error:
+            return "Can't write {}: {}".format(self.job.builder_log,
+                                               writer.error)
+        if retval:
+            return "{} shouldn't exit != 0".format(live_cmd)
+        return None
+
     def _retry_for_ssh_failures(self, method, *args, **kwargs):
         """
         Retry running the ``method`` indefinitely when SSHConnectionError occurs
@@ -628,6 +682,11 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
 
         for src in logs:
             dest = src + ".gz"
+            if src == self.job.builder_log and self.opts.compress_live_logs \
+                    and finish_compressed_log(src):
+                # already compressed while downloading
+                continue
+
             if os.path.exists(dest):
                 # This shouldn't ever happen, but if it happened - gzip below
                 # would interactively ask whether we want to overwrite the
@@ -646,6 +705,27 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
             if res.returncode not in [0, 2]:
                 self.log.error("Unable to compress file %s", src)
 
+    def _write_manifest(self):
+        """
+        The manifest.json downloaded from builder describes the results before
+        we signed the RPMs and compressed the logs, re-generate it so it matches
+        the published files.  Only the checksums of the modified files are
+        calculated, the rest was verified by _tar_download_results().  Only
+        done for successful (published) builds.  Never raise any exception!
+        """
+        if self.verified_files is None:
+            return
+        if self.job.status != StatusEnum("succeeded") or \
+                self.job.chroot == "srpm-builds":
+            return
+        try:
+            manifest = write_manifest(self.job.results_dir,
+                                      self.verified_files)
+            self.log.info("Wrote manifest for %s result files",
+                          len(manifest["files"]))
+        except OSError:
+            self.log.exception("Can't write the results manifest")
+
     def _download_results(self):
         """
         Retry rsync-download the results several times.
@@ -657,6 +737,12 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
             filter_ = ["+ success", "+ *.spec", "- *"]
 
         self.log.info("Downloading results from builder")
+        self.verified_files = None
+        if self.opts.tar_results_download and not filter_:
+            if self._tar_download_results():
+                return
+            self.log.warning("Falling back to rsync download")
+
         self.ssh.rsync_download(
             self.builder_results + "/",
             self.job.results_dir,
@@ -665,6 +751,58 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
             filter_=filter_,
         )
 
+    def _tar_download_results(self):
+        """
+        Download the results as one tar stream, and verify them against the
+        manifest.json file generated by copr-rpmbuild.  When some files are
+        missing or broken, re-try downloading just those.  Return True on
+        success, False if rsync should be used instead.
+        """
+        manifest_path = os.path.join(self.job.results_dir, MANIFEST_NAME)
+        remote_manifest = os.path.join(self.builder_results, MANIFEST_NAME)
+        with open(manifest_path, "w", encoding="utf-8") as manifest_fd:
+            retval = self.ssh.run("cat " + shlex.quote(remote_manifest),
+                                  stdout=manifest_fd, max_retries=2)
+        manifest = load_manifest(manifest_path) if not retval else None
+        if manifest is None:
+            self.log.warning("No valid results manifest on builder")
+            return False
+
+        try:
+            files = missing_files(manifest, self.job.results_dir)
+        except ValueError as err:
+            self.log.error("%s", err)
+            return False
+
+        for attempt in range(1, MAX_TAR_DOWNLOAD_ATTEMPTS + 1):
+            if len(files) == len(manifest["files"]):
+                # Nothing downloaded yet, just take the whole directory.
+                chunks = [None]
+            else:
+                chunks = _chunks(files, TAR_DOWNLOAD_CHUNK)
+            try:
+                for chunk in chunks:
+                    self.ssh.tar_download(
+                        self.builder_results,
+                        self.job.results_dir,
+                        files=chunk,
+                        logfile=self.job.rsync_log_name,
+                    )
+            except SSHConnectionError as err:
+                self.log.error("Tar download attempt %s failed: %s",
+                               attempt, err)
+
+            files = missing_files(manifest, self.job.results_dir)
+            if not files:
+                self.log.info("Downloaded and verified %s result files",
+                              len(manifest["files"]))
+                self.verified_files = verified_files(manifest,
+                                                     self.job.results_dir)
+                return True
+            self.log.warning("Attempt %s: %s result files missing or broken",
+                             attempt, len(files))
+        return False
+
     def _upload_results_to_storage(self):
         """
         Upload build results to an appropriate storage. Duplicate the data,
@@ -724,6 +862,8 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
         kwargs = {
             "chroot_dir": self.job.chroot_dir,
             "target_dir_name": self.job.target_dir_name,
+            # coalesce the Pulp publications of concurrently finished builds
+            "batch": True,
         }
         if not self.storage.publish_repository(self.job.chroot, **kwargs):
             raise BackendError("createrepo failed")
@@ -982,6 +1122,18 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
                 self.log.info("Removing %s, it is stored in Pulp", rpm)
                 os.remove(rpm)
 
+    def _update_inventory(self):
+        """
+        Record the build directory (with the final size) in the resultdir
+        inventory, if enabled
+        """
+        inventory = get_inventory(self.opts, self.log)
+        if inventory is None or not os.path.isdir(self.job.results_dir):
+            return
+        inventory.add_build_dir(self.job.project_owner,
+                                self.job.project_dirname, self.job.chroot,
+                                self.job.target_dir_name)
+
     def build(self, attempt):
         """
         Attempt to build.
@@ -1088,8 +1240,13 @@ class BuildBackgroundWorker(BackendBackgroundWorker):
         finally:
             self._drop_host()
             if self.job:
-                self._mark_finished()
+                self._finish_job()
                 self._compress_logs()
+                # before _mark_finished(), clients download the results once
+                # the build is finished
+                self._write_manifest()
+                self._mark_finished()
+                self._update_inventory()
             else:
                 self.log.error("No job object from Frontend")
             self.redis_set_worker_flag("status", "done")
@@ -0,0 +1,234 @@
+"""
+Native `du -x` replacement for copr-backend-analyze-results.
+
+The results directory is scanned by `os.scandir()`, one owner directory per
+worker process.  For each directory we remember its mtime, the disk usage of
+the files directly in it, and the list of its sub-directories (the "cache").
+When the next run finds the directory with the same mtime, no file in it
+could have been added, removed or renamed, so only the sub-directories are
+visited and the files' stat() calls are skipped.  Note that files modified
+in-place, or hardlinked from elsewhere (without changing the directory mtime)
+are not noticed this way.
+
+Hardlinked files are counted only once per owner, as `du -x` would do for
+the owner directory.  Unlike `du -x` run for the whole results directory,
+the files hardlinked across owners (e.g. the forked builds) are charged to
+every owner, just like when the forks used to be full copies.
+
+The per-owner results of the current run are stored, too, so an interrupted
+run can be resumed without re-scanning the already finished owners.
+"""
+
+import gzip
+import json
+import os
+import stat
+
+
+# The stats are calculated for the owner, project and chroot directories
+STATS_DEPTH = 3
+
+
+def _atomic_write_json(path, data, compress=False):
+    tmp_path = path + ".tmp"
+    opener = gzip.open if compress else open
+    with opener(tmp_path, "wt") as fd:
+        json.dump(data, fd)
+    os.rename(tmp_path, path)
+
+
+def _load_json(path, compress=False):
+    opener = gzip.open if compress else open
+    try:
+        with opener(path, "rt") as fd:
+            return json.load(fd)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        # truncated/corrupted file, e.g. the machine crashed
+        return None
+
+
+class DiskUsageScanner:
+    """
+    Calculate `du -x` like disk usage (in KiB) of the given directory tree,
+    optionally re-using the CACHE from the previous run.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or {}
+        self.new_cache = {}
+        self.results = {}
+        self._seen_inodes = set()
+        self._device = None
+
+    def scan(self, path, relpath):
+        """
+        Scan the PATH directory (RELPATH relatively to the results directory),
+        and return its disk usage in 512B blocks
+        """
+        dir_stat = os.lstat(path)
+        self._device = dir_stat.st_dev
+        return self._scan(path, relpath, dir_stat)
+
+    def _subdir_stat(self, path):
+        try:
+            subdir_stat = os.lstat(path)
+        except FileNotFoundError:
+            return None
+        if not stat.S_ISDIR(subdir_stat.st_mode):
+            return None
+        if subdir_stat.st_dev != self._device:
+            # du -x, don't cross filesystem boundaries
+            return None
+        return subdir_stat
+
+    def _linked_blocks(self, linked):
+        # hardlinked files are counted only once within the scanned owner
+        blocks = 0
+        for device, inode, inode_blocks in linked:
+            if (device, inode) in self._seen_inodes:
+                continue
+            self._seen_inodes.add((device, inode))
+            blocks += inode_blocks
+        return blocks
+
+    def _scan(self, path, relpath, dir_stat):
+        total = dir_stat.st_blocks
+        cached = self.cache.get(relpath)
+        if cached and cached[0] == dir_stat.st_mtime_ns:
+            _, files_blocks, subdirs, linked = cached
+            total += files_blocks + self._linked_blocks(linked)
+            for name in subdirs:
+                subdir_path = os.path.join(path, name)
+                subdir_stat = self._subdir_stat(subdir_path)
+                if subdir_stat is None:
+                    continue
+                total += self._scan(subdir_path, relpath + "/" + name,
+                                    subdir_stat)
+        else:
+            files_blocks = 0
+            subdirs = []
+            linked = []
+            try:
+                entries = os.scandir(path)
+            except FileNotFoundError:
+                # removed in the meantime (e.g. by a delete action)
+                return 0
+            with entries:
+                for entry in entries:
+                    try:
+                        entry_stat = entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+                    if stat.S_ISDIR(entry_stat.st_mode):
+                        if entry_stat.st_dev != self._device:
+                            continue
+                        subdirs.append(entry.name)
+                        total += self._scan(entry.path,
+                                            relpath + "/" + entry.name,
+                                            entry_stat)
+                    elif entry_stat.st_nlink > 1:
+                        linked.append([entry_stat.st_dev, entry_stat.st_ino,
+                                       entry_stat.st_blocks])
+                    else:
+                        files_blocks += entry_stat.st_blocks
+            total += files_blocks + self._linked_blocks(linked)
+
+        self.new_cache[relpath] = [dir_stat.st_mtime_ns, files_blocks, subdirs,
+                                   linked]
+        if relpath.count("/") < STATS_DEPTH:
+            self.results[relpath] = total // 2
+        return total
+
+
+class ScanState:
+    """
+    Files in STATE_DIR, the per-owner caches (kept across runs) and the
+    per-owner results of the current run (for resuming)
+    """
+
+    def __init__(self, state_dir):
+        self.cache_dir = os.path.join(state_dir, "cache")
+        self.run_dir = os.path.join(state_dir, "run")
+        for directory in [self.cache_dir, self.run_dir]:
+            os.makedirs(directory, exist_ok=True)
+
+    def _cache_file(self, owner):
+        return os.path.join(self.cache_dir, owner + ".json.gz")
+
+    def _result_file(self, owner):
+        return os.path.join(self.run_dir, owner + ".json")
+
+    def load_cache(self, owner):
+        """ Return the cache from the previous scan of OWNER, or None """
+        return _load_json(self._cache_file(owner), compress=True)
+
+    def store_cache(self, owner, cache):
+        """ Store the CACHE of OWNER for the next run """
+        _atomic_write_json(self._cache_file(owner), cache, compress=True)
+
+    def drop_caches(self, keep):
+        """ Remove the caches of the owners not listed in KEEP (removed) """
+        keep = {owner + ".json.gz" for owner in keep}
+        for filename in os.listdir(self.cache_dir):
+            if filename not in keep:
+                os.unlink(os.path.join(self.cache_dir, filename))
+
+    def load_result(self, owner):
+        """ Return the results of OWNER from the interrupted run, or None """
+        return _load_json(self._result_file(owner))
+
+    def store_result(self, owner, results):
+        """ Store the RESULTS of OWNER, so we don't need to re-scan it """
+        _atomic_write_json(self._result_file(owner), results)
+
+    def start_run(self, resume=False):
+        """
+        Start a new run, drop the results of the previous (interrupted) run
+        unless we RESUME it
+        """
+        if resume:
+            return
+        self.finish_run()
+
+    def finish_run(self):
+        """ Drop the per-owner results, the run is finished """
+        for filename in os.listdir(self.run_dir):
+            os.unlink(os.path.join(self.run_dir, filename))
+
+
+def scan_owner(resultdir, owner, state_dir, use_cache=True):
+    """
+    Scan the RESULTDIR/OWNER directory, and return `{relpath: KiB}` dict for
+    the owner, project and chroot directories.  This is the process pool
+    worker, it also updates the cache and stores the results into STATE_DIR.
+    """
+    state = ScanState(state_dir)
+    cache = state.load_cache(owner) if use_cache else None
+    scanner = DiskUsageScanner(cache)
+    try:
+        scanner.scan(os.path.join(resultdir, owner), owner)
+    except FileNotFoundError:
+        # removed in the meantime
+        return owner, {}
+    state.store_cache(owner, scanner.new_cache)
+    state.store_result(owner, scanner.results)
+    return owner, scanner.results
+
+
+def list_owners(resultdir):
+    """
+    Return the sorted list of owner directories in RESULTDIR (on the same
+    filesystem)
+    """
+    device = os.lstat(resultdir).st_dev
+    owners = []
+    with os.scandir(resultdir) as entries:
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            if entry.stat(follow_symlinks=False).st_dev != device:
+                continue
+            owners.append(entry.name)
+    return sorted(owners)
@@ -7,6 +7,7 @@ import sys
 import errno
 import time
 import types
+import fcntl
 import glob
 import shlex
 import shutil
@@ -309,6 +310,18 @@ class BackendConfigReader(object):
         opts.sign_domain = _get_conf(
             cp, "backend", "sign_domain", DOMAIN)
 
+        opts.fork_sign_workers = _get_conf(
+            cp, "backend", "fork_sign_workers", 4, mode="int")
+
+        opts.pulp_upload_workers = _get_conf(
+            cp, "backend", "pulp_upload_workers", 4, mode="int")
+
+        opts.pulp_publish_delay = _get_conf(
+            cp, "backend", "pulp_publish_delay", 5, mode="int")
+
+        opts.delete_builds_workers = _get_conf(
+            cp, "backend", "delete_builds_workers", 4, mode="int")
+
         opts.build_groups = []
         for group_id in range(opts.build_groups_count):
             archs = _get_conf(cp, "backend",
@@ -408,12 +421,21 @@ class BackendConfigReader(object):
 
         opts.prune_days = _get_conf(cp, "backend", "prune_days", None, mode="int")
 
+        opts.resultdir_inventory = _get_conf(
+            cp, "backend", "resultdir_inventory", None, mode="path")
+
         opts.gently_gpg_sha256 = _get_conf(
             cp, "backend", "gently_gpg_sha256", True, mode="bool")
 
         opts.aws_cloudfront_distribution = _get_conf(
             cp, "backend", "aws_cloudfront_distribution", None)
 
+        opts.compress_live_logs = _get_conf(
+            cp, "backend", "compress_live_logs", False, mode="bool")
+
+        opts.tar_results_download = _get_conf(
+            cp, "backend", "tar_results_download", False, mode="bool")
+
         # ssh options
         opts.ssh = Munch()
         opts.ssh.builder_config = _get_conf(
@@ -690,3 +712,50 @@ def copy2_but_hardlink_rpms(src, dest, **kwargs):
         return os.link(src, dest)
     # This is per help(shutil.copytree), copy2 is used by default.
     return shutil.copy2(src, dest, **kwargs)
+
+
+# ioctl(2) request to reflink the whole file, from linux/fs.h
+FICLONE = 0x40049409
+
+
+def clone_file(src, dest):
+    """
+    Create DEST as a private copy of SRC.  Use reflink (copy-on-write clone
+    sharing the data blocks) if the filesystem supports it (Btrfs, XFS),
+    fall-back to the full copy otherwise.
+    """
+    with open(src, "rb") as src_fd, open(dest, "wb") as dest_fd:
+        try:
+            fcntl.ioctl(dest_fd.fileno(), FICLONE, src_fd.fileno())
+        except OSError:
+            shutil.copyfileobj(src_fd, dest_fd, 1024 * 1024)
+    shutil.copystat(src, dest)
+
+
+def link_tree(src, dest, private=None):
+    """
+    Re-create the SRC directory tree in DEST, but hardlink the files instead
+    of copying them (fall-back to copying if hardlinking isn't possible, e.g.
+    across filesystems).  Files for which the PRIVATE(path) callback returns
+    True are cloned instead (see clone_file), so they can be modified without
+    touching the SRC files.  Return the list of such files in DEST.
+    """
+    private_files = []
+
+    def _link_or_clone(src_file, dest_file):
+        if os.path.lexists(dest_file):
+            # re-run of the same action
+            os.unlink(dest_file)
+        if private and private(src_file):
+            clone_file(src_file, dest_file)
+            private_files.append(dest_file)
+            return dest_file
+        try:
+            os.link(src_file, dest_file)
+        except OSError:
+            shutil.copy2(src_file, dest_file)
+        return dest_file
+
+    shutil.copytree(src, dest, copy_function=_link_or_clone,
+                    dirs_exist_ok=True)
+    return private_files
@@ -0,0 +1,335 @@
+"""
+Inventory of the build directories in the results directory (destdir),
+stored in an SQLite database.
+
+Build and action workers keep the inventory updated incrementally (when
+a build finishes, when builds/chroots/projects are removed), so the
+maintenance scripts can query it instead of crawling tens of millions of
+inodes in destdir.  The inventory is enabled by the `resultdir_inventory`
+option in copr-be.conf, and it needs to be initially populated by the
+`copr-backend-resultdir-inventory --rebuild` command.  Until then (or when
+disabled), the scripts fall back to walking the filesystem.
+"""
+
+import functools
+import logging
+import os
+import sqlite3
+import time
+
+from copr_common.tree import walk_limited
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builddirs (
+    owner TEXT NOT NULL,
+    project TEXT NOT NULL,
+    chroot TEXT NOT NULL,
+    builddir TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (owner, project, chroot, builddir)
+);
+CREATE INDEX IF NOT EXISTS builddirs_chroot ON builddirs (chroot);
+CREATE INDEX IF NOT EXISTS builddirs_mtime ON builddirs (mtime);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Seconds to wait for the other writers (workers) to finish their transaction
+LOCK_TIMEOUT = 60
+
+# How many build directory records are read at once, see build_dirs()
+QUERY_PAGE_SIZE = 10000
+
+BUILDDIRS_KEY = ("owner", "project", "chroot", "builddir")
+
+
+def is_build_dir_name(chroot, name):
+    """
+    Return True if NAME looks like a build directory name in the CHROOT
+    directory (00000000-PKGNAME, or just 00000000 in srpm-builds).
+    """
+    number = name.split("-", 1)[0]
+    if len(number) != 8 or not number.isdigit():
+        return False
+    return chroot == "srpm-builds" or "-" in name
+
+
+def directory_size(path):
+    """
+    Return the apparent size (in bytes) of all the files in PATH, recursively
+    """
+    size = 0
+    for root, _, files in os.walk(path):
+        for filename in files:
+            try:
+                size += os.lstat(os.path.join(root, filename)).st_size
+            except OSError:
+                continue
+    return size
+
+
+def _best_effort(method):
+    """
+    The inventory is just a cache, don't let the workers fail when it can not
+    be updated (the next --rebuild fixes it)
+    """
+    @functools.wraps(method)
+    def _wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except (sqlite3.Error, OSError):
+            self.log.exception("Can not update resultdir inventory %s",
+                               self.path)
+            return None
+    return _wrapper
+
+
+class ResultdirInventory:
+    """
+    Query and update the inventory of the build directories in DESTDIR,
+    stored in the SQLite database file PATH
+    """
+
+    def __init__(self, path, destdir, log=None):
+        self.path = path
+        self.destdir = destdir
+        self.log = log or logging.getLogger(__name__)
+        self._schema_ready = False
+
+    def _connect(self):
+        # Multiple worker processes write the database concurrently, each
+        # operation uses a fresh short-living connection.
+        connection = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)
+        connection.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            self._schema_ready = True
+        return connection
+
+    def _execute(self, query, params=()):
+        connection = self._connect()
+        try:
+            with connection:
+                return connection.execute(query, params).rowcount
+        finally:
+            connection.close()
+
+    def _query(self, query, params=()):
+        # Fetch all the rows and close the connection right away.  The
+        # callers (pruners) process the rows for hours, and an open read
+        # transaction would block the WAL checkpoints in the meantime (the
+        # -wal file would grow with every write done by the workers).
+        connection = self._connect()
+        try:
+            return connection.execute(query, params).fetchall()
+        finally:
+            connection.close()
+
+    @property
+    def initialized(self):
+        """
+        True if the inventory has been populated by `rebuild()`, and thus can
+        be used instead of walking the filesystem
+        """
+        if not os.path.exists(self.path):
+            return False
+        connection = self._connect()
+        try:
+            return connection.execute(
+                "SELECT value FROM meta WHERE key = 'rebuilt'"
+            ).fetchone() is not None
+        finally:
+            connection.close()
+
+    def _build_dir_record(self, owner, project, chroot, builddir, now):
+        path = os.path.join(self.destdir, owner, project, chroot, builddir)
+        mtime = os.stat(path).st_mtime
+        return (owner, project, chroot, builddir, directory_size(path),
+                mtime, now)
+
+    @_best_effort
+    def add_build_dir(self, owner, project, chroot, builddir):
+        """
+        Add (or refresh the size and mtime of) the given build directory
+        """
+        record = self._build_dir_record(owner, project, chroot, builddir,
+                                        time.time())
+        self._execute("INSERT OR REPLACE INTO builddirs VALUES "
+                      "(?, ?, ?, ?, ?, ?, ?)", record)
+
+    @_best_effort
+    def remove_build_dirs(self, owner, project, chroot, builddirs):
+        """
+        Forget the removed BUILDDIRS in the given chroot directory
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "DELETE FROM builddirs WHERE owner = ? AND project = ? "
+                    "AND chroot = ? AND builddir = ?",
+                    [(owner, project, chroot, builddir)
+                     for builddir in builddirs])
+        finally:
+            connection.close()
+
+    @_best_effort
+    def remove_chroot(self, owner, project, chroot):
+        """
+        Forget all the build directories in the removed chroot directory
+        """
+        self._execute("DELETE FROM builddirs WHERE owner = ? AND project = ? "
+                      "AND chroot = ?", (owner, project, chroot))
+
+    @_best_effort
+    def remove_project(self, owner, project):
+        """
+        Forget all the build directories in the removed project directory
+        """
+        self._execute("DELETE FROM builddirs WHERE owner = ? AND project = ?",
+                      (owner, project))
+
+    def rebuild(self):
+        """
+        Walk the whole DESTDIR and synchronize the inventory with it.  Workers
+        may keep updating the inventory in the meantime, the records they
+        touch during the rebuild are kept.
+        """
+        start = time.time()
+        count = 0
+        connection = self._connect()
+        try:
+            batch = []
+            for chroot_dir, subdirs, _ in walk_limited(self.destdir,
+                                                        mindepth=3,
+                                                        maxdepth=3):
+                owner, project, chroot = \
+                    os.path.relpath(chroot_dir, self.destdir).split(os.sep)
+                for builddir in subdirs:
+                    if not is_build_dir_name(chroot, builddir):
+                        continue
+                    try:
+                        batch.append(self._build_dir_record(
+                            owner, project, chroot, builddir, start))
+                    except OSError:
+                        # removed in the meantime
+                        continue
+                if len(batch) >= 1000:
+                    count += self._upsert_rebuilt(connection, batch)
+                    batch = []
+            count += self._upsert_rebuilt(connection, batch)
+
+            with connection:
+                removed = connection.execute(
+                    "DELETE FROM builddirs WHERE updated < ?",
+                    (start,)).rowcount
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('rebuilt', ?)",
+                    (str(start),))
+        finally:
+            connection.close()
+
+        self.log.info("Inventory rebuilt in %.1fs, %s build directories, "
+                      "%s stale records removed", time.time() - start,
+                      count, removed)
+        return count
+
+    @staticmethod
+    def _upsert_rebuilt(connection, records):
+        # Records updated by workers after the rebuild started are newer than
+        # what we have, don't overwrite them.
+        with connection:
+            connection.executemany(
+                "INSERT INTO builddirs VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (owner, project, chroot, builddir) DO UPDATE SET "
+                "size = excluded.size, mtime = excluded.mtime, "
+                "updated = excluded.updated "
+                "WHERE builddirs.updated <= excluded.updated",
+                records)
+        return len(records)
+
+    def projects(self):
+        """
+        Generate (owner, project) pairs of all the project directories
+        containing at least one build directory
+        """
+        for row in self._query("SELECT DISTINCT owner, project FROM builddirs "
+                               "ORDER BY owner, project"):
+            yield row["owner"], row["project"]
+
+    def build_dirs(self, chroot=None, older_than=None):
+        """
+        Generate the build directory records, optionally only those in
+        CHROOT directories (e.g. "srpm-builds"), and those not modified since
+        the OLDER_THAN timestamp.  Each record has the owner, project, chroot,
+        builddir, size and mtime fields, and the absolute path.
+        """
+        # There may be millions of records, so read them in pages ordered by
+        # the primary key, each page by a separate short query
+        query = ("SELECT * FROM builddirs "
+                 "WHERE (owner, project, chroot, builddir) > (?, ?, ?, ?)")
+        params = []
+        if chroot is not None:
+            query += " AND chroot = ?"
+            params.append(chroot)
+        if older_than is not None:
+            query += " AND mtime < ?"
+            params.append(older_than)
+        query += " ORDER BY owner, project, chroot, builddir LIMIT ?"
+
+        last_key = ("", "", "", "")
+        while True:
+            rows = self._query(query,
+                               [*last_key, *params, QUERY_PAGE_SIZE])
+            for row in rows:
+                record = dict(row)
+                record["path"] = os.path.join(self.destdir, row["owner"],
+                                              row["project"], row["chroot"],
+                                              row["builddir"])
+                yield record
+            if len(rows) < QUERY_PAGE_SIZE:
+                return
+            last_key = tuple(rows[-1][key] for key in BUILDDIRS_KEY)
+
+    def sizes(self):
+        """
+        Generate (owner, project, chroot, size) sums of the build directory
+        sizes, per chroot directory
+        """
+        for row in self._query(
+                "SELECT owner, project, chroot, SUM(size) AS size "
+                "FROM builddirs GROUP BY owner, project, chroot "
+                "ORDER BY owner, project, chroot"):
+            yield row["owner"], row["project"], row["chroot"], row["size"]
+
+
+def get_inventory(opts, log=None):
+    """
+    Return the ResultdirInventory object if enabled in copr-be.conf, or None
+    """
+    path = getattr(opts, "resultdir_inventory", None)
+    if not path:
+        return None
+    return ResultdirInventory(path, opts.destdir, log)
+
+
+def get_initialized_inventory(opts, log=None):
+    """
+    Like `get_inventory()`, but return None also if the inventory hasn't been
+    populated yet (and thus the caller needs to walk the filesystem)
+    """
+    inventory = get_inventory(opts, log)
+    if inventory is None:
+        return None
+    try:
+        if inventory.initialized:
+            return inventory
+    except sqlite3.Error:
+        inventory.log.exception("Broken resultdir inventory %s", inventory.path)
+    return None
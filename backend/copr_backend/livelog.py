@@ -0,0 +1,99 @@
+"""
+Compress the builder live log on the fly, while it is being downloaded
+"""
+
+import gzip
+import os
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class CompressingLogWriter:
+    """
+    Write the live log stream into the plain PATH file (this is what users see
+    while the build is running), and compress it at the same time into
+    a temporary PATH.gz.part file.  Once the build is finished, finish() just
+    renames the compressed file to PATH.gz and removes the plain log, so no
+    gzip run is needed.  The result is an ordinary (single-member) gzip file,
+    the same as `gzip PATH` would produce.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.compressed_path = path + ".gz"
+        self.partial_path = self.compressed_path + ".part"
+        # the first error that happened when writing (or closing) the log
+        self.error = None
+        self._plain = open(path, "wb")
+        self._compressed = gzip.open(self.partial_path, "wb")
+
+    def write(self, data):
+        """
+        Append DATA (bytes) to the log
+        """
+        if not data:
+            return
+        self._plain.write(data)
+        # make the data visible to the users downloading the live log
+        self._plain.flush()
+        self._compressed.write(data)
+
+    def consume(self, read_fd):
+        """
+        Read data from READ_FD till EOF, and write it to the log.  This is
+        meant to be run in a separate thread.  When writing fails (e.g. full
+        disk), the error is kept in `self.error` for the caller, and the rest
+        of the data is read and dropped; the process writing to the other end
+        of the pipe must never block.
+        """
+        while True:
+            chunk = os.read(read_fd, CHUNK_SIZE)
+            if not chunk:
+                break
+            if self.error:
+                continue
+            try:
+                self.write(chunk)
+            except Exception as ex:  # pylint: disable=broad-except
+                self.error = ex
+
+    def close(self):
+        """
+        Close both the plain and the compressed file.  If anything failed, the
+        compressed file is incomplete and it is removed, so the plain log is
+        compressed the usual way.
+        """
+        for fd in [self._plain, self._compressed]:
+            try:
+                fd.close()
+            except OSError as ex:
+                self.error = self.error or ex
+        if self.error:
+            try:
+                os.unlink(self.partial_path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+
+def finish_compressed_log(path):
+    """
+    Replace the plain PATH with the PATH.gz file compressed by
+    CompressingLogWriter.  Return False if there's no compressed file, and the
+    plain log needs to be compressed the usual way.
+    """
+    partial_path = path + ".gz.part"
+    if not os.path.exists(partial_path):
+        return False
+    os.rename(partial_path, path + ".gz")
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    return True
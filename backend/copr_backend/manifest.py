@@ -0,0 +1,133 @@
+"""
+Work with the `manifest.json` file generated by copr-rpmbuild, describing
+all files in the builder's resultdir (sizes and sha256 checksums).  Backend
+re-generates the manifest once it modifies the results (signs RPMs, compresses
+logs), so the published manifest describes the published files.  Such
+manifest is marked by `"published": true`, so clients (copr-cli) know they
+can verify the downloaded files against it.
+"""
+
+import hashlib
+import json
+import os
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_checksum(path, blocksize=1024 * 1024):
+    """
+    Return sha256 hexdigest of the given file
+    """
+    checksum = hashlib.sha256()
+    with open(path, "rb") as fd:
+        while True:
+            block = fd.read(blocksize)
+            if not block:
+                break
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+def load_manifest(path):
+    """
+    Load the manifest file, return None if it doesn't exist or it is not
+    a valid manifest.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as fd:
+            manifest = json.load(fd)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or \
+            not isinstance(manifest.get("files"), dict):
+        return None
+    return manifest
+
+
+def _file_matches(path, info):
+    try:
+        if os.path.getsize(path) != info["size"]:
+            return False
+        return file_checksum(path) == info["sha256"]
+    except OSError:
+        return False
+
+
+def missing_files(manifest, directory):
+    """
+    Return the sorted list of files from MANIFEST that are either missing in
+    DIRECTORY, or their size or checksum doesn't match.
+    """
+    missing = []
+    for relpath, info in manifest["files"].items():
+        if os.path.isabs(relpath) or ".." in relpath.split(os.sep):
+            raise ValueError("Invalid path in manifest: {}".format(relpath))
+        if not _file_matches(os.path.join(directory, relpath), info):
+            missing.append(relpath)
+    return sorted(missing)
+
+
+def verified_files(manifest, directory):
+    """
+    Return `{relpath: info}` for the MANIFEST files that were just verified in
+    DIRECTORY (see missing_files()), the info dicts are extended by the file
+    modification times.  Pass the result to generate_manifest() as KNOWN, so
+    the files that are not modified in the meantime are not hashed again.
+    """
+    known = {}
+    for relpath, info in manifest["files"].items():
+        try:
+            stat = os.stat(os.path.join(directory, relpath))
+        except OSError:
+            continue
+        known[relpath] = dict(info, mtime_ns=stat.st_mtime_ns)
+    return known
+
+
+def generate_manifest(directory, known=None):
+    """
+    Return the manifest (dict) for all regular files in DIRECTORY,
+    recursively.  Symlinks and the manifest itself are skipped.  The checksums
+    from KNOWN (see verified_files()) are re-used for the unmodified files.
+    """
+    known = known or {}
+    files = {}
+    for root, dirs, filenames in os.walk(directory):
+        dirs.sort()
+        for name in sorted(filenames):
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, directory)
+            if relpath in [MANIFEST_NAME, MANIFEST_NAME + ".tmp"] or \
+                    os.path.islink(path):
+                continue
+            stat = os.stat(path)
+            info = known.get(relpath)
+            if info and info["size"] == stat.st_size and \
+                    info["mtime_ns"] == stat.st_mtime_ns:
+                checksum = info["sha256"]
+            else:
+                checksum = file_checksum(path)
+            files[relpath] = {
+                "size": stat.st_size,
+                "sha256": checksum,
+            }
+    return {
+        "version": MANIFEST_VERSION,
+        "published": True,
+        "files": files,
+    }
+
+
+def write_manifest(directory, known=None):
+    """
+    (Re-)generate the DIRECTORY/manifest.json file, atomically
+    """
+    manifest = generate_manifest(directory, known)
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fd:
+        json.dump(manifest, fd, indent=4)
+    os.rename(tmp_path, path)
+    return manifest
@@ -7,6 +7,7 @@ import time
 import tomllib
 from urllib.parse import urlencode
 import requests
+from requests.adapters import HTTPAdapter
 
 
 class PulpClient:
@@ -39,10 +40,18 @@ class PulpClient:
             config = tomllib.load(fp)
         return cls(config["cli"])
 
-    def __init__(self, config):
+    def __init__(self, config, pool_size=10):
         self.config = config
         self.timeout = 60
 
+        # Re-use the connections, and allow concurrent requests (e.g. uploads)
+        # from multiple threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
     @property
     def auth(self):
         """
@@ -96,7 +105,7 @@ class PulpClient:
         """
         url = self.url("api/v3/repositories/rpm/rpm/")
         data = {"name": name}
-        return requests.post(url, json=data, **self.request_params)
+        return self.session.post(url, json=data, **self.request_params)
 
     def get_repository(self, name):
         """
@@ -107,7 +116,7 @@ class PulpClient:
         # even Pulp CLI does this workaround
         url = self.url("api/v3/repositories/rpm/rpm/?")
         url += urlencode({"name": name, "offset": 0, "limit": 1})
-        return requests.get(url, **self.request_params)
+        return self.session.get(url, **self.request_params)
 
     def get_distribution(self, name):
         """
@@ -118,14 +127,14 @@ class PulpClient:
         # even Pulp CLI does this workaround
         url = self.url("api/v3/distributions/rpm/rpm/?")
         url += urlencode({"name": name, "offset": 0, "limit": 1})
-        return requests.get(url, **self.request_params)
+        return self.session.get(url, **self.request_params)
 
     def get_task(self, task):
         """
         Get a detailed information about a task
         """
         url = self.config["base_url"] + task
-        return requests.get(url, **self.request_params)
+        return self.session.get(url, **self.request_params)
 
     def create_distribution(self, name, repository, basepath=None):
         """
@@ -138,7 +147,7 @@ class PulpClient:
             "repository": repository,
             "base_path": basepath or name,
         }
-        return requests.post(url, json=data, **self.request_params)
+        return self.session.post(url, json=data, **self.request_params)
 
     def create_publication(self, repository):
         """
@@ -147,7 +156,7 @@ class PulpClient:
         """
         url = self.url("api/v3/publications/rpm/rpm/")
         data = {"repository": repository}
-        return requests.post(url, json=data, **self.request_params)
+        return self.session.post(url, json=data, **self.request_params)
 
     def update_distribution(self, distribution, publication):
         """
@@ -163,7 +172,7 @@ class PulpClient:
             # 'repository' and 'publication' may be used simultaneously."
             "repository": None,
         }
-        return requests.patch(url, json=data, **self.request_params)
+        return self.session.patch(url, json=data, **self.request_params)
 
     def create_content(self, repository, path):
         """
@@ -174,7 +183,7 @@ class PulpClient:
         with open(path, "rb") as fp:
             data = {"repository": repository}
             files = {"file": fp}
-            return requests.post(
+            return self.session.post(
                 url, data=data, files=files, **self.request_params)
 
     def delete_content(self, repository, artifacts):
@@ -185,7 +194,7 @@ class PulpClient:
         path = os.path.join(repository, "modify/")
         url = self.config["base_url"] + path
         data = {"remove_content_units": artifacts}
-        return requests.post(url, json=data, **self.request_params)
+        return self.session.post(url, json=data, **self.request_params)
 
     def delete_repository(self, repository):
         """
@@ -193,7 +202,7 @@ class PulpClient:
         https://pulpproject.org/pulp_rpm/restapi/#tag/Repositories:-Rpm/operation/repositories_rpm_rpm_delete
         """
         url = self.config["base_url"] + repository
-        return requests.delete(url, **self.request_params)
+        return self.session.delete(url, **self.request_params)
 
     def delete_distribution(self, distribution):
         """
@@ -201,7 +210,7 @@ class PulpClient:
         https://pulpproject.org/pulp_rpm/restapi/#tag/Distributions:-Rpm/operation/distributions_rpm_rpm_delete
         """
         url = self.config["base_url"] + distribution
-        return requests.delete(url, **self.request_params)
+        return self.session.delete(url, **self.request_params)
 
     def wait_for_finished_task(self, task, timeout=86400):
         """
@@ -209,17 +218,32 @@ class PulpClient:
         unpredictably long time. We need to wait until it is finished to know
         what it actually did.
         """
+        return self.wait_for_finished_tasks([task], timeout)[task]
+
+    def wait_for_finished_tasks(self, tasks, timeout=86400):
+        """
+        Wait until all the given Pulp TASKS are finished, polling all of them
+        in one loop.  Return a `{task: response}` dict with the last response
+        for each task.
+        """
         start = time.time()
-        while True:
-            response = self.get_task(task)
-            if not response.ok:
-                break
-            if response.json()["state"] not in ["waiting", "running"]:
-                break
-            if time.time() > start + timeout:
+        delay = 0.5
+        pending = list(tasks)
+        responses = {}
+        while pending:
+            for task in list(pending):
+                response = self.get_task(task)
+                responses[task] = response
+                if not response.ok or \
+                        response.json()["state"] not in ["waiting", "running"]:
+                    pending.remove(task)
+            if not pending or time.time() > start + timeout:
                 break
-            time.sleep(5)
-        return response
+            time.sleep(delay)
+            # Short tasks (e.g. content creation) finish in a few seconds,
+            # don't hammer Pulp with the long running ones
+            delay = min(delay * 2, 5)
+        return responses
 
     def list_distributions(self, prefix):
         """
@@ -228,4 +252,4 @@ class PulpClient:
         """
         url = self.url("api/v3/distributions/rpm/rpm/?")
         url += urlencode({"name__startswith": prefix})
-        return requests.get(url, **self.request_params)
+        return self.session.get(url, **self.request_params)
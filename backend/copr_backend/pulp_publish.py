@@ -0,0 +1,149 @@
+"""
+Coalesce the Pulp publication requests of concurrently finished builds
+"""
+
+import os
+import time
+
+from copr_common.lock import lock, LockTimeout
+from copr_common.redis_helpers import get_redis_connection
+
+
+class BatchedPublication:
+    """
+    Every finished build needs a new Pulp publication of its repository (and
+    the distribution pointed to it), otherwise its RPMs are not available to
+    users.  Creating the publication is expensive (Pulp re-generates the whole
+    repository metadata), and when many builds finish into the same repository
+    at once (mass rebuilds), all but the latest publication are useless.
+
+    So this works similarly to BatchedCreaterepo:
+
+    1. The build worker requests the publication in Redis by make_request().
+    2. It waits a few seconds (debounce window), so the requests from other
+       workers finishing at the same time can be grouped.
+    3. It acquires the repository lock, so there's only one publication
+       in-flight per repository.  If some other worker processed our request
+       in the meantime (check_processed()), we are done.
+    4. Otherwise, we take all the pending requests (pending()), create the
+       publication, and notify the other workers by commit().  The publication
+       includes the content of all the pending requests because the content is
+       uploaded before the request is made.
+
+    Failures are not reported to others; they retry the publication
+    themselves.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, repository, log, backend_opts=None, noop=False):
+        self.noop = noop
+        self.log = log
+        self.repository = repository
+        self.notify_keys = []
+        self.delay = 0
+        self.lockdir = os.environ.get(
+            "COPR_TESTSUITE_LOCKPATH", "/var/lock/copr-backend")
+
+        if not backend_opts:
+            self.log.error("can't get access to redis, batch disabled")
+            self.noop = True
+            return
+
+        self.delay = backend_opts.get("pulp_publish_delay", 5)
+        self._pid = os.getpid()
+        self.redis = get_redis_connection(backend_opts)
+
+    @property
+    def key(self):
+        """ Our instance ID (key in Redis DB) """
+        return "pulp_publish_batched::{}::{}".format(
+            self.repository, self._pid)
+
+    @property
+    def key_pattern(self):
+        """ Redis key pattern for the requests we can batch-process """
+        return "pulp_publish_batched::{}::*".format(self.repository)
+
+    def make_request(self):
+        """ Request the publication in Redis DB.  Run _before_ lock! """
+        if self.noop:
+            return None
+        self.redis.hset(self.key, "requested", time.time())
+        return self.key
+
+    def check_processed(self, delete_if_not=True):
+        """
+        Return True if some other process already published our request, and
+        drop our entry from Redis DB in such case.  When 'delete_if_not=True',
+        the entry is dropped even if not yet processed (caller is going to
+        publish right away).
+        """
+        if self.noop:
+            return False
+
+        status = self.redis.hget(self.key, "status") == "success"
+        if status or delete_if_not:
+            self.redis.delete(self.key)
+        return status
+
+    def pending(self):
+        """
+        Plan the list of the other pending requests we are going to notify
+        in commit().  Requires lock!
+        """
+        if self.noop:
+            return []
+
+        for key in self.redis.keys(self.key_pattern):
+            if key == self.key:
+                continue
+            if self.redis.hget(key, "status") is not None:
+                continue
+            self.notify_keys.append(key)
+        return self.notify_keys
+
+    def commit(self):
+        """
+        Report to the other processes that their requests were published.
+        Requires lock!
+        """
+        if self.noop:
+            return
+
+        for key in self.notify_keys:
+            self.log.info("Notifying %s that we published", key)
+            self.redis.hset(key, "status", "success")
+
+    def publish(self, callback):
+        """
+        Make sure CALLBACK (creating the publication) was called after our
+        request was made, either by us or by some other process.
+        :return: True on success
+        """
+        self.make_request()
+        time.sleep(self.delay)
+
+        while True:
+            # We don't have fair locking, so check without lock first
+            if self.check_processed(delete_if_not=False):
+                self.log.info("Pulp publication created by other process")
+                return True
+
+            try:
+                with lock(self.repository, lockdir=self.lockdir, timeout=5,
+                          log=self.log):
+                    if self.check_processed():
+                        self.log.info("Pulp publication created by other "
+                                      "process")
+                        return True
+
+                    pending = self.pending()
+                    if pending:
+                        self.log.info("Publishing %s other requests as well",
+                                      len(pending))
+                    if not callback():
+                        return False
+                    self.commit()
+                    return True
+            except LockTimeout:
+                continue  # Try again...
@@ -4,6 +4,7 @@
 Wrapper for /bin/sign from obs-sign package
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import Popen, PIPE, SubprocessError
 import os
 import time
@@ -266,3 +267,55 @@ def unsign_rpms_in_dir(path, opts, log):
     if errors:
         raise CoprSignError("Rpm unsign failed, affected rpms: {}"
                             .format([err[0] for err in errors]))
+
+
+def resign_rpms(username, projectname, rpms, opts, log, workers=1,
+                progress=None):
+    """
+    Drop the old signatures from RPMS, and sign them by the key of the
+    USERNAME/PROJECTNAME project (if signing is enabled).  This is done in
+    a parallel batch, by WORKERS threads calling the rpm and sign binaries.
+    The RPM files are replaced, so they must not be hardlinked to other
+    projects.
+
+    :param rpms: list of (rpm_path, chroot) tuples, chroot affects the hash
+        type
+    :param progress: optional callback, called as progress(done, total)
+    :raises: :py:class:`backend.exceptions.CoprSignError` failed to unsign
+        or sign at least one package
+    """
+    if not rpms:
+        return
+
+    email = create_gpg_email(username, projectname, opts.sign_domain)
+    if opts.do_sign:
+        try:
+            get_pubkey(username, projectname, log, opts.sign_domain)
+        except CoprSignNoKeyError:
+            create_user_keys(username, projectname, opts,
+                             try_indefinitely=True)
+
+    def _resign_one(rpm_chroot):
+        rpm, chroot = rpm_chroot
+        try:
+            _unsign_one(rpm)
+            if opts.do_sign:
+                _sign_one(rpm, email, gpg_hashtype_for_chroot(chroot, opts),
+                          log)
+            log.info("re-signed rpm: %s", rpm)
+            return None
+        except CoprSignError:
+            log.exception("failed to re-sign rpm: %s", rpm)
+            return rpm
+
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for done, failed in enumerate(executor.map(_resign_one, rpms), 1):
+            if failed:
+                errors.append(failed)
+            if progress:
+                progress(done, len(rpms))
+
+    if errors:
+        raise CoprSignError("Rpm re-sign failed, affected rpms: {}"
+                            .format(errors))
@@ -302,3 +302,54 @@ class SSHConnection:
             )
             self.log.error(err_msg)
             raise SSHConnectionError(err_msg)
+
+    def tar_download(self, src, dest, files=None, logfile=None,
+                     subprocess_timeout=None):
+        """
+        Download the content of ``src`` directory on self.host into the
+        ``dest`` directory as one tar stream over SSH.  This avoids the per-file
+        overhead of rsync for builds with many small files.
+
+        :param files:
+            Download only these files (paths relative to ``src``), all the
+            ``src`` content is downloaded by default.
+
+        Store the logs to ``logfile`` within ``dest`` directory.  The dest
+        directory needs to exist.  Raise SSHConnectionError on failure.
+        """
+        remote_command = [
+            "tar", "-C", src, "--mode=u=rwX,go=rX", "-cf", "-", "--",
+        ]
+        remote_command.extend(files or ["."])
+        remote_command = _user_readable_command(remote_command)
+        ssh_command = self._ssh_base() + [remote_command]
+        tar_command = ["tar", "-xf", "-", "-C", dest, "--no-same-owner"]
+
+        log_filepath = os.devnull
+        if logfile:
+            log_filepath = os.path.join(dest, logfile)
+
+        self.log.info("Downloading %s files from %s to %s as tar stream",
+                      len(files) if files else "all", src, dest)
+        with open(log_filepath, "a", encoding="utf-8") as log_fd:
+            with subprocess.Popen(ssh_command, stdout=subprocess.PIPE,
+                                  stderr=log_fd) as ssh_proc, \
+                 subprocess.Popen(tar_command, stdin=ssh_proc.stdout,
+                                  stderr=log_fd) as tar_proc:
+                # Only tar_proc reads the ssh output now.
+                ssh_proc.stdout.close()
+                try:
+                    tar_proc.wait(timeout=subprocess_timeout)
+                    ssh_proc.wait(timeout=subprocess_timeout)
+                except subprocess.TimeoutExpired as error:
+                    ssh_proc.kill()
+                    tar_proc.kill()
+                    raise SSHConnectionError(
+                        "Tar download timeouted: {}".format(remote_command)
+                    ) from error
+
+        if ssh_proc.returncode or tar_proc.returncode:
+            raise SSHConnectionError(
+                "Failed to download data from builder as tar stream "
+                "(ssh rc={}, tar rc={})".format(ssh_proc.returncode,
+                                                tar_proc.returncode))
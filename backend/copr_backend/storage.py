@@ -5,11 +5,14 @@ Support for various data storages, e.g. results directory on backend, Pulp, etc.
 import os
 import json
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
 import requests
 from copr_common.enums import StorageEnum
 from copr_backend.helpers import call_copr_repo, build_chroot_log_name
+from copr_backend.inventory import get_inventory
 from copr_backend.pulp import PulpClient
+from copr_backend.pulp_publish import BatchedPublication
 from copr_backend.exceptions import CoprBackendError
 
 
@@ -81,9 +84,11 @@ class Storage:
         """
         raise NotImplementedError
 
-    def delete_builds(self, dirname, chroot_builddirs, build_ids):
+    def delete_builds(self, dirname, chroot_builddirs, build_ids,
+                      progress=None):
         """
-        Delete multiple builds from the storage
+        Delete multiple builds from the storage, optionally reporting
+        PROGRESS(done, total) per chroot
         """
         raise NotImplementedError
 
@@ -99,6 +104,10 @@ class BackendStorage(Storage):
     Store build results in `/var/lib/copr/public_html/results/`
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.inventory = get_inventory(self.opts, self.log)
+
     def init_project(self, dirname, chroot):
         self.log.info("Creating repo for: %s/%s/%s",
                       self.owner, dirname, chroot)
@@ -137,47 +146,78 @@ class BackendStorage(Storage):
             self.log.error("Directory %s not found", chroot_path)
             return
         shutil.rmtree(chroot_path)
+        if self.inventory:
+            self.inventory.remove_chroot(self.owner, self.project, chroot)
 
     def delete_project(self, dirname):
         path = os.path.join(self.opts.destdir, self.owner, dirname)
         if os.path.exists(path):
             self.log.info("Removing copr dir %s", path)
             shutil.rmtree(path)
-
-    def delete_builds(self, dirname, chroot_builddirs, build_ids):
+        if self.inventory:
+            self.inventory.remove_project(self.owner, dirname)
+
+    def delete_builds(self, dirname, chroot_builddirs, build_ids,
+                      progress=None):
+        log_names = set()
+        for build_id in build_ids or []:
+            log_names.update([
+                build_chroot_log_name(build_id),
+                # we used to create those before
+                'build-{}.rsync.log'.format(build_id),
+                'build-{}.log'.format(build_id)])
+
+        # Each chroot is a separate repository (with its own createrepo lock),
+        # so the chroots can be processed concurrently
         result = True
-        for chroot, subdirs in chroot_builddirs.items():
-            chroot_path = os.path.join(
-                self.opts.destdir, self.owner, dirname, chroot)
-            if not os.path.exists(chroot_path):
-                self.log.error("%s chroot path doesn't exist", chroot_path)
-                result = False
-                continue
-
-            self.log.info("Deleting subdirs [%s] in %s",
-                          ", ".join(subdirs), chroot_path)
-
-            # Run createrepo first and then remove the files (to avoid old
-            # repodata temporarily pointing at non-existing files)!
-            # In srpm-builds we don't create repodata at all
-            if chroot != "srpm-builds":
-                repo = call_copr_repo(
-                    chroot_path, delete=subdirs, devel=self.devel,
-                    appstream=self.appstream, logger=self.log)
-                if not repo:
+        workers = self.opts.get("delete_builds_workers", 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._delete_chroot_builds, dirname, chroot,
+                                subdirs, log_names)
+                for chroot, subdirs in chroot_builddirs.items()]
+            for done, future in enumerate(as_completed(futures), 1):
+                if not future.result():
                     result = False
+                if progress:
+                    progress(done, len(futures))
+        return result
 
-            for build_id in build_ids or []:
-                log_paths = [
-                    os.path.join(chroot_path, build_chroot_log_name(build_id)),
-                    # we used to create those before
-                    os.path.join(chroot_path, 'build-{}.rsync.log'.format(build_id)),
-                    os.path.join(chroot_path, 'build-{}.log'.format(build_id))]
-                for log_path in log_paths:
-                    try:
-                        os.unlink(log_path)
-                    except OSError:
-                        self.log.debug("can't remove %s", log_path)
+    def _delete_chroot_builds(self, dirname, chroot, subdirs, log_names):
+        chroot_path = os.path.join(
+            self.opts.destdir, self.owner, dirname, chroot)
+        if not os.path.exists(chroot_path):
+            self.log.error("%s chroot path doesn't exist", chroot_path)
+            return False
+
+        self.log.info("Deleting %s subdirs [%s] in %s", len(subdirs),
+                      ", ".join(subdirs), chroot_path)
+
+        # Run createrepo first and then remove the files (to avoid old
+        # repodata temporarily pointing at non-existing files)!  This is done
+        # by copr-repo, once for all the subdirs.
+        # In srpm-builds we don't create repodata at all
+        result = True
+        if chroot != "srpm-builds":
+            result = call_copr_repo(
+                chroot_path, delete=subdirs, devel=self.devel,
+                appstream=self.appstream, logger=self.log)
+
+        if self.inventory:
+            self.inventory.remove_build_dirs(self.owner, dirname, chroot,
+                                             subdirs)
+
+        # One directory listing instead of trying to unlink all the possible
+        # log names of all the builds
+        if log_names:
+            with os.scandir(chroot_path) as entries:
+                log_paths = [entry.path for entry in entries
+                             if entry.name in log_names]
+            for log_path in log_paths:
+                try:
+                    os.unlink(log_path)
+                except OSError:
+                    self.log.debug("can't remove %s", log_path)
         return result
 
     def repository_exists(self, dirname, chroot):
@@ -193,6 +233,8 @@ class PulpStorage(Storage):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.client = PulpClient.create_from_config_file()
+        # {repository name: pulp_href}
+        self._repositories = {}
 
     def init_project(self, dirname, chroot):
         repository = self._repository_name(chroot, dirname)
@@ -217,7 +259,7 @@ class PulpStorage(Storage):
         return response.ok
 
     def upload_build_results(self, chroot, results_dir, target_dir_name):
-        resources = []
+        paths = []
         for root, _, files in os.walk(results_dir):
             for name in files:
                 if os.path.basename(root) == "prev_build_backup":
@@ -230,28 +272,40 @@ class PulpStorage(Storage):
                 if not name.endswith(".rpm"):
                     continue
 
-                path = os.path.join(root, name)
-                repository = self._get_repository(chroot)
-                response = self.client.create_content(repository, path)
+                paths.append(os.path.join(root, name))
+
+        repository = self._get_repository(chroot)
+
+        def _create_content(path):
+            return path, self.client.create_content(repository, path)
 
+        # Upload the RPMs concurrently, and only then wait for all the Pulp
+        # tasks (processing the uploaded RPMs) together
+        tasks = {}
+        workers = self.opts.get("pulp_upload_workers", 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for path, response in executor.map(_create_content, paths):
                 if not response.ok:
                     self.log.error("Failed to create Pulp content for: %s, %s",
                                    path, response.text)
                     continue
+                tasks[response.json()["task"]] = path
 
-                # This involves a lot of unnecessary waiting until every
-                # RPM content is created. Once we can reliably label Pulp
-                # content with Copr build ID, we should drop this code and stop
-                # creating the `pulp.json` file
-                task = response.json()["task"]
-                response = self.client.wait_for_finished_task(task)
-                created = response.json().get("created_resources")
-                if not created:
-                    raise CoprBackendError(
-                        "Pulp task {0} didn't create any resources".format(task))
-                resources.extend(created)
-
-                self.log.info("Uploaded to Pulp: %s", path)
+        # This involves a lot of unnecessary waiting until every
+        # RPM content is created. Once we can reliably label Pulp
+        # content with Copr build ID, we should drop this code and stop
+        # creating the `pulp.json` file
+        responses = self.client.wait_for_finished_tasks(list(tasks))
+        resources = []
+        for task, path in tasks.items():
+            response = responses[task]
+            created = response.json().get("created_resources") \
+                if response.ok else None
+            if not created:
+                raise CoprBackendError(
+                    "Pulp task {0} didn't create any resources".format(task))
+            resources.extend(created)
+            self.log.info("Uploaded to Pulp: %s", path)
 
         data = {"resources": resources}
         path = os.path.join(results_dir, "pulp.json")
@@ -259,8 +313,21 @@ class PulpStorage(Storage):
             json.dump(data, fp)
         self.log.info("Pulp resources: %s", resources)
 
-    def publish_repository(self, chroot, **kwargs):
+    def publish_repository(self, chroot, batch=False, **kwargs):
+        """
+        With BATCH=True (finished builds), the publication is coalesced with
+        the concurrent requests for the same repository; otherwise (e.g.
+        serial per-chroot loops) it is created right away, without waiting
+        for the debounce window.
+        """
         repository = self._get_repository(chroot)
+        if not batch:
+            return self._publish(chroot, repository)
+        batched = BatchedPublication(repository, self.log,
+                                     backend_opts=self.opts)
+        return batched.publish(lambda: self._publish(chroot, repository))
+
+    def _publish(self, chroot, repository):
         response = self.client.create_publication(repository)
         if not response.ok:
             self.log.error("Failed to create Pulp publication for because %s",
@@ -298,6 +365,7 @@ class PulpStorage(Storage):
         distribution = self._get_distribution(chroot)
         self.client.delete_repository(repository)
         self.client.delete_distribution(distribution)
+        self._repositories.pop(self._repository_name(chroot), None)
 
     def delete_project(self, dirname):
         prefix = "{0}/{1}".format(self.owner, dirname)
@@ -308,7 +376,8 @@ class PulpStorage(Storage):
             if distribution["repository"]:
                 self.client.delete_repository(distribution["repository"])
 
-    def delete_builds(self, dirname, chroot_builddirs, build_ids):
+    def delete_builds(self, dirname, chroot_builddirs, build_ids,
+                      progress=None):
         # pylint: disable=too-many-locals
         result = True
         for chroot, subdirs in chroot_builddirs.items():
@@ -393,8 +462,10 @@ class PulpStorage(Storage):
 
     def _get_repository(self, chroot):
         name = self._repository_name(chroot)
-        response = self.client.get_repository(name)
-        return response.json()["results"][0]["pulp_href"]
+        if name not in self._repositories:
+            response = self.client.get_repository(name)
+            self._repositories[name] = response.json()["results"][0]["pulp_href"]
+        return self._repositories[name]
 
     def _get_distribution(self, chroot):
         name = self._distribution_name(chroot)
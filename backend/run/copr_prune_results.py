@@ -24,7 +24,9 @@ from copr_backend.helpers import (
     uses_devel_repo,
 )
 
+from copr_backend.exceptions import FrontendClientException
 from copr_backend.frontend import FrontendClient
+from copr_backend.inventory import get_initialized_inventory
 
 
 LOG = multiprocessing.log_to_stderr()
@@ -77,7 +79,7 @@ def arg_max_splitter(args, window):
         i += 1
 
 def run_prunerepo(chroot_path, username, projectdir, sub_dir_name, prune_days,
-                  appstream):
+                  appstream, inventory=None):
     """
     Running prunerepo in background worker.  We don't check the return value, so
     the best we can do is that we return useful success/error message that will
@@ -115,7 +117,7 @@ def run_prunerepo(chroot_path, username, projectdir, sub_dir_name, prune_days,
             LOG.info("Going to remove %s RPMs in %s", len(rpms), chroot_path)
             call_copr_repo(directory=chroot_path, rpms_to_remove=rpms,
                            logger=LOG, appstream=appstream)
-        clean_copr(chroot_path, prune_days, verbose=True)
+        clean_copr(chroot_path, prune_days, verbose=True, inventory=inventory)
     except Exception:  # pylint: disable=broad-except
         LOG.exception("Error pruning chroot %s/%s/%s", username, projectdir,
                       sub_dir_name)
@@ -130,6 +132,8 @@ class Pruner(object):
         self.opts = opts
         self.prune_days = getattr(self.opts, "prune_days", DEF_DAYS)
         self.chroots = {}
+        self.projects = None
+        self.inventory = get_initialized_inventory(self.opts, LOG)
         self.frontend_client = FrontendClient(self.opts, try_indefinitely=True,
                                               logger=LOG)
         self.mtime_optimization = True
@@ -152,22 +156,17 @@ class Pruner(object):
     def run(self):
         response = self.frontend_client.get("chroots-prunerepo-status")
         self.chroots = json.loads(response.content)
+        self.projects = self.get_projects_prune_flags()
 
         results_dir = self.opts.destdir
         LOG.info("Pruning results dir: %s", results_dir)
-        user_dir_names, user_dirs = list_subdir(results_dir)
-
-        LOG.info("Going to process total number: %s of user's directories", len(user_dir_names))
-        LOG.info("Going to process user's directories: %s", user_dir_names)
 
         LOG.info("--------------------------------------------")
-        for username, subpath in zip(user_dir_names, user_dirs):
-            LOG.info("For user '%s' exploring path: %s", username, subpath)
-            for projectdir, project_path in zip(*list_subdir(subpath)):
-                LOG.info("Exploring projectdir '%s' with path: %s", projectdir, project_path)
-                self.prune_project(project_path, username, projectdir)
-                LOG.info("--------------------------------------------")
-
+        for username, projectdir in self.project_dirs(results_dir):
+            project_path = os.path.join(results_dir, username, projectdir)
+            LOG.info("Exploring projectdir '%s' with path: %s", projectdir, project_path)
+            self.prune_project(project_path, username, projectdir)
+            LOG.info("--------------------------------------------")
 
         LOG.info("Pruning tasks are delegated to background workers, waiting.")
         self.pool.close()
@@ -190,6 +189,64 @@ class Pruner(object):
 
         LOG.info("--------------------------------------------")
 
+    def project_dirs(self, results_dir):
+        """
+        Generate (username, projectdir) pairs to prune, taken from the
+        resultdir inventory if available, otherwise by listing the RESULTS_DIR
+        """
+        if self.inventory:
+            LOG.info("Using the resultdir inventory %s", self.inventory.path)
+            yield from self.inventory.projects()
+            return
+
+        user_dir_names, user_dirs = list_subdir(results_dir)
+
+        LOG.info("Going to process total number: %s of user's directories", len(user_dir_names))
+        LOG.info("Going to process user's directories: %s", user_dir_names)
+
+        for username, subpath in zip(user_dir_names, user_dirs):
+            LOG.info("For user '%s' exploring path: %s", username, subpath)
+            for projectdir in list_subdir(subpath)[0]:
+                yield username, projectdir
+
+    def get_projects_prune_flags(self):
+        """
+        Download the prune-related flags of all the projects in one request, and
+        return `{(ownername, projectname): flags}` dict.  Return None if the
+        Frontend doesn't provide them yet (we fallback to per-project queries).
+        """
+        try:
+            response = self.frontend_client.get("projects-prune-flags")
+        except FrontendClientException as ex:
+            LOG.warning("Can not get the projects' prune flags at once, "
+                        "querying project by project: %s", ex)
+            return None
+
+        projects = {}
+        for project in json.loads(response.content):
+            projects[(project["ownername"], project["projectname"])] = project
+        LOG.info("Got prune flags for %s projects", len(projects))
+        return projects
+
+    def get_project_flags(self, username, projectname):
+        """
+        Return the prune-related flags of the given project, either from the
+        pre-fetched data or from the Frontend API.  Return None for projects
+        that don't exist (anymore) on Frontend.
+        """
+        if self.projects is not None:
+            return self.projects.get((username, projectname))
+
+        project_info = get_project_info(self.opts.frontend_base_url,
+                                        username, projectname)
+        return {
+            "persistent": bool(project_info.get("persistent", True)),
+            "auto_prune": bool(project_info.get("auto_prune", True)),
+            "devel_mode": uses_devel_repo(self.opts.frontend_base_url, username,
+                                          projectname, project_info),
+            "appstream": project_info.get("appstream", False),
+        }
+
     def should_run_in_chroot(self, username, projectdir, chroot_name):
         """
         Return False if we think that it doesn't make much sense to re-run the
@@ -220,33 +277,35 @@ class Pruner(object):
         projectname = projectdir.split(':', 1)[0]
         LOG.info("projectname = %s", projectname)
 
-        appstream = False
         try:
-            project_info = get_project_info(self.opts.frontend_base_url,
-                                            username, projectname)
-
-            appstream = project_info.get("appstream", False)
-
-            if uses_devel_repo(self.opts.frontend_base_url, username,
-                               projectname, project_info):
-                LOG.info("Skipped %s/%s since auto createrepo option is disabled",
-                         username, projectdir)
-                return
-
-            if bool(project_info.get("persistent", True)):
-                LOG.info("Skipped %s/%s since the project is persistent",
-                         username, projectdir)
-                return
-
-            if not bool(project_info.get("auto_prune", True)):
-                LOG.info("Skipped %s/%s since auto-prunning is disabled for the project",
-                         username, projectdir)
-                return
+            project_flags = self.get_project_flags(username, projectname)
         except CoprException as exception:
             LOG.error("Failed to get project details for %s/%s with error: %s",
                       username, projectdir, exception)
             return
 
+        if project_flags is None:
+            LOG.info("Skipped %s/%s since the project doesn't exist on Frontend",
+                     username, projectdir)
+            return
+
+        appstream = project_flags["appstream"]
+
+        if project_flags["devel_mode"]:
+            LOG.info("Skipped %s/%s since auto createrepo option is disabled",
+                     username, projectdir)
+            return
+
+        if project_flags["persistent"]:
+            LOG.info("Skipped %s/%s since the project is persistent",
+                     username, projectdir)
+            return
+
+        if not project_flags["auto_prune"]:
+            LOG.info("Skipped %s/%s since auto-prunning is disabled for the project",
+                     username, projectdir)
+            return
+
         for sub_dir_name in os.listdir(project_path):
             chroot_path = os.path.join(project_path, sub_dir_name)
 
@@ -277,7 +336,7 @@ class Pruner(object):
                     continue
 
             args = [chroot_path, username, projectdir, sub_dir_name,
-                    self.prune_days, appstream]
+                    self.prune_days, appstream, self.inventory]
             self.maybe_async(run_prunerepo, args)
 
     def maybe_async(self, func, args):
@@ -291,11 +350,15 @@ class Pruner(object):
             self.pool.apply_async(func, args)
 
 
-def clean_copr(path, days=DEF_DAYS, verbose=True):
+def clean_copr(path, days=DEF_DAYS, verbose=True, inventory=None):
     """
-    Remove whole copr build dirs if they no longer contain a RPM file
+    Remove whole copr build dirs if they no longer contain a RPM file, and drop
+    them from the resultdir INVENTORY (if given)
     """
     LOG.info("Cleaning COPR repository %s", path)
+    chroot_location = None
+    if inventory:
+        chroot_location = os.path.relpath(path, inventory.destdir).split(os.sep)
     for dir_name in os.listdir(path):
         dir_path = os.path.abspath(os.path.join(path, dir_name))
 
@@ -316,6 +379,8 @@ def clean_copr(path, days=DEF_DAYS, verbose=True):
         if verbose:
             LOG.info('Removing: %s', dir_path)
         shutil.rmtree(dir_path)
+        if chroot_location:
+            inventory.remove_build_dirs(*chroot_location, [dir_name])
 
         # also remove the associated log in the main dir
         build_id = os.path.basename(dir_path).split('-')[0]
@@ -17,6 +17,7 @@ from copr_backend.helpers import (
     BackendConfigReader,
     get_redis_logger,
 )
+from copr_backend.inventory import get_initialized_inventory
 
 
 LOG = multiprocessing.log_to_stderr()
@@ -70,6 +71,33 @@ def print_remove_text(path, modified, stdout=False):
         LOG.info("Removing: %s  (%s)", path, date)
 
 
+def prune_inventory(inventory, days, dry_run=False, stdout=False):
+    """
+    Remove all the too old srpm-builds directories known to the resultdir
+    inventory, without walking the results directory.
+    """
+    too_old = datetime.now() - timedelta(days=days)
+    for record in inventory.build_dirs(chroot="srpm-builds",
+                                       older_than=too_old.timestamp()):
+        subdir = record["path"]
+        try:
+            modified = datetime.fromtimestamp(os.path.getmtime(subdir))
+        except FileNotFoundError:
+            modified = None
+
+        if modified is not None:
+            if modified >= too_old:
+                continue
+            print_remove_text(subdir, modified, stdout)
+
+        if dry_run:
+            continue
+        if modified is not None:
+            shutil.rmtree(subdir)
+        inventory.remove_build_dirs(record["owner"], record["project"],
+                                    record["chroot"], [record["builddir"]])
+
+
 def prune(path, days, dry_run=False, stdout=False):
     """
     Recursively go through the results directory and remove all stored SRPM
@@ -117,7 +145,11 @@ def main():
     opts = BackendConfigReader(config_file).read()
     days = args.days if args.days is not None else opts.prune_days
     redirect_logging(opts)
-    prune(opts.destdir, days, args.dry_run, args.stdout)
+    inventory = get_initialized_inventory(opts, LOG)
+    if inventory:
+        prune_inventory(inventory, days, args.dry_run, args.stdout)
+    else:
+        prune(opts.destdir, days, args.dry_run, args.stdout)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 # coding: utf-8
+import json
 import os
 import sys
 import shutil
@@ -10,6 +11,7 @@ import pytest
 from unittest import mock, skip
 from unittest.mock import MagicMock
 
+from copr_backend.exceptions import FrontendClientException
 from run.copr_prune_results import Pruner
 from run.copr_prune_results import main as prune_main
 
@@ -115,3 +117,56 @@ class TestPruneResults(object):
         prune_main()
 
         assert mc_bcr.call_args[0][0] == '<config_path>'
+
+    @mock.patch("{}.multiprocessing.Pool".format(MODULE_REF))
+    @mock.patch("{}.get_project_info".format(MODULE_REF))
+    def test_prefetched_prune_flags(self, mc_project_info, _mc_pool):
+        self.opts.frontend_auth = "<auth>"
+        pruner = Pruner(self.opts)
+        flags = {"persistent": False, "auto_prune": True, "devel_mode": False,
+                 "appstream": True}
+        response = MagicMock()
+        response.content = json.dumps([
+            dict(flags, ownername="clime", projectname="example"),
+            dict(flags, ownername="clime", projectname="motionpaint",
+                 persistent=True),
+        ])
+        pruner.frontend_client = MagicMock()
+        pruner.frontend_client.get.return_value = response
+        pruner.projects = pruner.get_projects_prune_flags()
+        pruner.chroots = {"epel-6-x86_64": {"final_prunerepo_done": False},
+                          "fedora-23-x86_64": {"final_prunerepo_done": False}}
+        pruner.mtime_optimization = False
+        pruner.maybe_async = MagicMock()
+
+        for projectdir in ["example", "motionpaint", "prunerepo"]:
+            owner = "@copr" if projectdir == "prunerepo" else "clime"
+            pruner.prune_project(
+                os.path.join(self.testresults_dir, owner, projectdir),
+                owner, projectdir)
+
+        # no per-project queries, motionpaint is persistent and
+        # @copr/prunerepo doesn't exist anymore
+        assert not mc_project_info.called
+        assert pruner.maybe_async.call_count == 1
+        args = pruner.maybe_async.call_args[0][1]
+        assert args[1:4] == ["clime", "example", "epel-6-x86_64"]
+        assert args[5] is True
+
+    @mock.patch("{}.multiprocessing.Pool".format(MODULE_REF))
+    @mock.patch("{}.get_project_info".format(MODULE_REF))
+    def test_prune_flags_fallback(self, mc_project_info, _mc_pool):
+        self.opts.frontend_auth = "<auth>"
+        pruner = Pruner(self.opts)
+        pruner.frontend_client = MagicMock()
+        pruner.frontend_client.get.side_effect = \
+            FrontendClientException("404 NOT FOUND")
+        assert pruner.get_projects_prune_flags() is None
+
+        mc_project_info.return_value = {"persistent": True}
+        pruner.maybe_async = MagicMock()
+        pruner.prune_project(
+            os.path.join(self.testresults_dir, "clime", "example"),
+            "clime", "example")
+        assert mc_project_info.call_count == 1
+        assert not pruner.maybe_async.called
@@ -1,6 +1,7 @@
 # pylint: disable=too-many-lines
 
 import os
+import hashlib
 import json
 import tempfile
 import shutil
@@ -22,6 +23,7 @@ from copr_common.enums import ActionTypeEnum, BackendResultEnum, StorageEnum
 from testlib.repodata import load_primary_xml
 from copr_backend.actions import Action
 from copr_backend.exceptions import CoprKeygenRequestError
+from copr_backend.manifest import MANIFEST_NAME, load_manifest, write_manifest
 
 
 RESULTS_ROOT_URL = "http://example.com/results"
@@ -137,15 +139,74 @@ class TestAction(object):
 
         self.dummy = str(test_action)
 
+    @mock.patch("copr_backend.actions.FrontendClient")
+    @mock.patch("copr_backend.actions.call_copr_repo", return_value=True)
+    @mock.patch("copr_backend.actions.resign_rpms")
+    def test_fork_manifest(self, mc_resign_rpms, _mc_call_repo, mc_frontend,
+                           mc_time):
+        mc_time.time.return_value = self.test_time
+        tmp_dir = self.make_temp_dir()
+        src = os.path.join(tmp_dir, "foo", "bar", "fedora-17-x86_64",
+                           "00000002-pkg1")
+        os.makedirs(src)
+        for name, content in [("pkg1.rpm", b"signed by foo/bar"),
+                              ("builder-live.log.gz", b"log")]:
+            with open(os.path.join(src, name), "wb") as fd:
+                fd.write(content)
+        original = write_manifest(src)
+
+        def _resign(_user, _project, rpms, *_args, **kwargs):
+            for rpm, _chroot in rpms:
+                with open(rpm, "wb") as fd:
+                    fd.write(b"signed by foo/fork")
+            kwargs["progress"](1, 1)
+        mc_resign_rpms.side_effect = _resign
+
+        self.opts.destdir = tmp_dir
+        test_action = Action.create_from(
+            opts=self.opts,
+            action={
+                "action_type": ActionTypeEnum("fork"),
+                "id": 1,
+                "object_type": "copr",
+                "data": json.dumps({
+                    "builds_map": {"fedora-17-x86_64": {
+                        "00000002-pkg1": "00000009-pkg1"}},
+                    "user": "foo",
+                    "copr": "fork",
+                }),
+                "old_value": "foo/bar",
+                "new_value": "foo/fork",
+            },
+        )
+        test_action.progress_period = 0
+        assert test_action.run() == BackendResultEnum("success")
+
+        # the manifest describes the re-signed RPM, source build untouched
+        dst = os.path.join(tmp_dir, "foo", "fork", "fedora-17-x86_64",
+                           "00000009-pkg1")
+        manifest = load_manifest(os.path.join(dst, MANIFEST_NAME))
+        assert manifest["files"]["pkg1.rpm"]["sha256"] == \
+            hashlib.sha256(b"signed by foo/fork").hexdigest()
+        assert load_manifest(os.path.join(src, MANIFEST_NAME)) == original
+
+        # the last progress message is replaced when finished
+        messages = [call[0][0]["actions"][0]["message"] for call in
+                    mc_frontend.return_value.update.call_args_list]
+        assert messages == ["Forked 1/1 builds", "Re-signed 1/1 RPMs",
+                            "Forked 1 builds, re-signed 1 RPMs"]
+
     @mock.patch("copr_backend.actions.os.makedirs")
-    @mock.patch("copr_backend.actions.copy_tree")
+    @mock.patch("copr_backend.actions.link_tree")
     @mock.patch("copr_backend.actions.os.path.exists")
-    @mock.patch("copr_backend.actions.unsign_rpms_in_dir")
+    @mock.patch("copr_backend.actions.resign_rpms")
     @mock.patch("copr_backend.helpers.subprocess.Popen")
-    def test_action_handle_forks(self, mc_popen, mc_unsign_rpms_in_dir,
-                                 mc_exists, mc_copy_tree, _mc_os_makedirs,
+    def test_action_handle_forks(self, mc_popen, mc_resign_rpms,
+                                 mc_exists, mc_link_tree, _mc_os_makedirs,
                                  mc_time):
         mc_popen.return_value.communicate.return_value = ("", "")
+        mc_link_tree.side_effect = lambda src, dst, private: [
+            os.path.join(dst, "foo.rpm")]
         mc_time.time.return_value = self.test_time
         mc_exists = True
         test_action = Action.create_from(
@@ -174,7 +235,7 @@ class TestAction(object):
             },
         )
         test_action.run()
-        calls = mc_copy_tree.call_args_list
+        calls = mc_link_tree.call_args_list
         assert len(calls) == 6
         assert calls[0][0] == (
             "/var/lib/copr/public_html/results/thrnciar/source-copr/srpm-builds/00000002",
@@ -195,6 +256,14 @@ class TestAction(object):
             "/var/lib/copr/public_html/results/thrnciar/source-copr/fedora-17-i386/00000005-pkg2",
             "/var/lib/copr/public_html/results/thrnciar/destination-copr/fedora-17-i386/00000010-pkg2")
 
+        # all the RPMs are re-signed in one batch
+        assert len(mc_resign_rpms.call_args_list) == 1
+        rpms = mc_resign_rpms.call_args[0][2]
+        assert len(rpms) == 6
+        assert rpms[0] == (
+            "/var/lib/copr/public_html/results/thrnciar/destination-copr/srpm-builds/00000009/foo.rpm",
+            "srpm-builds")
+
         # TODO: calling createrepo for srpm-builds is useless
         assert len(mc_popen.call_args_list) == 3
 
@@ -739,6 +808,62 @@ class TestAction(object):
         assert os.path.exists(chroot_dir)
         assert os.path.exists(pkg_build_3_dir)
 
+    @mock.patch("copr_backend.storage.call_copr_repo")
+    def test_delete_multiple_builds_bulk(self, mc_call_repo, mc_time):
+        mc_time.time.return_value = self.test_time
+        mc_call_repo.return_value = True
+
+        tmp_dir = self.make_temp_dir()
+        chroots = ["fedora-{}-x86_64".format(i) for i in range(20, 30)]
+        build_ids = [str(i) for i in range(1, 101)]
+        for chroot in chroots:
+            chroot_dir = os.path.join(tmp_dir, "foo", "bar", chroot)
+            os.makedirs(chroot_dir)
+            for build_id in build_ids:
+                log = "build-{:08d}.log".format(int(build_id))
+                with open(os.path.join(chroot_dir, log), "w") as fh:
+                    fh.write("log\n")
+            with open(os.path.join(chroot_dir, "build-999.log"), "w") as fh:
+                fh.write("log\n")
+
+        ext_data = json.dumps({
+            "ownername": "foo",
+            "projectname": "bar",
+            "appstream": True,
+            "devel": False,
+            "project_dirnames": {
+                "bar": {chroot: ["{:08d}-foo".format(int(build_id))
+                                 for build_id in build_ids]
+                        for chroot in chroots},
+            },
+            "build_ids": build_ids,
+        })
+
+        self.opts.destdir = tmp_dir
+        self.opts.delete_builds_workers = 3
+        test_action = Action.create_from(
+            opts=self.opts,
+            action={
+                "action_type": ActionTypeEnum("delete"),
+                "object_type": "builds",
+                "id": 7,
+                "data": ext_data,
+            },
+        )
+        with mock.patch.object(test_action, "report_progress") as progress:
+            assert test_action.run() == BackendResultEnum("success")
+
+        # one createrepo run per chroot, with all the subdirs
+        assert len(mc_call_repo.call_args_list) == len(chroots)
+        for call in mc_call_repo.call_args_list:
+            assert len(call[1]["delete"]) == len(build_ids)
+
+        assert progress.call_args_list[-1] == mock.call(
+            "Deleted builds in 10/10 chroots of bar")
+        for chroot in chroots:
+            assert os.listdir(os.path.join(tmp_dir, "foo", "bar", chroot)) \
+                == ["build-999.log"]
+
     # We want to test that ACR flag doesn't make any difference here, explicit
     # createrepo always works with non-devel directory.
     @pytest.mark.parametrize('devel', [False, True])
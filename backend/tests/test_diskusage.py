@@ -0,0 +1,147 @@
+"""
+Test the native `du -x` replacement
+"""
+
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from copr_backend.diskusage import (
+    DiskUsageScanner,
+    ScanState,
+    list_owners,
+    scan_owner,
+)
+
+
+FILES = [
+    "user1/foo/fedora-rawhide-x86_64/00000111-foo/foo-1.x86_64.rpm",
+    "user1/foo/fedora-rawhide-x86_64/00000111-foo/fedora-review/review.txt",
+    "user1/foo/srpm-builds/00000111/foo-1.src.rpm",
+    "user1/bar/epel-9-x86_64/00000222-bar/bar-1.x86_64.rpm",
+    "@group/baz/epel-9-x86_64/00000333-baz/baz-1.x86_64.rpm",
+]
+
+
+class TestDiskUsage:
+    def setup_method(self, _method):
+        self.workdir = tempfile.mkdtemp(prefix="copr-test-diskusage-")
+        self.resultdir = os.path.join(self.workdir, "results")
+        self.state_dir = os.path.join(self.workdir, "state")
+        for path in FILES:
+            path = os.path.join(self.resultdir, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fd:
+                fd.write(os.urandom(64 * 1024))
+
+    def teardown_method(self, _method):
+        shutil.rmtree(self.workdir)
+
+    def _blocks(self, relpath):
+        return os.lstat(os.path.join(self.resultdir, relpath)).st_blocks
+
+    def _scan_all(self, use_cache=True):
+        results = {}
+        for owner in list_owners(self.resultdir):
+            _, owner_results = scan_owner(self.resultdir, owner,
+                                          self.state_dir, use_cache)
+            results.update(owner_results)
+        return results
+
+    def test_results_depth(self):
+        assert list_owners(self.resultdir) == ["@group", "user1"]
+        results = self._scan_all()
+        assert set(results) == {
+            "@group", "@group/baz", "@group/baz/epel-9-x86_64",
+            "user1", "user1/foo", "user1/bar",
+            "user1/foo/fedora-rawhide-x86_64", "user1/foo/srpm-builds",
+            "user1/bar/epel-9-x86_64",
+        }
+        assert results["user1"] == sum(results[project] for project in
+                                       ["user1/foo", "user1/bar"]) \
+            + self._blocks("user1") // 2
+        assert results["user1/foo/srpm-builds"] >= 64
+
+    def test_hardlinks_counted_once(self):
+        before = self._scan_all()
+        os.link(os.path.join(self.resultdir, FILES[0]),
+                os.path.join(self.resultdir,
+                             "user1/bar/epel-9-x86_64/00000222-bar/hard.rpm"))
+        # the directory entry is added, but the file is counted only once
+        after = self._scan_all(use_cache=False)
+        assert after["user1"] - before["user1"] < 64
+        # .. also when the hardlinks are re-used from cache
+        assert self._scan_all() == after
+
+    def test_hardlinks_across_owners(self):
+        before = self._scan_all()
+        os.link(os.path.join(self.resultdir, FILES[0]),
+                os.path.join(self.resultdir,
+                             "@group/baz/epel-9-x86_64/00000333-baz/fork.rpm"))
+        # the forked file is charged to both the owners
+        after = self._scan_all(use_cache=False)
+        assert after["user1"] == before["user1"]
+        assert after["@group"] - before["@group"] >= 64
+
+    def test_cache_reused(self):
+        first = self._scan_all()
+        with mock.patch("copr_backend.diskusage.os.scandir",
+                        wraps=os.scandir) as scandir:
+            assert self._scan_all() == first
+            # only list_owners()
+            assert scandir.call_count == 1
+
+        # new build directory is noticed
+        path = os.path.join(self.resultdir,
+                            "user1/bar/epel-9-x86_64/00000444-bar/bar.rpm")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as fd:
+            fd.write(os.urandom(64 * 1024))
+        with mock.patch("copr_backend.diskusage.os.scandir",
+                        wraps=os.scandir) as scandir:
+            second = self._scan_all()
+            scanned = {os.path.relpath(call[0][0], self.resultdir)
+                       for call in scandir.call_args_list} - {"."}
+        assert scanned == {"user1/bar/epel-9-x86_64",
+                           "user1/bar/epel-9-x86_64/00000444-bar"}
+        assert second["user1/bar"] >= first["user1/bar"] + 64
+        assert second["@group"] == first["@group"]
+
+        # removed sub-directory is noticed
+        shutil.rmtree(os.path.join(self.resultdir, "user1/foo/srpm-builds"))
+        assert "user1/foo/srpm-builds" not in self._scan_all()
+
+    def test_resume(self):
+        state = ScanState(self.state_dir)
+        state.start_run()
+        scan_owner(self.resultdir, "user1", self.state_dir)
+        assert state.load_result("user1")["user1/foo"] > 0
+        assert state.load_result("@group") is None
+
+        # the interrupted run is resumed
+        state.start_run(resume=True)
+        assert state.load_result("user1") is not None
+        # .. or started from scratch
+        state.start_run()
+        assert state.load_result("user1") is None
+        # but the cache is kept
+        assert state.load_cache("user1")
+
+        state.drop_caches(keep=["@group"])
+        assert state.load_cache("user1") is None
+
+    def test_vanished_directory(self):
+        scanner = DiskUsageScanner()
+        path = os.path.join(self.resultdir, "user1")
+        real_scandir = os.scandir
+
+        def _scandir(directory):
+            if directory.endswith("00000111"):
+                raise FileNotFoundError(directory)
+            return real_scandir(directory)
+
+        with mock.patch("copr_backend.diskusage.os.scandir",
+                        side_effect=_scandir):
+            assert scanner.scan(path, "user1") > 0
+        assert "user1/foo/srpm-builds" in scanner.results
@@ -15,6 +15,7 @@ from copr_backend.helpers import (
     get_chroot_arch,
     get_redis_logger,
     format_filename,
+    link_tree,
 )
 from copr_backend.constants import LOG_REDIS_FIFO
 
@@ -148,3 +149,26 @@ class TestHelpers(object):
             assert _read(rpmfile_dst) == "rpmfile re-signed"
             # copied file is not affected
             assert _read(textfile_dst) == "text"
+
+    def test_link_tree(self):
+        with tempfile.TemporaryDirectory(prefix="copr-test-link") as workdir:
+            src = os.path.join(workdir, "src")
+            dst = os.path.join(workdir, "dst")
+            os.makedirs(os.path.join(src, "subdir"))
+            for name in ["subdir/test.txt", "test.rpm"]:
+                with open(os.path.join(src, name), "w") as fd:
+                    fd.write(name)
+
+            for _ in range(2):  # re-run works
+                cloned = link_tree(src, dst,
+                                   private=lambda p: p.endswith(".rpm"))
+                assert cloned == [os.path.join(dst, "test.rpm")]
+
+            # hardlinked
+            assert os.stat(os.path.join(src, "subdir/test.txt")).st_ino == \
+                os.stat(os.path.join(dst, "subdir/test.txt")).st_ino
+            # cloned RPM can be modified without affecting the source
+            with open(cloned[0], "w") as fd:
+                fd.write("re-signed")
+            with open(os.path.join(src, "test.rpm")) as fd:
+                assert fd.read() == "test.rpm"
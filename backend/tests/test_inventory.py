@@ -0,0 +1,152 @@
+"""
+Test the resultdir inventory
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from munch import Munch
+
+from copr_backend.inventory import (
+    ResultdirInventory,
+    get_initialized_inventory,
+    get_inventory,
+    is_build_dir_name,
+)
+from copr_backend.storage import BackendStorage
+
+
+PATHS = {
+    "user1/foo/srpm-builds/00000111/foo-1.src.rpm": 100,
+    "user1/foo/fedora-rawhide-x86_64/00000111-foo/foo-1.x86_64.rpm": 1000,
+    "user1/foo/fedora-rawhide-x86_64/00000111-foo/builder-live.log.gz": 10,
+    "user1/foo/fedora-rawhide-x86_64/repodata/repomd.xml": 5,
+    "user1/foo:pr:1/fedora-rawhide-x86_64/00000112-foo/foo-1.x86_64.rpm": 7,
+    "@group/bar/epel-9-x86_64/00000200-bar/bar-1.x86_64.rpm": 20,
+    "@group/bar/epel-9-x86_64/tmp/leftover": 1,
+}
+
+
+class TestInventory:
+    def setup_method(self, _method):
+        self.workdir = tempfile.mkdtemp(prefix="copr-test-inventory-")
+        self.destdir = os.path.join(self.workdir, "results")
+        for path, size in PATHS.items():
+            path = os.path.join(self.destdir, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fd:
+                fd.write(b"x" * size)
+        self.opts = Munch(
+            destdir=self.destdir,
+            resultdir_inventory=os.path.join(self.workdir, "inventory.sqlite"),
+        )
+
+    def teardown_method(self, _method):
+        shutil.rmtree(self.workdir)
+
+    def _inventory(self):
+        return ResultdirInventory(self.opts.resultdir_inventory, self.destdir)
+
+    def _build_dirs(self, inventory, **kwargs):
+        return sorted(os.path.relpath(record["path"], self.destdir)
+                      for record in inventory.build_dirs(**kwargs))
+
+    def test_build_dir_name(self):
+        assert is_build_dir_name("srpm-builds", "00000111")
+        assert is_build_dir_name("fedora-rawhide-x86_64", "00000111-foo")
+        assert not is_build_dir_name("fedora-rawhide-x86_64", "00000111")
+        assert not is_build_dir_name("fedora-rawhide-x86_64", "repodata")
+        assert not is_build_dir_name("epel-7-x86_64", "dahdi-tools-2.10.0-6.fc24")
+
+    def test_not_configured(self):
+        opts = Munch(destdir=self.destdir)
+        assert get_inventory(opts) is None
+        assert get_initialized_inventory(opts) is None
+        # not populated yet
+        assert get_inventory(self.opts) is not None
+        assert get_initialized_inventory(self.opts) is None
+
+    def test_rebuild_and_query(self):
+        inventory = self._inventory()
+        assert not inventory.initialized
+        assert inventory.rebuild() == 4
+        assert inventory.initialized
+        assert get_initialized_inventory(self.opts) is not None
+
+        assert self._build_dirs(inventory) == [
+            "@group/bar/epel-9-x86_64/00000200-bar",
+            "user1/foo/fedora-rawhide-x86_64/00000111-foo",
+            "user1/foo/srpm-builds/00000111",
+            "user1/foo:pr:1/fedora-rawhide-x86_64/00000112-foo",
+        ]
+        assert list(inventory.projects()) == [
+            ("@group", "bar"), ("user1", "foo"), ("user1", "foo:pr:1")]
+        assert list(inventory.sizes()) == [
+            ("@group", "bar", "epel-9-x86_64", 20),
+            ("user1", "foo", "fedora-rawhide-x86_64", 1010),
+            ("user1", "foo", "srpm-builds", 100),
+            ("user1", "foo:pr:1", "fedora-rawhide-x86_64", 7),
+        ]
+
+        old = time.time() - 3600 * 24 * 30
+        srpm_dir = os.path.join(self.destdir, "user1/foo/srpm-builds/00000111")
+        os.utime(srpm_dir, (old, old))
+        inventory.add_build_dir("user1", "foo", "srpm-builds", "00000111")
+        assert self._build_dirs(inventory, chroot="srpm-builds",
+                                older_than=time.time() - 3600) == [
+            "user1/foo/srpm-builds/00000111"]
+        assert self._build_dirs(inventory, older_than=old) == []
+
+    @mock.patch("copr_backend.inventory.QUERY_PAGE_SIZE", 2)
+    def test_build_dirs_paged(self):
+        inventory = self._inventory()
+        inventory.rebuild()
+        records = inventory.build_dirs()
+        assert next(records)["builddir"] == "00000200-bar"
+        # workers can update the inventory while we process the records
+        inventory.remove_project("user1", "foo:pr:1")
+        inventory.add_build_dir("@group", "bar", "epel-9-x86_64",
+                                "00000200-bar")
+        assert [record["builddir"] for record in records] == [
+            "00000111-foo", "00000111"]
+        assert len(self._build_dirs(inventory)) == 3
+
+    def test_rebuild_drops_stale(self):
+        inventory = self._inventory()
+        inventory.rebuild()
+        shutil.rmtree(os.path.join(self.destdir, "@group"))
+        assert inventory.rebuild() == 3
+        assert ("@group", "bar") not in list(inventory.projects())
+
+    def test_removals(self):
+        inventory = self._inventory()
+        inventory.rebuild()
+        inventory.remove_build_dirs("user1", "foo", "fedora-rawhide-x86_64",
+                                    ["00000111-foo"])
+        inventory.remove_chroot("@group", "bar", "epel-9-x86_64")
+        inventory.remove_project("user1", "foo:pr:1")
+        assert self._build_dirs(inventory) == [
+            "user1/foo/srpm-builds/00000111"]
+
+    def test_backend_storage_updates(self):
+        inventory = self._inventory()
+        inventory.rebuild()
+        storage = BackendStorage("user1", "foo", False, False, self.opts,
+                                 inventory.log)
+        storage.delete_project("foo:pr:1")
+        assert list(inventory.projects()) == [("@group", "bar"),
+                                              ("user1", "foo")]
+        storage.delete_repository("srpm-builds")
+        assert self._build_dirs(inventory, chroot="srpm-builds") == []
+
+    def test_broken_database(self):
+        with open(self.opts.resultdir_inventory, "w") as fd:
+            fd.write("this is not a database" * 100)
+        inventory = self._inventory()
+        # workers don't fail
+        assert inventory.add_build_dir("user1", "foo", "srpm-builds",
+                                       "00000111") is None
+        assert get_initialized_inventory(self.opts) is None
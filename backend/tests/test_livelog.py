@@ -0,0 +1,96 @@
+"""
+Test on-the-fly compression of the builder live log
+"""
+
+import gzip
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from unittest import mock
+
+from copr_backend.livelog import CompressingLogWriter, finish_compressed_log
+
+
+class TestCompressingLogWriter:
+    workdir = None
+
+    def setup_method(self, _method):
+        self.workdir = tempfile.mkdtemp(prefix="copr-backend-test-livelog-")
+        self.path = os.path.join(self.workdir, "builder-live.log")
+
+    def teardown_method(self, _method):
+        shutil.rmtree(self.workdir)
+
+    def test_plain_log_written(self):
+        with CompressingLogWriter(self.path) as writer:
+            writer.write(b"12345\n")
+            # users see the plain log while the build is running
+            with open(self.path, "rb") as fd:
+                assert fd.read() == b"12345\n"
+            writer.write(b"67890\n")
+        assert not os.path.exists(self.path + ".gz")
+
+        assert finish_compressed_log(self.path)
+        assert not os.path.exists(self.path)
+        assert not os.path.exists(self.path + ".gz.part")
+        with gzip.open(self.path + ".gz", "rb") as fd:
+            assert fd.read() == b"12345\n67890\n"
+
+    def test_single_member(self):
+        with CompressingLogWriter(self.path) as writer:
+            for i in range(1000):
+                writer.write("line {}\n".format(i).encode("utf-8"))
+        finish_compressed_log(self.path)
+        # one gzip header, i.e. an ordinary gzip file (not multi-member) that
+        # any HTTP client can decode
+        with open(self.path + ".gz", "rb") as fd:
+            data = fd.read()
+        assert data.count(b"\x1f\x8b\x08") == 1
+        result = subprocess.run(["gzip", "-dc", self.path + ".gz"],
+                                stdout=subprocess.PIPE, check=True)
+        assert result.stdout.decode("utf-8").splitlines()[-1] == "line 999"
+
+    def test_consume(self):
+        read_fd, write_fd = os.pipe()
+        with CompressingLogWriter(self.path) as writer:
+            thread = threading.Thread(target=writer.consume, args=(read_fd,))
+            thread.start()
+            with os.fdopen(write_fd, "w") as logfile:
+                for i in range(100):
+                    logfile.write("line {}\n".format(i))
+            thread.join()
+            os.close(read_fd)
+
+        expected = "".join(["line {}\n".format(i) for i in range(100)])
+        with open(self.path, "r") as fd:
+            assert fd.read() == expected
+        assert finish_compressed_log(self.path)
+        with gzip.open(self.path + ".gz", "rt") as fd:
+            assert fd.read() == expected
+
+    def test_finish_not_compressed(self):
+        with open(self.path, "w") as fd:
+            fd.write("not compressed\n")
+        assert not finish_compressed_log(self.path)
+        assert os.path.exists(self.path)
+
+    def test_consume_write_error(self):
+        read_fd, write_fd = os.pipe()
+        with CompressingLogWriter(self.path) as writer:
+            thread = threading.Thread(target=writer.consume, args=(read_fd,))
+            with mock.patch.object(writer, "write",
+                                   side_effect=OSError(28, "No space left")):
+                thread.start()
+                # more than the pipe buffer, the pipe keeps being drained
+                with os.fdopen(write_fd, "wb") as logfile:
+                    for _ in range(100):
+                        logfile.write(b"x" * 64 * 1024)
+                thread.join()
+            os.close(read_fd)
+
+        assert "No space left" in str(writer.error)
+        # the incomplete compressed log is dropped
+        assert not finish_compressed_log(self.path)
+        assert os.path.exists(self.path)
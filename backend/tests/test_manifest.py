@@ -0,0 +1,97 @@
+"""
+Test the results manifest handling
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from copr_backend.manifest import (
+    MANIFEST_NAME,
+    load_manifest,
+    missing_files,
+    verified_files,
+    write_manifest,
+)
+
+
+class TestManifest:
+    workdir = None
+
+    def setup_method(self, _method):
+        self.workdir = tempfile.mkdtemp(prefix="copr-backend-test-manifest-")
+        self.manifest = {"version": 1, "files": {}}
+        for relpath, content in [("success", b"done"),
+                                 ("sub/file", b"content"),
+                                 ("broken", b"good")]:
+            self.manifest["files"][relpath] = {
+                "size": len(content),
+                "sha256": hashlib.sha256(content).hexdigest(),
+            }
+        os.mkdir(os.path.join(self.workdir, "sub"))
+        for relpath, content in [("success", b"done"),
+                                 ("broken", b"evil")]:
+            with open(os.path.join(self.workdir, relpath), "wb") as fd:
+                fd.write(content)
+
+    def teardown_method(self, _method):
+        shutil.rmtree(self.workdir)
+
+    def test_missing_files(self):
+        assert missing_files(self.manifest, self.workdir) == \
+            ["broken", "sub/file"]
+
+    def test_invalid_path(self):
+        self.manifest["files"]["../../etc/passwd"] = {"size": 0, "sha256": ""}
+        with pytest.raises(ValueError):
+            missing_files(self.manifest, self.workdir)
+
+    def test_load_manifest(self):
+        path = os.path.join(self.workdir, "manifest.json")
+        assert load_manifest(path) is None
+        with open(path, "w") as fd:
+            fd.write("[]")
+        assert load_manifest(path) is None
+        with open(path, "w") as fd:
+            json.dump(self.manifest, fd)
+        assert load_manifest(path) == self.manifest
+
+    def test_write_manifest(self):
+        os.symlink("broken", os.path.join(self.workdir, "link"))
+        manifest = write_manifest(self.workdir)
+        assert manifest["published"]
+        assert sorted(manifest["files"]) == ["broken", "success"]
+        assert manifest["files"]["broken"] == {
+            "size": 4,
+            "sha256": hashlib.sha256(b"evil").hexdigest(),
+        }
+        path = os.path.join(self.workdir, MANIFEST_NAME)
+        assert load_manifest(path) == manifest
+        assert missing_files(manifest, self.workdir) == []
+
+        # e.g. the RPMs were re-signed, logs compressed
+        with open(os.path.join(self.workdir, "broken"), "wb") as fd:
+            fd.write(b"signed")
+        assert write_manifest(self.workdir)["files"]["broken"]["size"] == 6
+        assert sorted(os.listdir(self.workdir)) == [
+            "broken", "link", MANIFEST_NAME, "sub", "success"]
+
+    def test_reuse_verified(self):
+        manifest = write_manifest(self.workdir)
+        known = verified_files(manifest, self.workdir)
+        assert known["success"]["sha256"] == \
+            hashlib.sha256(b"done").hexdigest()
+        # pretend the checksum is known, not calculated again
+        known["success"]["sha256"] = "verified"
+        known["broken"]["sha256"] = "verified"
+        with open(os.path.join(self.workdir, "broken"), "wb") as fd:
+            fd.write(b"signed")
+        os.utime(os.path.join(self.workdir, "broken"), ns=(1, 1))
+        files = write_manifest(self.workdir, known)["files"]
+        assert files["success"]["sha256"] == "verified"
+        assert files["broken"]["sha256"] == \
+            hashlib.sha256(b"signed").hexdigest()
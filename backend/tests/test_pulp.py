@@ -4,6 +4,8 @@ Test Pulp client
 
 # pylint: disable=attribute-defined-outside-init
 
+from unittest import mock
+
 from copr_backend.pulp import PulpClient
 
 
@@ -37,3 +39,39 @@ class TestPulp:
         self.config["domain"] = "copr"
         assert client.url("api/v3/artifacts/")\
             == "http://pulp.fpo:24817/pulp/copr/api/v3/artifacts/"
+
+    @mock.patch("copr_backend.pulp.time.sleep")
+    def test_wait_for_finished_tasks(self, sleep):
+        client = PulpClient(self.config)
+        states = {
+            "/tasks/1/": ["running", "completed"],
+            "/tasks/2/": ["waiting", "running", "running", "failed"],
+        }
+
+        def _get(url, **_kwargs):
+            task = url[len(self.config["base_url"]):]
+            response = mock.MagicMock(ok=True)
+            response.json.return_value = {"state": states[task].pop(0)}
+            return response
+
+        with mock.patch.object(client.session, "get", side_effect=_get) as get:
+            responses = client.wait_for_finished_tasks(["/tasks/1/",
+                                                        "/tasks/2/"])
+        assert responses["/tasks/1/"].json()["state"] == "completed"
+        assert responses["/tasks/2/"].json()["state"] == "failed"
+        # finished tasks are not polled anymore
+        assert get.call_count == 6
+        assert [call[0][0] for call in sleep.call_args_list] == [0.5, 1, 2]
+
+    @mock.patch("copr_backend.pulp.time.sleep")
+    def test_wait_for_finished_tasks_timeout(self, sleep):
+        client = PulpClient(self.config)
+        response = mock.MagicMock(ok=True)
+        response.json.return_value = {"state": "running"}
+        with mock.patch.object(client.session, "get", return_value=response):
+            with mock.patch("copr_backend.pulp.time.time",
+                            side_effect=[0, 10, 100]):
+                responses = client.wait_for_finished_tasks(["/tasks/1/"],
+                                                           timeout=50)
+        assert responses["/tasks/1/"].json()["state"] == "running"
+        assert sleep.call_count == 1
@@ -0,0 +1,116 @@
+"""
+Test coalescing of Pulp publications
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import testlib
+
+from copr_common.redis_helpers import get_redis_connection
+from copr_backend.helpers import BackendConfigReader
+from copr_backend.pulp_publish import BatchedPublication
+from copr_backend.storage import PulpStorage
+
+# pylint: disable=attribute-defined-outside-init
+
+REPOSITORY = "/pulp/api/v3/repositories/rpm/rpm/0190-aaaa/"
+
+
+class TestBatchedPublication:
+    def setup_method(self):
+        self.workdir = tempfile.mkdtemp(prefix="copr-batched-pulp-test-")
+        self.config_file = testlib.minimal_be_config(self.workdir, {
+            "redis_db": 9,
+            "redis_port": 7777,
+            "pulp_publish_delay": 0,
+        })
+        self.config = BackendConfigReader(self.config_file).read()
+        self.redis = get_redis_connection(self.config)
+        self.redis.flushdb()
+        self.environ = mock.patch.dict(
+            os.environ, {"COPR_TESTSUITE_LOCKPATH": self.workdir})
+        self.environ.start()
+
+    def teardown_method(self):
+        self.environ.stop()
+        shutil.rmtree(self.workdir)
+        self.redis.flushdb()
+
+    def _batch(self, repository=REPOSITORY):
+        return BatchedPublication(repository, logging.getLogger(),
+                                  backend_opts=self.config)
+
+    def _other_request(self, pid, repository=REPOSITORY, done=False):
+        key = "pulp_publish_batched::{}::{}".format(repository, pid)
+        self.redis.hset(key, "requested", 0)
+        if done:
+            self.redis.hset(key, "status", "success")
+        return key
+
+    def test_publish_others(self):
+        waiting = [self._other_request(1), self._other_request(2)]
+        self._other_request(3, done=True)
+        self._other_request(4, repository="/other/")
+
+        callback = mock.MagicMock(return_value=True)
+        assert self._batch().publish(callback)
+        assert callback.call_count == 1
+        for key in waiting:
+            assert self.redis.hget(key, "status") == "success"
+        # our request is dropped, other repositories untouched
+        assert len(self.redis.keys("*{}*".format(REPOSITORY))) == 3
+        assert self.redis.hget("pulp_publish_batched::/other/::4",
+                               "status") is None
+
+    def test_published_by_other(self):
+        batch = self._batch()
+
+        def _others_published(_seconds):
+            self.redis.hset(batch.key, "status", "success")
+
+        callback = mock.MagicMock()
+        with mock.patch("copr_backend.pulp_publish.time.sleep",
+                        side_effect=_others_published):
+            assert batch.publish(callback)
+        assert callback.call_count == 0
+        assert self.redis.keys() == []
+
+    def test_failure_not_reported(self):
+        key = self._other_request(1)
+        assert not self._batch().publish(lambda: False)
+        assert self.redis.hget(key, "status") is None
+        assert self.redis.keys() == [key]
+
+    def test_noop(self):
+        batch = BatchedPublication(REPOSITORY, logging.getLogger())
+        assert batch.noop
+        callback = mock.MagicMock(return_value=True)
+        assert batch.publish(callback)
+        assert callback.call_count == 1
+        assert batch.pending() == []
+
+
+@mock.patch("copr_backend.storage.BatchedPublication")
+def test_storage_batch_only_for_builds(batched):
+    storage = PulpStorage.__new__(PulpStorage)
+    storage.opts = {"pulp_publish_delay": 5}
+    storage.log = logging.getLogger()
+    with mock.patch.object(storage, "_get_repository",
+                           return_value=REPOSITORY), \
+         mock.patch.object(storage, "_publish",
+                           return_value=True) as publish:
+        # e.g. delete_builds(), published right away
+        assert storage.publish_repository("fedora-rawhide-x86_64")
+        assert publish.call_args_list == [
+            mock.call("fedora-rawhide-x86_64", REPOSITORY)]
+        assert batched.call_count == 0
+
+        # finished build
+        batched.return_value.publish.return_value = True
+        assert storage.publish_repository("fedora-rawhide-x86_64", batch=True)
+        assert batched.call_args[0][0] == REPOSITORY
+        assert batched.return_value.publish.call_count == 1
@@ -13,6 +13,7 @@ from copr_backend.sign import (
     get_pubkey, _sign_one, sign_rpms_in_dir, create_user_keys,
     gpg_hashtype_for_chroot,
     call_sign_bin,
+    resign_rpms,
 )
 
 STDOUT = "stdout"
@@ -301,6 +302,44 @@ class TestSign(object):
 
         assert mc_so.called
 
+    @mock.patch("copr_backend.sign._unsign_one")
+    @mock.patch("copr_backend.sign._sign_one")
+    @mock.patch("copr_backend.sign.create_user_keys")
+    @mock.patch("copr_backend.sign.get_pubkey")
+    def test_resign_rpms(self, mc_gp, mc_cuk, mc_so, mc_uo):
+        self.opts.do_sign = True
+        rpms = [("/path/{}.rpm".format(i), "epel-7-x86_64")
+                for i in range(10)]
+        progress = MagicMock()
+        resign_rpms(self.username, self.projectname, rpms, self.opts,
+                    log=MagicMock(), workers=3, progress=progress)
+
+        assert mc_gp.called
+        assert not mc_cuk.called
+        assert sorted(call[0][0] for call in mc_uo.call_args_list) == \
+            sorted(rpm for rpm, _ in rpms)
+        assert mc_so.call_count == 10
+        assert mc_so.call_args[0][1] == self.usermail
+        assert mc_so.call_args[0][2] == "sha256"
+        assert progress.call_args[0] == (10, 10)
+
+    @mock.patch("copr_backend.sign._unsign_one")
+    @mock.patch("copr_backend.sign._sign_one")
+    @mock.patch("copr_backend.sign.get_pubkey")
+    def test_resign_rpms_errors(self, mc_gp, mc_so, mc_uo):
+        self.opts.do_sign = False
+        mc_uo.side_effect = [None, CoprSignError("foobar"), None]
+        rpms = [("/path/{}.rpm".format(i), "fedora-36-x86_64")
+                for i in range(3)]
+        with pytest.raises(CoprSignError) as err:
+            resign_rpms(self.username, self.projectname, rpms, self.opts,
+                        log=MagicMock())
+        assert "/path/1.rpm" in str(err)
+        assert "/path/0.rpm" not in str(err)
+        # signing disabled
+        assert not mc_gp.called
+        assert not mc_so.called
+
 
 def test_chroot_gpg_hashes():
     chroots = [
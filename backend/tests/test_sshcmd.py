@@ -2,7 +2,13 @@
 Test the SSHConnection class
 """
 
-from copr_backend.sshcmd import SSHConnection
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from copr_backend.sshcmd import SSHConnection, SSHConnectionError
 
 def test_ipv4_ipv6_rsync():
     connection = SSHConnection(
@@ -14,3 +20,33 @@ def test_ipv4_ipv6_rsync():
         "test", "192.168.0.1", config_file="something",
     )
     assert connection._full_source_path("/xyz") == "test@192.168.0.1:/xyz"
+
+
+class _LocalConnection(SSHConnection):
+    """ Run the "remote" commands locally """
+    def _ssh_base(self):
+        return ["sh", "-c"]
+
+
+def test_tar_download():
+    workdir = tempfile.mkdtemp(prefix="copr-backend-test-sshcmd-")
+    src = os.path.join(workdir, "src")
+    dest = os.path.join(workdir, "dest")
+    os.makedirs(os.path.join(src, "sub"))
+    os.makedirs(dest)
+    for relpath in ["a", "sub/b", "c"]:
+        with open(os.path.join(src, relpath), "w") as fd:
+            fd.write(relpath)
+
+    connection = _LocalConnection()
+    connection.tar_download(src, dest, files=["sub/b", "c"], logfile="log")
+    assert sorted(os.listdir(dest)) == ["c", "log", "sub"]
+
+    connection.tar_download(src, dest)
+    with open(os.path.join(dest, "sub", "b")) as fd:
+        assert fd.read() == "sub/b"
+    assert sorted(os.listdir(dest)) == ["a", "c", "log", "sub"]
+
+    with pytest.raises(SSHConnectionError):
+        connection.tar_download(src, dest, files=["nonexistent"])
+    shutil.rmtree(workdir)
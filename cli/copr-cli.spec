@@ -6,7 +6,7 @@
 %global with_python3 1
 %endif
 
-%global min_python_copr_version 1.128.1
+%global min_python_copr_version 2.1
 
 Name:       copr-cli
 Version:    2.0
@@ -23,8 +23,6 @@ Source0:    %name-%version.tar.gz
 
 BuildArch:  noarch
 
-Requires:      wget
-
 BuildRequires: asciidoc
 BuildRequires: libxslt
 BuildRequires: util-linux
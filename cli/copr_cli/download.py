@@ -0,0 +1,244 @@
+# coding: utf-8
+
+"""
+Download the build results in parallel, the `copr-cli download-build` logic
+"""
+
+import fnmatch
+import hashlib
+import logging
+import os
+import time
+
+import humanize
+import requests
+
+from copr.v3.bulk import run_concurrently
+
+try:
+    from html.parser import HTMLParser
+except ImportError:
+    from HTMLParser import HTMLParser
+
+try:
+    from urllib.parse import urljoin, unquote
+except ImportError:
+    from urlparse import urljoin
+    from urllib import unquote
+
+log = logging.getLogger(__name__)
+
+
+MANIFEST_NAME = "manifest.json"
+CONCURRENCY = 8
+BLOCKSIZE = 1024 * 1024
+
+REVIEW_FILES = ["licensecheck.txt", "review.txt", "review.json", "rpmlint.txt"]
+
+
+class DownloadError(Exception):
+    """
+    Failed to download (or verify) one of the result files
+    """
+
+
+class _LinkParser(HTMLParser):
+    # pylint: disable=abstract-method
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        href = dict(attrs).get("href")
+        if href:
+            self.links.append(href)
+
+
+def _list_directory(session, url, prefix=""):
+    """
+    Recursively scrape the HTML index of the URL directory (this is a fallback
+    for older builds that don't have the manifest), and return the dict of
+    `{relpath: None}`.
+    """
+    response = session.get(url)
+    response.raise_for_status()
+    parser = _LinkParser()
+    parser.feed(response.text)
+    files = {}
+    for href in parser.links:
+        if "?" in href or href.startswith(("/", "..", "#")) or "://" in href:
+            # sorting links, parent directory, absolute URLs
+            continue
+        name = unquote(href)
+        if name.endswith("/"):
+            files.update(_list_directory(session, urljoin(url, href),
+                                         prefix + name))
+        else:
+            files[prefix + name] = None
+    return files
+
+
+def get_result_files(session, result_url):
+    """
+    Return `{relpath: info}` dict of all the files in the chroot's
+    RESULT_URL directory.  The info is `{"size": .., "sha256": ..}` dict
+    taken from the results manifest, or None if the build has no manifest
+    published by copr-backend.  The manifest generated by copr-rpmbuild (older
+    builds, or the backend didn't finish the build yet) describes the files
+    before the RPMs were signed and the logs compressed, so it is ignored.
+    """
+    response = session.get(urljoin(result_url, MANIFEST_NAME))
+    if response.status_code == 200:
+        try:
+            manifest = response.json()
+            if manifest.get("published"):
+                return manifest["files"]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            log.warning("Invalid results manifest in %s", result_url)
+    return _list_directory(session, result_url)
+
+
+def filter_files(files, rpms=False, spec=False, logs=False, review=False):
+    """
+    Return only the relpaths from FILES requested by the command-line options,
+    or all the files if no option is specified.
+    """
+    patterns = []
+    if rpms:
+        patterns.append("*.rpm")
+    if spec:
+        patterns.append("*.spec")
+    if logs:
+        patterns.append("*.log.gz")
+
+    selected = []
+    for relpath in sorted(files):
+        if not patterns and not review:
+            selected.append(relpath)
+            continue
+        basename = os.path.basename(relpath)
+        if any(fnmatch.fnmatch(basename, pattern) for pattern in patterns):
+            selected.append(relpath)
+        elif review and relpath.startswith("fedora-review/") and (
+                basename in REVIEW_FILES or "/files.dir/" in relpath):
+            selected.append(relpath)
+    return selected
+
+
+def file_checksum(path):
+    """
+    Return sha256 hexdigest of the given file
+    """
+    checksum = hashlib.sha256()
+    with open(path, "rb") as fd:
+        while True:
+            block = fd.read(BLOCKSIZE)
+            if not block:
+                break
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+def _is_complete(path, info):
+    if not os.path.exists(path):
+        return False
+    return os.path.getsize(path) == info["size"] \
+        and file_checksum(path) == info["sha256"]
+
+
+def download_file(session, url, path, info=None):
+    """
+    Download URL to PATH, and return the number of transferred bytes.  Files
+    which were partially downloaded before are resumed.  If INFO (size and
+    checksum) is known, already downloaded files are skipped and the
+    downloaded file is verified.
+    """
+    if info and _is_complete(path, info):
+        return 0
+
+    dirname = os.path.dirname(path)
+    if not os.path.isdir(dirname):
+        try:
+            os.makedirs(dirname)
+        except OSError:
+            # another thread might have created it
+            if not os.path.isdir(dirname):
+                raise
+
+    offset = os.path.getsize(path) if os.path.exists(path) else 0
+    if info and offset > info["size"]:
+        offset = 0
+    headers = {"Range": "bytes={0}-".format(offset)} if offset else {}
+
+    transferred = 0
+    response = session.get(url, headers=headers, stream=True)
+    try:
+        if response.status_code == 416 and not info:
+            # We don't know the size, but there's nothing more to download
+            return 0
+        if response.status_code not in [200, 206]:
+            raise DownloadError("Can not download {0}: {1} {2}".format(
+                url, response.status_code, response.reason))
+
+        mode = "ab" if response.status_code == 206 else "wb"
+        with open(path, mode) as fd:
+            for chunk in response.iter_content(BLOCKSIZE):
+                fd.write(chunk)
+                transferred += len(chunk)
+    finally:
+        response.close()
+
+    if info and not _is_complete(path, info):
+        os.unlink(path)
+        raise DownloadError("Checksum of {0} doesn't match, removed".format(path))
+    log.info("Downloaded %s", path)
+    return transferred
+
+
+def download_build_results(session, chroots, dest, concurrency=CONCURRENCY,
+                           **filters):
+    """
+    Download the results of all CHROOTS (build chroots from APIv3)
+    concurrently into the DEST/<chroot.name> directories, return True if all
+    the files were successfully downloaded.  The FILTERS keyword arguments are
+    passed down to `filter_files()`.
+    """
+    tasks = []
+    listed = True
+    for chroot in chroots:
+        result_url = chroot.result_url.rstrip("/") + "/"
+        try:
+            files = get_result_files(session, result_url)
+        except requests.RequestException as ex:
+            log.error("Can not list results in %s: %s", result_url, ex)
+            listed = False
+            continue
+        for relpath in filter_files(files, **filters):
+            if os.path.isabs(relpath) or ".." in relpath.split("/"):
+                log.error("Skipping invalid path %s", relpath)
+                listed = False
+                continue
+            tasks.append((
+                urljoin(result_url, relpath),
+                os.path.join(dest, chroot.name, relpath),
+                files[relpath],
+            ))
+
+    start = time.time()
+    results = run_concurrently(lambda task: download_file(session, *task),
+                               tasks, concurrency)
+    took = time.time() - start
+
+    transferred = 0
+    for result in results:
+        if not result.ok:
+            log.error("%s", result.exception)
+            continue
+        transferred += result.result
+
+    log.info("Downloaded %s files (%s) in %.1fs, %s/s",
+             len(tasks), humanize.naturalsize(transferred), took,
+             humanize.naturalsize(transferred / max(took, 0.001)))
+    return listed and all(result.ok for result in results)
@@ -7,35 +7,32 @@ import datetime
 import logging
 import os
 import re
-import subprocess
 import sys
 import time
 import warnings
 from collections import defaultdict
 
-import requests
-
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    BeautifulSoup = None
-
 try:
     import argcomplete
 except ImportError:
     argcomplete = None
 
+# Keep the imports here cheap, `copr-cli` is often executed many times in
+# a row (in scripts).  The heavy modules (the HTTP stack, templating, ...)
+# are imported lazily by the actions that need them.
+# pylint: disable=import-outside-toplevel
+
 import copr.exceptions as copr_exceptions
 from copr.v3 import (
-    Client, config_from_file, CoprException, CoprRequestException,
+    config_from_file, CoprException, CoprRequestException,
     CoprConfigException, CoprNoResultException, CoprAuthException,
 )
+from copr.v3.helpers import Backoff, get_build_states
 from copr.v3.pagination import next_page
 from copr_cli.helpers import cli_use_output_format, print_project_info
 from copr_cli.monitor import cli_monitor_parser
 from copr_cli.printers import cli_get_output_printer as get_printer
 from copr_cli.util import get_progress_callback, serializable, package_version
-from .build_config import MockProfile
 
 
 try:
@@ -140,7 +137,17 @@ class Commands(object):
             # default (unless user explicitly says otherwise).
             self.config["gssapi"] = True
         self.config["connection_attempts"] = 3
-        self.client = Client(self.config)
+        self._client = None
+
+    @property
+    def client(self):
+        """
+        The API client, created on the first use
+        """
+        if not self._client:
+            from copr.v3.client import Client
+            self._client = Client(self.config)
+        return self._client
 
     @property
     def username(self):
@@ -224,6 +231,7 @@ class Commands(object):
         """
         :param build_ids: list of build IDs
         """
+        import requests
         print("Watching build(s): (this may be safely interrupted)")
 
         prevstatus = defaultdict(lambda: None)
@@ -232,39 +240,45 @@ class Commands(object):
 
         watched = set(build_ids)
         done = set()
+        # Poll often when the states are changing, and less frequently when
+        # nothing is happening
+        backoff = Backoff(5, 30)
 
         try:
             while watched != done:
-                for build_id in watched:
-                    if build_id in done:
-                        continue
-                    try:
-                        build_details = self.client.build_proxy.get(build_id=build_id)
-                    except requests.ConnectionError as e:
-                        raise CoprRequestException(e)
-                    now = datetime.datetime.now()
-                    if prevstatus[build_id] != build_details.state:
-                        prevstatus[build_id] = build_details.state
+                changed = False
+                try:
+                    # all the states at once, in one request
+                    states = get_build_states(self.client.build_proxy,
+                                              watched - done)
+                except requests.ConnectionError as e:
+                    raise CoprRequestException(e)
+                now = datetime.datetime.now()
+                for build_id in sorted(states):
+                    state = states[build_id]
+                    if prevstatus[build_id] != state:
+                        prevstatus[build_id] = state
+                        changed = True
                         print("  {0} Build {2}: {1}".format(
                             now.strftime("%H:%M:%S"),
-                            build_details.state, build_id))
+                            state, build_id))
                         sys.stdout.flush()
 
-                    if build_details.state in ["failed"]:
+                    if state in ["failed"]:
                         failed_ids.append(build_id)
-                    if build_details.state in ["canceled"]:
+                    if state in ["canceled"]:
                         canceled_ids.append(build_id)
-                    if build_details.state in ["succeeded", "skipped",
-                                               "failed", "canceled"]:
+                    if state in ["succeeded", "skipped",
+                                 "failed", "canceled"]:
                         done.add(build_id)
-                    if build_details.state == "unknown":
+                    if state == "unknown":
                         raise copr_exceptions.CoprBuildException(
                             "Unknown status.")
 
                 if watched == done:
                     break
 
-                time.sleep(30)
+                time.sleep(backoff.next(changed))
 
             exception_message = ""
             separator = ""
@@ -605,6 +619,7 @@ class Commands(object):
         ownername, projectname = self.parse_name(args.project)
         build_config = self.client.project_chroot_proxy.get_build_config(ownername, projectname, args.chroot)
         build_config.rootdir = "{0}-{1}_{2}".format(ownername.replace("@", "group_"), projectname, args.chroot)
+        from copr_cli.build_config import MockProfile
         print(MockProfile(build_config))
 
     def action_list(self, args):
@@ -635,10 +650,10 @@ class Commands(object):
         print(build.state)
 
     def action_download_build(self, args):
-        build = self.client.build_proxy.get(args.build_id)
-        base_len = len(os.path.split(build.repo_url))
+        from copr_cli.download import download_build_results
         build_chroots = self.client.build_chroot_proxy.get_list(args.build_id)
 
+        chroots = []
         for chroot in build_chroots:
             if args.chroots and chroot.name not in args.chroots:
                 continue
@@ -646,32 +661,13 @@ class Commands(object):
             if not chroot.result_url:
                 sys.stderr.write("No data for build id: {} and chroot: {}.\n".format(args.build_id, chroot.name))
                 continue
+            chroots.append(chroot)
 
-            cmd = ['wget', '-r', '-nH', '--no-parent', '--reject', '"index.html*"', '-e', 'robots=off', '--no-verbose']
-            cmd.extend(['-P', os.path.join(args.dest, chroot.name)])
-            cmd.extend(['--cut-dirs', str(base_len + 4)])
-
-            if args.rpms:
-                cmd.extend(["-A", "*.rpm"])
-
-            if args.spec:
-                cmd.extend(["-A", "*.spec"])
-
-            if args.logs:
-                cmd.extend(["-A", "*.log.gz"])
-
-            if args.review:
-                cmd.extend([
-                    "-A", "files.dir",
-                    "-A", "licensecheck.txt",
-                    "-A", "review.txt",
-                    "-A", "review.json",
-                    "-A", "rpmlint.txt",
-                ])
-                cmd.append(chroot.result_url + "fedora-review")
-
-            cmd.append(chroot.result_url)
-            subprocess.call(cmd)
+        if not download_build_results(self.client.build_proxy.session,
+                                      chroots, args.dest, rpms=args.rpms,
+                                      spec=args.spec, logs=args.logs,
+                                      review=args.review):
+            sys.exit(1)
 
     @requires_api_auth
     def action_cancel(self, args):
@@ -1930,7 +1926,10 @@ def setup_logging(debug):
     stderr.setLevel(logging.INFO)
     formatter = logging.Formatter("%(levelname)s: %(message)s")
     stderr.setFormatter(formatter)
-    log.addHandler(stderr)
+    # the copr_cli.main logger, and the other copr_cli modules (download)
+    logger = logging.getLogger("copr_cli")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(stderr)
 
 
 def str2bool(v):
@@ -1950,10 +1949,11 @@ def _handle_frontend_api_request_error(e, args):
         return
 
     page_content = e.result.__response__.content
-    if BeautifulSoup:
+    try:
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(page_content, features="html.parser")
         page_content = soup.get_text()
-    else:
+    except ImportError:
         page_content = re.sub(r'<.*?>', '', page_content.decode("utf-8"))
 
     sys.stderr.write(
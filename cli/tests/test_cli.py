@@ -1,5 +1,6 @@
 import os
 import argparse
+import hashlib
 import json
 import logging
 import shutil
@@ -372,80 +373,157 @@ def test_delete_project(config_from_file, project_proxy_delete, capsys):
     assert out == "Project foo has been deleted.\n"
 
 
-@mock.patch('copr_cli.main.subprocess')
-@mock.patch('copr.v3.proxies.build.BuildProxy.get')
-@mock.patch('copr.v3.proxies.build_chroot.BuildChrootProxy.get_list')
-@mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
-def test_download_build(config_from_file, build_chroot_proxy_get_list, build_proxy_get, mock_sp, capsys):
-    build_proxy_get.return_value = MagicMock(
-        repo_url="http://example.com/results/epel-6-x86_64/python-copr-1.50-1.fc20")
-
-    mock_ch1 = MagicMock()
-    mock_ch1.configure_mock(
-        name="epel-6-x86_64",
-        result_url="http://example.com/results/epel-6-x86_64/python-copr-1.50-1.fc20")
-
-    mock_ch2 = MagicMock()
-    mock_ch2.configure_mock(
-        name="epel-6-i386",
-        result_url="http://example.com/results/epel-6-i386/python-copr-1.50-1.fc20")
-    build_chroot_proxy_get_list.return_value = [mock_ch1, mock_ch2]
-
-    mock_sp.call.return_value = None
-    main.main(argv=["download-build", "foo"])
-    stdout, stderr = capsys.readouterr()
-
-    expected_sp_call_args = [
-        mock.call([
-            'wget', '-r', '-nH', '--no-parent', '--reject', '"index.html*"',
-            '-e', 'robots=off', '--no-verbose', '-P', './epel-6-x86_64',
-            '--cut-dirs', '6',
-            'http://example.com/results/epel-6-x86_64/python-copr-1.50-1.fc20'
-        ]),
-        mock.call([
-            'wget', '-r', '-nH', '--no-parent', '--reject', '"index.html*"',
-            '-e', 'robots=off', '--no-verbose', '-P', './epel-6-i386',
-            '--cut-dirs', '6',
-            'http://example.com/results/epel-6-i386/python-copr-1.50-1.fc20'
-        ])
-    ]
-
-    for call_args_list in mock_sp.call.call_args_list:
-        assert call_args_list in expected_sp_call_args
+class TestDownloadBuild(object):
+    results = "http://example.com/results/@copr/foo/{0}/00000123-hello/"
+    files = {
+        "hello-1.0-1.src.rpm": b"source rpm",
+        "hello-1.0-1.x86_64.rpm": b"binary rpm",
+        "builder-live.log.gz": b"log",
+        "fedora-review/review.txt": b"review",
+    }
 
+    def setup_method(self, _method):
+        self.tmpdir = tempfile.mkdtemp(prefix="test-download-build")
+        self.ranges = []
 
-@mock.patch('copr_cli.main.subprocess')
-@mock.patch('copr.v3.proxies.build.BuildProxy.get')
-@mock.patch('copr.v3.proxies.build_chroot.BuildChrootProxy.get_list')
-@mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
-def test_download_build_select_chroot(config_from_file, build_chroot_proxy_get_list, build_proxy_get, mock_sp, capsys):
-    build_proxy_get.return_value = MagicMock(
-        repo_url="http://example.com/results/epel-6-x86_64/python-copr-1.50-1.fc20")
-
-    mock_ch1 = MagicMock()
-    mock_ch1.configure_mock(
-        name="epel-6-x86_64",
-        result_url="http://example.com/results/epel-6-x86_64/python-copr-1.50-1.fc20")
-
-    mock_ch2 = MagicMock()
-    mock_ch2.configure_mock(
-        name="epel-6-i386",
-        result_url="http://example.com/results/epel-6-i386/python-copr-1.50-1.fc20")
-    build_chroot_proxy_get_list.return_value = [mock_ch1, mock_ch2]
-
-    mock_sp.call.return_value = None
-    main.main(argv=["download-build", "foo", "-r", "epel-6-x86_64"])
-    stdout, stderr = capsys.readouterr()
-    expected_sp_call_args = [
-        mock.call([
-            'wget', '-r', '-nH', '--no-parent', '--reject', '"index.html*"',
-            '-e', 'robots=off', '--no-verbose', '-P', u'./epel-6-x86_64',
-            '--cut-dirs', '6',
-            'http://example.com/results/epel-6-x86_64/python-copr-1.50-1.fc20'
-        ]),
-    ]
+    def teardown_method(self, _method):
+        shutil.rmtree(self.tmpdir)
 
-    assert mock_sp.call.call_args_list == expected_sp_call_args
+    def _chroots(self, names):
+        return [Munch(name=name, result_url=self.results.format(name))
+                for name in names]
+
+    def _file_callback(self, content):
+        def _callback(request):
+            header = request.headers.get("Range")
+            self.ranges.append(header)
+            if header:
+                offset = int(header.split("=")[1].rstrip("-"))
+                return (206, {}, content[offset:])
+            return (200, {}, content)
+        return _callback
+
+    def _add_chroot(self, name, manifest=True, broken=None, published=True):
+        url = self.results.format(name)
+        if manifest and published:
+            files = {
+                relpath: {"size": len(content),
+                          "sha256": hashlib.sha256(content).hexdigest()}
+                for relpath, content in self.files.items()
+            }
+            responses.add(responses.GET, url + "manifest.json",
+                          json={"version": 1, "published": True,
+                                "files": files})
+        else:
+            if manifest:
+                # builder-side manifest, unsigned RPMs and uncompressed logs
+                files = {
+                    "hello-1.0-1.src.rpm": {"size": 1, "sha256": "unsigned"},
+                    "builder-live.log": {"size": 1, "sha256": "plain"},
+                }
+                responses.add(responses.GET, url + "manifest.json",
+                              json={"version": 1, "files": files})
+            else:
+                responses.add(responses.GET, url + "manifest.json", status=404)
+            responses.add(responses.GET, url, body=(
+                '<a href="../">../</a><a href="?C=M">sort</a>'
+                '<a href="fedora-review/">fedora-review/</a>'
+                '<a href="hello-1.0-1.src.rpm">x</a>'
+                '<a href="hello-1.0-1.x86_64.rpm">x</a>'
+                '<a href="builder-live.log.gz">x</a>'))
+            responses.add(responses.GET, url + "fedora-review/",
+                          body='<a href="review.txt">review.txt</a>')
+        for relpath, content in self.files.items():
+            if relpath == broken:
+                content = b"broken"
+            responses.add_callback(responses.GET, url + relpath,
+                                   callback=self._file_callback(content))
+
+    def _downloaded(self, chroot):
+        result = {}
+        for root, _, files in os.walk(os.path.join(self.tmpdir, chroot)):
+            for name in files:
+                path = os.path.join(root, name)
+                relpath = os.path.relpath(path, os.path.join(self.tmpdir, chroot))
+                with open(path, "rb") as fd:
+                    result[relpath] = fd.read()
+        return result
+
+    @responses.activate
+    @mock.patch('copr.v3.proxies.build_chroot.BuildChrootProxy.get_list')
+    @mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
+    def test_download_build(self, _config_from_file, get_list):
+        get_list.return_value = self._chroots(["fedora-rawhide-x86_64",
+                                               "epel-7-x86_64"])
+        self._add_chroot("fedora-rawhide-x86_64")
+        self._add_chroot("epel-7-x86_64", manifest=False)
+        main.main(argv=["download-build", "123", "-d", self.tmpdir])
+        assert self._downloaded("fedora-rawhide-x86_64") == self.files
+        assert self._downloaded("epel-7-x86_64") == self.files
+
+    @responses.activate
+    @mock.patch('copr.v3.proxies.build_chroot.BuildChrootProxy.get_list')
+    @mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
+    def test_download_build_builder_manifest(self, _config_from_file, get_list,
+                                             capsys):
+        get_list.return_value = self._chroots(["fedora-rawhide-x86_64"])
+        self._add_chroot("fedora-rawhide-x86_64", published=False)
+        main.main(argv=["download-build", "123", "-d", self.tmpdir, "--logs"])
+        assert self._downloaded("fedora-rawhide-x86_64") == {
+            "builder-live.log.gz": b"log",
+        }
+        stderr = capsys.readouterr().err
+        assert "INFO: Downloaded {0}".format(os.path.join(
+            self.tmpdir, "fedora-rawhide-x86_64", "builder-live.log.gz")) in stderr
+        assert "INFO: Downloaded 1 files (3 Bytes)" in stderr
+
+    @responses.activate
+    @mock.patch('copr.v3.proxies.build_chroot.BuildChrootProxy.get_list')
+    @mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
+    def test_download_build_select_chroot(self, _config_from_file, get_list):
+        get_list.return_value = self._chroots(["fedora-rawhide-x86_64",
+                                               "epel-7-x86_64"])
+        self._add_chroot("fedora-rawhide-x86_64")
+        main.main(argv=["download-build", "123", "-d", self.tmpdir,
+                        "-r", "fedora-rawhide-x86_64", "--rpms", "--review"])
+        assert os.listdir(self.tmpdir) == ["fedora-rawhide-x86_64"]
+        assert sorted(self._downloaded("fedora-rawhide-x86_64")) == [
+            "fedora-review/review.txt",
+            "hello-1.0-1.src.rpm",
+            "hello-1.0-1.x86_64.rpm",
+        ]
+
+    @responses.activate
+    @mock.patch('copr.v3.proxies.build_chroot.BuildChrootProxy.get_list')
+    @mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
+    def test_download_build_resume(self, _config_from_file, get_list):
+        get_list.return_value = self._chroots(["fedora-rawhide-x86_64"])
+        self._add_chroot("fedora-rawhide-x86_64")
+        os.makedirs(os.path.join(self.tmpdir, "fedora-rawhide-x86_64"))
+        for relpath, content in [("hello-1.0-1.src.rpm", b"source rpm"),
+                                 ("hello-1.0-1.x86_64.rpm", b"binary")]:
+            path = os.path.join(self.tmpdir, "fedora-rawhide-x86_64", relpath)
+            with open(path, "wb") as fd:
+                fd.write(content)
+        main.main(argv=["download-build", "123", "-d", self.tmpdir, "--rpms"])
+        # the complete file is not downloaded again, the other one resumed
+        assert self.ranges == ["bytes=6-"]
+        assert self._downloaded("fedora-rawhide-x86_64") == {
+            "hello-1.0-1.src.rpm": b"source rpm",
+            "hello-1.0-1.x86_64.rpm": b"binary rpm",
+        }
+
+    @responses.activate
+    @mock.patch('copr.v3.proxies.build_chroot.BuildChrootProxy.get_list')
+    @mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
+    def test_download_build_checksum(self, _config_from_file, get_list, caplog):
+        get_list.return_value = self._chroots(["fedora-rawhide-x86_64"])
+        self._add_chroot("fedora-rawhide-x86_64", broken="hello-1.0-1.src.rpm")
+        with pytest.raises(SystemExit) as exc:
+            main.main(argv=["download-build", "123", "-d", self.tmpdir])
+        assert exit_wrap(exc.value) == 1
+        assert "hello-1.0-1.src.rpm doesn't match" in caplog.text
+        assert "hello-1.0-1.src.rpm" not in self._downloaded("fedora-rawhide-x86_64")
 
 
 @mock.patch('copr.v3.proxies.project.ProjectProxy.add')
@@ -623,16 +701,22 @@ def test_create_build_no_wait_error(watch_builds, config_from_file,
     assert not watch_builds.called
 
 
+def _states(state_map):
+    """ Fake BuildProxy.get_states() output """
+    return Munch(builds=[{"id": build_id, "state": state}
+                         for build_id, state in state_map.items()])
+
+
 @mock.patch('copr_cli.main.time')
 @mock.patch('copr.v3.proxies.build.BuildProxy.check_before_build')
 @mock.patch('copr.v3.proxies.build.BuildProxy.create_from_url')
-@mock.patch('copr.v3.proxies.build.BuildProxy.get')
+@mock.patch('copr.v3.proxies.build.BuildProxy.get_states')
 @mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
 def test_create_build_wait_succeeded_no_sleep(config_from_file, build_proxy_get,
                                               create_from_url, _check_before_build,
                                               mock_time, capsys):
     create_from_url.return_value = Munch(projectname="foo", id=123)
-    build_proxy_get.return_value = Munch(state="succeeded")
+    build_proxy_get.return_value = Munch(builds=[{"id": 123, "state": "succeeded"}])
     main.main(argv=[
         "build",
         "copr_name", "http://example.com/pkgs.srpm"
@@ -647,11 +731,14 @@ def test_create_build_wait_succeeded_no_sleep(config_from_file, build_proxy_get,
 @mock.patch('copr.v3.proxies.build.BuildProxy.check_before_build')
 @mock.patch('copr.v3.proxies.build.BuildProxy.create_from_url')
 @mock.patch('copr.v3.proxies.build.BuildProxy.get')
+@mock.patch('copr.v3.proxies.build.BuildProxy.get_states')
 @mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
-def test_create_build_wait_error_status(config_from_file, build_proxy_get,
-                                        create_from_url, _check_before_build,
-                                        capsys):
+def test_create_build_wait_error_status(config_from_file, build_proxy_get_states,
+                                        build_proxy_get, create_from_url,
+                                        _check_before_build, capsys):
     create_from_url.return_value = Munch(projectname="foo", id=123)
+    # e.g. old frontend, fallback to build_proxy.get()
+    build_proxy_get_states.side_effect = copr.v3.CoprRequestException()
     build_proxy_get.side_effect = copr.v3.CoprRequestException()
     with pytest.raises(SystemExit) as err:
         main.main(argv=[
@@ -667,13 +754,13 @@ def test_create_build_wait_error_status(config_from_file, build_proxy_get,
 
 @mock.patch('copr.v3.proxies.build.BuildProxy.check_before_build')
 @mock.patch('copr.v3.proxies.build.BuildProxy.create_from_url')
-@mock.patch('copr.v3.proxies.build.BuildProxy.get')
+@mock.patch('copr.v3.proxies.build.BuildProxy.get_states')
 @mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
 def test_create_build_wait_unknown_build_status(config_from_file, build_proxy_get,
                                                 create_from_url, _check_before_build,
                                                 capsys):
     create_from_url.return_value = Munch(projectname="foo", id=123)
-    build_proxy_get.return_value = Munch(state="unknown")
+    build_proxy_get.return_value = Munch(builds=[{"id": 123, "state": "unknown"}])
     with pytest.raises(SystemExit) as err:
         main.main(argv=[
             "build",
@@ -688,7 +775,7 @@ def test_create_build_wait_unknown_build_status(config_from_file, build_proxy_ge
 
 @mock.patch('copr.v3.proxies.build.BuildProxy.check_before_build')
 @mock.patch('copr.v3.proxies.build.BuildProxy.create_from_url')
-@mock.patch('copr.v3.proxies.build.BuildProxy.get')
+@mock.patch('copr.v3.proxies.build.BuildProxy.get_states')
 @mock.patch('copr_cli.main.config_from_file', return_value=mock_config)
 def test_create_build_wait_keyboard_interrupt(config_from_file, build_proxy_get,
                                               create_from_url, _check_before_build,
@@ -712,7 +799,7 @@ class TestCreateBuild(object):
 
     @mock.patch('copr.v3.proxies.build.BuildProxy.check_before_build')
     @mock.patch('copr.v3.proxies.build.BuildProxy.create_from_url')
-    @mock.patch('copr.v3.proxies.build.BuildProxy.get')
+    @mock.patch('copr.v3.proxies.build.BuildProxy.get_states')
     def test_create_build_wait_succeeded_complex(self, build_proxy_get,
                                                  create_from_url,
                                                  _check_before_build,
@@ -724,18 +811,18 @@ class TestCreateBuild(object):
         def incr(*args, **kwargs):
             self.stage += 1
 
-        def result_map(*args, **kwargs):
+        def result_map(build_ids):
             if self.stage == 0:
-                return Munch(state="pending")
+                return _states({build_id: "pending" for build_id in build_ids})
             elif self.stage == 1:
                 smap = {0: "pending", 1: "starting", 2: "running"}
-                return Munch(state=smap[kwargs["build_id"]])
+                return _states({build_id: smap[build_id] for build_id in build_ids})
             elif self.stage == 2:
                 smap = {0: "starting", 1: "running", 2: "succeeded"}
-                return Munch(state=smap[kwargs["build_id"]])
+                return _states({build_id: smap[build_id] for build_id in build_ids})
             elif self.stage == 3:
                 smap = {0: "skipped", 1: "succeeded", 2: "succeeded"}
-                return Munch(state=smap[kwargs["build_id"]])
+                return _states({build_id: smap[build_id] for build_id in build_ids})
 
         mock_time.sleep.side_effect = incr
         build_proxy_get.side_effect = result_map
@@ -752,7 +839,7 @@ class TestCreateBuild(object):
 
     @mock.patch('copr.v3.proxies.build.BuildProxy.check_before_build')
     @mock.patch('copr.v3.proxies.build.BuildProxy.create_from_url')
-    @mock.patch('copr.v3.proxies.build.BuildProxy.get')
+    @mock.patch('copr.v3.proxies.build.BuildProxy.get_states')
     def test_create_build_wait_failed_complex(self, build_proxy_get,
                                               create_from_url, _check_before_build,
                                               config_from_file,
@@ -763,18 +850,18 @@ class TestCreateBuild(object):
         def incr(*args, **kwargs):
             self.stage += 1
 
-        def result_map(*args, **kwargs):
+        def result_map(build_ids):
             if self.stage == 0:
-                return Munch(state="pending")
+                return _states({build_id: "pending" for build_id in build_ids})
             elif self.stage == 1:
                 smap = {0: "pending", 1: "starting", 2: "running"}
-                return Munch(state=smap[kwargs["build_id"]])
+                return _states({build_id: smap[build_id] for build_id in build_ids})
             elif self.stage == 2:
                 smap = {0: "failed", 1: "running", 2: "succeeded"}
-                return Munch(state=smap[kwargs["build_id"]])
+                return _states({build_id: smap[build_id] for build_id in build_ids})
             elif self.stage == 3:
                 smap = {0: "failed", 1: "failed", 2: "succeeded"}
-                return Munch(state=smap[kwargs["build_id"]])
+                return _states({build_id: smap[build_id] for build_id in build_ids})
 
         mock_time.sleep.side_effect = incr
         build_proxy_get.side_effect = result_map
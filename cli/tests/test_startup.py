@@ -0,0 +1,59 @@
+"""
+Guard the `copr-cli` start-up time, the heavy modules are supposed to be
+imported only by the commands which need them.
+"""
+
+import os
+import subprocess
+import sys
+
+
+HEAVY_MODULES = [
+    "requests",
+    "jinja2",
+    "bs4",
+    "copr.v3.client",
+    "copr.v3.proxies",
+    "copr_cli.download",
+]
+
+# Milliseconds, cumulative `import copr_cli.main` time as reported by
+# `python -X importtime`.  Typically ~100ms, the budget is generous to not
+# fail on slow builders.
+IMPORT_BUDGET = 500
+
+
+def _run_python(*args):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    process = subprocess.Popen([sys.executable] + list(args), env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               universal_newlines=True)
+    stdout, stderr = process.communicate()
+    assert process.returncode == 0, stderr
+    return stdout, stderr
+
+
+def test_heavy_modules_not_imported():
+    stdout, _ = _run_python("-c", (
+        "import sys\n"
+        "import copr_cli.main\n"
+        "copr_cli.main.setup_parser()\n"
+        "print('\\n'.join(sys.modules))\n"
+    ))
+    imported = set(stdout.split())
+    assert "copr_cli.main" in imported
+    assert not imported & set(HEAVY_MODULES)
+
+
+def test_import_time_budget():
+    if sys.version_info < (3, 7):
+        return
+    _, stderr = _run_python("-X", "importtime", "-c", "import copr_cli.main")
+    for line in stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == "copr_cli.main":
+            cumulative_ms = int(fields[1]) / 1000.0
+            assert cumulative_ms < IMPORT_BUDGET
+            return
+    assert False, "copr_cli.main not found in the importtime output"
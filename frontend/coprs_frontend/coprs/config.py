@@ -68,6 +68,12 @@ class Config(object):
 
     STORAGE_DIR = "/var/lib/copr/data/srpm_storage/"
 
+    # The maximum size of one chunk for the chunked (resumable) uploads
+    UPLOAD_CHUNK_SIZE = 64 * 1024 * 1024
+
+    # How many forked builds are sent to backend in one fork action
+    FORK_ACTION_CHUNK_SIZE = 1000
+
     LAYOUT_OVERVIEW_HIDE_QUICK_ENABLE = False
 
     # We enable authentication against FAS by default.
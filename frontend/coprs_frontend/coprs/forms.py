@@ -1438,6 +1438,18 @@ class BuildFormUploadFactory(object):
         return form
 
 
+class BuildFormChunkedUploadFactory(object):
+    """
+    Build from a file previously uploaded in chunks
+    """
+    def __new__(cls, active_chroots):
+        form = _get_build_form(active_chroots, BaseForm)
+        form.upload_id = wtforms.StringField(
+            "Upload ID",
+            validators=[wtforms.validators.DataRequired()])
+        return form
+
+
 class BuildFormCustomFactory(object):
     def __new__(cls, active_chroots, package=None):
         return _get_build_form(active_chroots, PackageFormCustom, package)
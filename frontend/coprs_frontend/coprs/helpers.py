@@ -741,7 +741,9 @@ def db_column_length(column):
 
 def streamed_json(stream, start_string=None, stop_string=None):
     """
-    Flask response generator for JSON structures (arrays only for now)
+    Flask response generator for JSON structures (arrays only for now).  The
+    STOP_STRING may be a callable, called once the STREAM is exhausted (e.g.
+    to append some metadata calculated while iterating).
     """
 
     start_string = start_string or "["
@@ -756,7 +758,7 @@ def streamed_json(stream, start_string=None, stop_string=None):
                 first = False
             else:
                 yield ",\n" + json.dumps(item)
-        yield stop_string
+        yield stop_string() if callable(stop_string) else stop_string
 
     def _batched_stream(count=100):
         """
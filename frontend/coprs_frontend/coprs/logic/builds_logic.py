@@ -1,7 +1,9 @@
+import fcntl
 import tempfile
 import shutil
 import json
 import os
+import re
 import pprint
 import time
 import requests
@@ -32,6 +34,7 @@ from coprs.exceptions import (
     MalformedArgumentException,
     UnrepeatableBuildException,
     ObjectNotFound,
+    AccessRestricted,
 )
 
 from coprs.logic import coprs_logic
@@ -47,6 +50,11 @@ from coprs.measure import checkpoint
 from .helpers import get_graph_parameters
 log = app.logger
 
+# Chunked uploads, see BuildsLogic.start_chunked_upload()
+UPLOAD_META = ".upload.json"
+UPLOAD_PART = ".part"
+UPLOAD_BLOCKSIZE = 1024 * 1024
+
 
 PROCESSING_STATES = [StatusEnum(s) for s in [
     "running", "pending", "starting", "importing", "waiting",
@@ -474,6 +482,33 @@ class BuildsLogic(object):
     def get_multiple(cls):
         return models.Build.query.order_by(models.Build.id.desc())
 
+    @classmethod
+    def get_states(cls, build_ids=None, batch_id=None):
+        """
+        Return the `{build_id: state}` dictionary for all the builds in
+        BUILD_IDS list, and all the builds in the BATCH_ID.  Only the columns
+        needed for calculating the build state are loaded.
+        """
+        conditions = []
+        if build_ids:
+            conditions.append(models.Build.id.in_(build_ids))
+        if batch_id is not None:
+            conditions.append(models.Build.batch_id == batch_id)
+        if not conditions:
+            return {}
+
+        query = (
+            models.Build.query
+            .options(
+                load_only(models.Build.id, models.Build.canceled,
+                          models.Build.source_status),
+                selectinload(models.Build.build_chroots)
+                .load_only(models.BuildChroot.status),
+            )
+            .filter(or_(*conditions))
+        )
+        return {build.id: build.state for build in query}
+
     @classmethod
     def get_multiple_by_copr(cls, copr):
         """ Get collection of builds in copr sorted by build_id descending
@@ -688,7 +723,6 @@ class BuildsLogic(object):
         tmp = None
         try:
             tmp = tempfile.mkdtemp(dir=app.config["STORAGE_DIR"])
-            tmp_name = os.path.basename(tmp)
             filename = secure_filename(orig_filename)
             file_path = os.path.join(tmp, filename)
             save_form_file_field_to(form_field, file_path)
@@ -697,6 +731,20 @@ class BuildsLogic(object):
                 shutil.rmtree(tmp)
             raise InsufficientStorage("Can not create storage directory for uploaded file: {}".format(str(error)))
 
+        return cls._create_new_from_stored_upload(
+            user, copr, tmp, filename, chroot_names=chroot_names,
+            copr_dirname=copr_dirname, **build_options)
+
+    @classmethod
+    def _create_new_from_stored_upload(cls, user, copr, tmp, filename,
+                                       chroot_names=None, copr_dirname=None,
+                                       **build_options):
+        """
+        Create a build from the uploaded FILENAME, already stored in the TMP
+        directory (in STORAGE_DIR)
+        """
+        tmp_name = os.path.basename(tmp)
+
         # make the pkg public
         pkg_url = "{baseurl}/tmp/{tmp_dir}/{filename}".format(
             baseurl=app.config["PUBLIC_COPR_BASE_URL"],
@@ -718,6 +766,134 @@ class BuildsLogic(object):
 
         return build
 
+    @classmethod
+    def start_chunked_upload(cls, user, filename, size):
+        """
+        Prepare a new directory in STORAGE_DIR for an upload done in multiple
+        chunks (see `append_upload_chunk()`), and return its description
+        (the `get_chunked_upload()` format).
+        """
+        filename = secure_filename(filename or "")
+        if not filename.lower().endswith((".src.rpm", ".nosrc.rpm", ".spec")):
+            raise BadRequest("You can upload only .src.rpm, .nosrc.rpm, and "
+                             ".spec files")
+        if size is None or size < 0:
+            raise BadRequest("Invalid upload size: {}".format(size))
+
+        tmp = None
+        try:
+            tmp = tempfile.mkdtemp(dir=app.config["STORAGE_DIR"])
+            with open(os.path.join(tmp, UPLOAD_META), "w") as fd:
+                json.dump({"user_id": user.id, "filename": filename,
+                           "size": size}, fd)
+            with open(os.path.join(tmp, filename + UPLOAD_PART), "wb"):
+                pass
+        except OSError as error:
+            if tmp:
+                shutil.rmtree(tmp)
+            raise InsufficientStorage("Can not create storage directory for uploaded file: {}".format(str(error)))
+        return cls.get_chunked_upload(user, os.path.basename(tmp))
+
+    @classmethod
+    def _chunked_upload_meta(cls, user, upload_id):
+        """
+        Return (directory, metadata) pair for a chunked upload started by USER
+        """
+        if not re.match(r"^tmp\w+$", upload_id or ""):
+            raise ObjectNotFound("Upload {} doesn't exist".format(upload_id))
+        tmp = os.path.join(app.config["STORAGE_DIR"], upload_id)
+        try:
+            with open(os.path.join(tmp, UPLOAD_META), "r") as fd:
+                meta = json.load(fd)
+        except (OSError, ValueError) as error:
+            raise ObjectNotFound("Upload {} doesn't exist".format(upload_id)) from error
+        if meta["user_id"] != user.id:
+            raise AccessRestricted("Upload {} was not started by you"
+                                   .format(upload_id))
+        return tmp, meta
+
+    @classmethod
+    def get_chunked_upload(cls, user, upload_id):
+        """
+        Describe the chunked upload; the already received (acknowledged)
+        OFFSET is the place where the client continues uploading.
+        """
+        tmp, meta = cls._chunked_upload_meta(user, upload_id)
+        part = os.path.join(tmp, meta["filename"] + UPLOAD_PART)
+        return {
+            "upload_id": upload_id,
+            "filename": meta["filename"],
+            "size": meta["size"],
+            "offset": os.path.getsize(part),
+            "chunk_size": app.config["UPLOAD_CHUNK_SIZE"],
+        }
+
+    @classmethod
+    def append_upload_chunk(cls, user, upload_id, offset, stream, length):
+        """
+        Append LENGTH bytes read from the STREAM to the chunked upload.  The
+        OFFSET needs to match the already received size (so the retried
+        chunks are not appended twice).
+        """
+        upload = cls.get_chunked_upload(user, upload_id)
+        if length is None or length > upload["chunk_size"]:
+            raise BadRequest("The chunk size needs to be specified, and at "
+                             "most {} bytes".format(upload["chunk_size"]))
+        if offset + length > upload["size"]:
+            raise BadRequest("The chunk exceeds the upload size")
+
+        tmp = os.path.join(app.config["STORAGE_DIR"], upload_id)
+        part = os.path.join(tmp, upload["filename"] + UPLOAD_PART)
+        received = 0
+        try:
+            with open(part, "ab") as fd:
+                # concurrent (retried) requests for the same upload
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                current = os.fstat(fd.fileno()).st_size
+                if offset != current:
+                    raise ConflictingRequest(
+                        "Upload {} continues at offset {}, not {}".format(
+                            upload_id, current, offset))
+                while received < length:
+                    block = stream.read(min(UPLOAD_BLOCKSIZE, length - received))
+                    if not block:
+                        break
+                    fd.write(block)
+                    received += len(block)
+                if received != length:
+                    # don't acknowledge incomplete chunks
+                    fd.truncate(offset)
+        except OSError as error:
+            raise InsufficientStorage("Can not store the uploaded chunk: {}"
+                                      .format(str(error))) from error
+        if received != length:
+            raise BadRequest("Incomplete chunk, received {} of {} bytes"
+                             .format(received, length))
+        upload["offset"] = offset + length
+        return upload
+
+    @classmethod
+    def create_new_from_chunked_upload(cls, user, copr, upload_id,
+                                       chroot_names=None, copr_dirname=None,
+                                       **build_options):
+        """
+        Create a build from a completely uploaded file, see
+        `start_chunked_upload()`.
+        """
+        upload = cls.get_chunked_upload(user, upload_id)
+        if upload["offset"] != upload["size"]:
+            raise BadRequest("Upload {} is not complete, {} of {} bytes "
+                             "received".format(upload_id, upload["offset"],
+                                               upload["size"]))
+        tmp = os.path.join(app.config["STORAGE_DIR"], upload_id)
+        filename = upload["filename"]
+        os.rename(os.path.join(tmp, filename + UPLOAD_PART),
+                  os.path.join(tmp, filename))
+        os.unlink(os.path.join(tmp, UPLOAD_META))
+        return cls._create_new_from_stored_upload(
+            user, copr, tmp, filename, chroot_names=chroot_names,
+            copr_dirname=copr_dirname, **build_options)
+
     @classmethod
     def create_new(cls, user, copr, source_type, source_json, chroot_names=None, pkgs="",
                    git_hashes=None, skip_import=False, background=False, batch=None,
@@ -1398,6 +1574,76 @@ class BuildsLogic(object):
     def filter_by_package_name(cls, query, package_name):
         return query.join(models.Package).filter(models.Package.name == package_name)
 
+    @classmethod
+    def filter_by_status(cls, query, status):
+        """
+        Filter the builds by their textual status (e.g. "failed").  The
+        `models.Build.status` property is not a database column, so this
+        re-implements the very same logic in SQL (keep them in sync!).
+        Thanks to that we don't have to load all the builds (and their build
+        chroots) from database, and filter them in Python.
+        """
+        if status not in StatusEnum.vals:
+            return query.filter(false())
+
+        if status == "canceled":
+            return query.filter(models.Build.canceled.is_(True))
+
+        def chroot_exists(*states):
+            return (
+                models.BuildChroot.query
+                .filter(models.BuildChroot.build_id == models.Build.id)
+                .filter(models.BuildChroot.status.in_(
+                    [StatusEnum(state) for state in states]))
+                .exists()
+            )
+
+        any_chroot_exists = (
+            models.BuildChroot.query
+            .filter(models.BuildChroot.build_id == models.Build.id)
+            .exists()
+        )
+
+        use_src_states = ["starting", "pending", "running", "importing", "failed"]
+        use_chroot_states = ["running", "starting", "pending", "failed",
+                             "succeeded", "skipped", "forked"]
+        use_src = models.Build.source_status.in_(
+            [StatusEnum(state) for state in use_src_states])
+
+        conditions = []
+        if status in use_src_states:
+            conditions.append(models.Build.source_status == StatusEnum(status))
+
+        chroot_condition = None
+        if status in use_chroot_states:
+            # the first state (by priority) found in build chroots wins
+            higher = use_chroot_states[:use_chroot_states.index(status)]
+            chroot_condition = chroot_exists(status)
+            if higher:
+                chroot_condition = and_(chroot_condition,
+                                        not_(chroot_exists(*higher)))
+            if status == "pending":
+                chroot_condition = or_(
+                    chroot_condition,
+                    and_(chroot_exists("waiting"),
+                         not_(chroot_exists(*use_chroot_states))))
+        elif status == "waiting":
+            # no build chroots at all
+            chroot_condition = not_(any_chroot_exists)
+        elif status == "unknown":
+            chroot_condition = and_(
+                any_chroot_exists,
+                not_(chroot_exists("waiting", *use_chroot_states)))
+
+        if chroot_condition is not None:
+            conditions.append(and_(not_(use_src), chroot_condition))
+
+        if not conditions:
+            return query.filter(false())
+
+        return query.filter(models.Build.canceled.isnot(True),
+                            or_(*conditions))
+
     @classmethod
     def clean_old_builds(cls):
         dirs = (
@@ -1577,10 +1823,14 @@ class BuildChrootResultsLogic:
             {"packages": [{"name": "foo", "epoch": 0, ...}]}
 
         and records all of the built packages for a given `BuildChroot`.
+        Only the NEVRA fields are stored, the other package fields from
+        results.json (e.g. filename, size, sha256) are ignored.
         """
         if results is None or "packages" not in results:
             return []
-        return [cls.create(build_chroot, **result)
+        nevra = ["name", "epoch", "version", "release", "arch"]
+        return [cls.create(build_chroot,
+                           **{key: result[key] for key in nevra})
                 for result in results["packages"]]
 
 
@@ -153,36 +153,29 @@ class ComplexLogic(object):
         if fcopr.full_name == copr.full_name:
             raise exceptions.DuplicateException("Source project should not be same as destination")
 
-        builds_map = {}
-        srpm_builds_src = []
-        srpm_builds_dst = []
+        fpackages = forking.fork_packages(copr.packages, fcopr)
+        last_successful = \
+            PackagesLogic.last_successful_build_chroots_in_copr(copr)
 
+        to_fork = []
         for package in copr.packages:
-            fpackage = forking.fork_package(package, fcopr)
-
-            builds = PackagesLogic.last_successful_build_chroots(package)
-            if not builds:
-                continue
+            # {build: [build_chroot, ...]}, as last_successful_build_chroots()
+            builds = {}
+            for chroot in package.chroots:
+                build_chroot = last_successful.get((package.id, chroot.id))
+                if build_chroot:
+                    builds.setdefault(build_chroot.build, []).append(build_chroot)
 
             for build, build_chroots in builds.items():
-                fbuild = forking.fork_build(build, fcopr, fpackage, build_chroots)
-
-                if build.result_dir:
-                    srpm_builds_src.append(build.result_dir)
-                    srpm_builds_dst.append(fbuild.result_dir)
-
-                for chroot, fchroot in zip(build_chroots, fbuild.build_chroots):
-                    if not chroot.result_dir:
-                        continue
-                    if chroot.name not in builds_map:
-                        builds_map[chroot.name] = {chroot.result_dir: fchroot.result_dir}
-                    else:
-                        builds_map[chroot.name][chroot.result_dir] = fchroot.result_dir
-
-        builds_map['srpm-builds'] = dict(zip(srpm_builds_src, srpm_builds_dst))
-
-        db.session.commit()
-        ActionsLogic.send_fork_copr(copr, fcopr, builds_map)
+                to_fork.append((build, build_chroots, fpackages[package.name]))
+
+        # The builds are forked (and sent to backend) in chunks, so we don't
+        # hold one long transaction, nor generate one giant action
+        chunks = list(batched(to_fork, app.config["FORK_ACTION_CHUNK_SIZE"]))
+        for chunk in chunks or [[]]:
+            builds_map = forking.fork_builds(chunk, fcopr)
+            db.session.commit()
+            ActionsLogic.send_fork_copr(copr, fcopr, builds_map)
         return fcopr, created
 
     @staticmethod
@@ -550,6 +543,65 @@ class ProjectForking(object):
             db.session.add(fpackage)
         return fpackage
 
+    def fork_packages(self, packages, fcopr):
+        """
+        Bulk variant of fork_package(), return {package_name: fpackage}
+        """
+        # the new fcopr needs an ID
+        db.session.flush()
+        fpackages = {fpackage.name: fpackage
+                     for fpackage in PackagesLogic.get_all(fcopr.id)}
+        for package in packages:
+            if package.name in fpackages:
+                continue
+            fpackage = self.create_object(models.Package, package, exclude=["id", "copr_id", "webhook_rebuild"])
+            fpackage.copr = fcopr
+            db.session.add(fpackage)
+            fpackages[package.name] = fpackage
+        return fpackages
+
+    def fork_builds(self, to_fork, fcopr):
+        """
+        Bulk variant of fork_build().  Fork the (build, build_chroots, fpackage)
+        tuples in TO_FORK into FCOPR, with only one INSERT round for builds and
+        one for build chroots.  Return the builds_map for the fork action.
+        """
+        copr_chroots = {copr_chroot.mock_chroot_id: copr_chroot
+                        for copr_chroot in fcopr.copr_chroots}
+
+        fbuilds = []
+        for build, _, fpackage in to_fork:
+            fbuild = self.create_object(models.Build, build, exclude=["id", "copr_id", "copr_dir_id", "package_id", "result_dir"])
+            fbuild.copr = fcopr
+            fbuild.package = fpackage
+            fbuild.copr_dir = fcopr.main_dir
+            fbuild.source_status = StatusEnum("forked")
+            fbuilds.append(fbuild)
+        db.session.add_all(fbuilds)
+        # we need the build IDs for the result directories
+        db.session.flush()
+
+        builds_map = {"srpm-builds": {}}
+        for (build, build_chroots, fpackage), fbuild in zip(to_fork, fbuilds):
+            fbuild.result_dir = '{:08}'.format(fbuild.id)
+            if build.result_dir:
+                builds_map["srpm-builds"][build.result_dir] = fbuild.result_dir
+
+            for chroot in build_chroots:
+                fchroot = self.create_object(models.BuildChroot, chroot,
+                                             exclude=["id", "build_id", "result_dir",
+                                                      "copr_chroot_id"])
+                fchroot.build = fbuild
+                fchroot.result_dir = '{:08}-{}'.format(fbuild.id, fpackage.name)
+                fchroot.status = StatusEnum("forked")
+                fchroot.copr_chroot = copr_chroots.get(chroot.mock_chroot_id)
+                db.session.add(fchroot)
+                if chroot.result_dir:
+                    builds_map.setdefault(chroot.name, {})[chroot.result_dir] = \
+                        fchroot.result_dir
+        db.session.flush()
+        return builds_map
+
     def fork_build(self, build, fcopr, fpackage, build_chroots):
         fbuild = self.create_object(models.Build, build, exclude=["id", "copr_id", "copr_dir_id", "package_id", "result_dir"])
         fbuild.copr = fcopr
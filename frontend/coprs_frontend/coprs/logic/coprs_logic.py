@@ -234,6 +234,41 @@ class CoprsLogic(object):
                 .order_by(models.MockChroot.os_version.asc())
                 .order_by(models.MockChroot.arch.asc()))
 
+    @classmethod
+    def prune_flags(cls):
+        """
+        Generate `{ownername, projectname, persistent, auto_prune, devel_mode,
+        appstream}` dicts for all the not-deleted projects, i.e. everything
+        copr_prune_results needs to decide whether to prune the project.  Only
+        the needed columns are loaded, in batches.
+        """
+        query = (
+            db.session.query(models.Copr)
+            .join(models.Copr.user)
+            .outerjoin(models.Group)
+            .filter(models.Copr.deleted.is_(False))
+            .with_entities(
+                models.User.username,
+                models.Group.name.label("group_name"),
+                models.Copr.name,
+                models.Copr.persistent,
+                models.Copr.auto_prune,
+                models.Copr.auto_createrepo,
+                models.Copr.appstream,
+            )
+            .yield_per(1000)
+        )
+        for row in query:
+            yield {
+                "ownername": "@" + row.group_name if row.group_name
+                             else row.username,
+                "projectname": row.name,
+                "persistent": bool(row.persistent),
+                "auto_prune": bool(row.auto_prune),
+                "devel_mode": not row.auto_createrepo,
+                "appstream": bool(row.appstream),
+            }
+
     @classmethod
     def get_playground(cls):
         return cls.get_all().filter(models.Copr.playground == True)
@@ -3,7 +3,7 @@ from typing import List, Optional
 
 from sqlalchemy import bindparam, Integer, func, or_
 from sqlalchemy.sql import true, text
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from coprs import app
 from coprs import db
@@ -421,6 +421,40 @@ class PackagesLogic(object):
                 break
         return builds
 
+    @classmethod
+    def last_successful_build_chroots_in_copr(cls, copr):
+        """
+        Like last_successful_build_chroots(), but for all the packages in the
+        given project at once, using one query.  Return a dict
+        {(package_id, mock_chroot_id): BuildChroot}, including the chroots not
+        enabled in the project (the caller needs to filter them).
+        """
+        rank = func.row_number().over(
+            partition_by=[models.Build.package_id,
+                          models.BuildChroot.mock_chroot_id],
+            order_by=models.Build.id.desc(),
+        ).label("rank")
+
+        latest = (
+            db.session.query(models.BuildChroot.id.label("build_chroot_id"),
+                             rank)
+            .join(models.Build)
+            .filter(models.Build.copr_id == copr.id)
+            .filter(models.Build.package_id.isnot(None))
+            .filter(models.BuildChroot.status.in_([StatusEnum("succeeded"),
+                                                   StatusEnum("forked")]))
+            .subquery()
+        )
+
+        query = (
+            models.BuildChroot.query
+            .join(latest, latest.c.build_chroot_id == models.BuildChroot.id)
+            .filter(latest.c.rank == 1)
+            .options(joinedload(models.BuildChroot.build),
+                     joinedload(models.BuildChroot.mock_chroot))
+        )
+        return {(build_chroot.build.package_id, build_chroot.mock_chroot_id):
+                build_chroot for build_chroot in query}
 
     @classmethod
     def log_being_admin(cls, user, package):
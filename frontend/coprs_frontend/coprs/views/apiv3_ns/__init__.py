@@ -1,3 +1,5 @@
+import base64
+import binascii
 import json
 import flask
 import wtforms
@@ -6,7 +8,7 @@ import inspect
 from functools import wraps
 from werkzeug.datastructures import ImmutableMultiDict, MultiDict
 from sqlalchemy.orm.attributes import InstrumentedAttribute
-from flask_restx import Api, Namespace
+from flask_restx import Api, Namespace, marshal
 from coprs.exceptions import (
     AccessRestricted,
     CoprHttpException,
@@ -101,6 +103,7 @@ class PaginationForm(wtforms.Form):
     order = wtforms.StringField("Order by", validators=[wtforms.validators.Optional()])
     order_type = wtforms.SelectField("Order type", validators=[wtforms.validators.Optional()],
                                      choices=[("ASC", "ASC"), ("DESC", "DESC")], default="ASC")
+    cursor = wtforms.StringField("Cursor", validators=[wtforms.validators.Optional()])
 
 
 def get_copr(ownername=None, projectname=None):
@@ -111,11 +114,24 @@ def get_copr(ownername=None, projectname=None):
 
 
 class Paginator(object):
+    """
+    Paginate a SQLAlchemy query using LIMIT and OFFSET.
+
+    With `keyset=True` the paginator also supports keyset (a.k.a. cursor)
+    pagination.  The query is ordered by the requested column and by the
+    primary key (as a tie-breaker), and the `meta` contains an opaque
+    `next_cursor` pointing right after the last row of the returned page.
+    When the `cursor` is sent back by the client, the next page is selected
+    using WHERE condition on the ordered columns instead of OFFSET, so the
+    cost of fetching a page doesn't grow with its position.
+    """
     LIMIT = None
     OFFSET = 0
     ORDER = "id"
+    YIELD_PER = 1000
 
-    def __init__(self, query, model, limit=None, offset=None, order=None, order_type=None, **kwargs):
+    def __init__(self, query, model, limit=None, offset=None, order=None,
+                 order_type=None, cursor=None, keyset=False, **kwargs):
         self.query = query
         self.model = model
         self.limit = limit or self.LIMIT
@@ -129,14 +145,25 @@ class Paginator(object):
             if self.order == 'name':
                 self.order_type = 'ASC'
 
+        self.keyset = keyset
+        self.cursor = cursor if keyset else None
+        self.next_cursor = None
+        self._after = None
+        if self.cursor:
+            self._after = self._decode_cursor(self.cursor)
+            # the cursor replaces offset
+            self.offset = self.OFFSET
+
     def get(self):
-        return self.paginate_query(self.query)
+        return self.get_query()
 
-    def paginate_query(self, query):
+    def get_query(self):
         """
-        Return `self.query` with all pagination parameters (limit, offset,
-        order) but do not run it.
+        Return the paginated SQLAlchemy query, but do not run it
         """
+        return self.paginate_query(self.query)
+
+    def _order_attr(self):
         order_attr = getattr(self.model, self.order, None)
         if not order_attr:
             msg = "Cannot order by {}, {} doesn't have such property".format(
@@ -147,26 +174,144 @@ class Paginator(object):
         # a real database column
         if not isinstance(order_attr, InstrumentedAttribute):
             raise CoprHttpException("Cannot order by {}".format(self.order))
+        return order_attr
 
+    def _order_fun(self):
         order_fun = (lambda x: x)
         if self.order_type == 'ASC':
             order_fun = sqlalchemy.asc
         elif self.order_type == 'DESC':
             order_fun = sqlalchemy.desc
+        return order_fun
+
+    def order_query(self, query):
+        """
+        Return `query` ordered according to the pagination parameters
+        """
+        order_attr = self._order_attr()
+        order_fun = self._order_fun()
+        if not self.keyset:
+            return query.order_by(order_fun(order_attr))
+
+        # Drop any ordering the query already has, the rows need to be
+        # ordered by exactly the same columns the cursor is based on.
+        pk = getattr(self.model, "id")
+        query = query.order_by(None).order_by(order_fun(order_attr))
+        if self.order != "id":
+            query = query.order_by(order_fun(pk))
+        return query
 
-        return (query.order_by(order_fun(order_attr))
-                .limit(self.limit)
+    def paginate_query(self, query):
+        """
+        Return `self.query` with all pagination parameters (limit, offset,
+        order) but do not run it.
+        """
+        query = self.order_query(query)
+        if self._after:
+            query = self._filter_after(query)
+        return (query.limit(self.limit)
                 .offset(self.offset))
 
+    def _filter_after(self, query):
+        """
+        Keyset pagination, return only rows placed after the cursor
+        """
+        order_attr = self._order_attr()
+        pk = getattr(self.model, "id")
+        if self.order_type == "DESC":
+            after = (lambda column, value: column < value)
+        else:
+            after = (lambda column, value: column > value)
+
+        if self.order == "id":
+            return query.filter(after(pk, self._after["id"]))
+
+        value = self._after["value"]
+        return query.filter(sqlalchemy.or_(
+            after(order_attr, value),
+            sqlalchemy.and_(order_attr == value, after(pk, self._after["id"])),
+        ))
+
+    def _decode_cursor(self, cursor):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            if not isinstance(data, dict) or not isinstance(data["id"], int):
+                raise ValueError
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise BadRequest("Invalid pagination cursor")
+
+        if [data.get("order"), data.get("order_type")] != \
+                [self.order, self.order_type]:
+            raise BadRequest("The pagination cursor doesn't match the "
+                             "requested order and order_type")
+        return data
+
+    def _encode_cursor(self, obj):
+        value = getattr(obj, self.order)
+        if not isinstance(value, (int, str)):
+            return None
+        data = {"order": self.order, "order_type": self.order_type,
+                "value": value, "id": obj.id}
+        return base64.urlsafe_b64encode(
+            json.dumps(data).encode("utf-8")).decode("ascii")
+
+    def _keyset_possible(self):
+        # Rows with NULL values in the ordered column couldn't be reliably
+        # found by the cursor WHERE condition.
+        columns = getattr(self._order_attr().property, "columns", [])
+        return all(not column.nullable for column in columns)
+
+    def items(self):
+        """
+        Run the paginated query, and return the list of objects.  This also
+        calculates the `next_cursor` value in `meta` (if the keyset pagination
+        is enabled, and there might be more rows to paginate through).
+        """
+        objects = list(self.get())
+        self._set_next_cursor(objects[-1] if objects else None, len(objects))
+        return objects
+
+    def _set_next_cursor(self, last, count):
+        self.next_cursor = None
+        if self.keyset and self.limit and count == self.limit \
+                and self._keyset_possible():
+            self.next_cursor = self._encode_cursor(last)
+
+    def stream(self, fun):
+        """
+        Generator alternative to `map()`.  The rows are fetched from the
+        database in batches (`yield_per`) so we never keep all the objects in
+        memory.  Note that `meta` (namely the `next_cursor`) is complete only
+        after the generator is exhausted.
+        """
+        # construct the query right now, not lazily when the generator is first
+        # iterated, so the invalid pagination parameters are reported properly
+        # (before we start streaming the response)
+        query = self.get_query().yield_per(self.YIELD_PER)
+
+        def _generator():
+            last = None
+            count = 0
+            for obj in query:
+                last = obj
+                count += 1
+                yield fun(obj)
+            self._set_next_cursor(last, count)
+
+        return _generator()
+
     @property
     def meta(self):
-        return {k: getattr(self, k) for k in ["limit", "offset", "order", "order_type"]}
+        keys = ["limit", "offset", "order", "order_type"]
+        if self.keyset:
+            keys += ["cursor", "next_cursor"]
+        return {k: getattr(self, k) for k in keys}
 
     def map(self, fun):
-        return [fun(x) for x in self.get()]
+        return [fun(x) for x in self.items()]
 
     def to_dict(self):
-        return [x.to_dict() for x in self.get()]
+        return [x.to_dict() for x in self.items()]
 
 
 class SubqueryPaginator(Paginator):
@@ -175,6 +320,9 @@ class SubqueryPaginator(Paginator):
     offset=0. There is not many options to get around it. To mitigate the
     slowdown at least a little (~10%), we can filter, offset, and limit within
     a subquery and then base the full-query on the subquery results.
+
+    Even better, use the keyset pagination (`cursor`) which doesn't suffer from
+    this problem at all.
     """
     def __init__(self, query, subquery, *args, **kwargs):
         super().__init__(query, *args, **kwargs)
@@ -182,9 +330,16 @@ class SubqueryPaginator(Paginator):
         self.subquery = subquery.with_entities(self.pk)
 
     def get(self):
+        return self.get_query().all()
+
+    def get_query(self):
         subquery = self.paginate_query(self.subquery).subquery()
         query = self.query.filter(self.pk.in_(subquery))
-        return query.all()
+        if self.keyset:
+            # The rows need to be in the same order as within the subquery,
+            # the last one is used for the next cursor.
+            query = self.order_query(query)
+        return query
 
 
 class ListPaginator(Paginator):
@@ -274,6 +429,29 @@ def streamed_json_array_response(array_or_generator, message, field="data"):
     return streamed_json(array_or_generator, start_string, "]}")
 
 
+def streamed_pagination_response(paginator, fun, model):
+    """
+    Stream the paginated list of objects as JSON, in the very same format as
+    `marshal_with(model)` would do for `{"items": [...], "meta": ...}`, but
+    without loading all the objects (and their dict representations) into
+    memory at once.  The PAGINATOR objects are converted to dicts by FUN, and
+    then marshalled one by one according to the pagination MODEL.
+    """
+    items_model = model["items"].container.nested
+    meta_model = model["meta"].nested
+
+    def _items():
+        for item in paginator.stream(fun):
+            yield marshal(item, items_model)
+
+    def _meta():
+        # paginator.meta is complete once all items are processed
+        return '],\n"meta": {}}}'.format(
+            json.dumps(marshal(paginator.meta, meta_model)))
+
+    return streamed_json(_items(), '{"items": [\n', _meta)
+
+
 def str_to_list(value, separator=None):
     """
     We have a lot of module attributes that are stored as space-separeted
@@ -4,7 +4,7 @@ from http import HTTPStatus
 
 from flask_restx import Namespace, Resource
 
-from coprs.views.apiv3_ns import api, query_to_parameters
+from coprs.views.apiv3_ns import api, query_to_parameters, streamed_pagination_response
 from coprs import models
 from coprs.logic.builds_logic import BuildChrootsLogic
 from coprs.logic.coprs_logic import CoprChrootsLogic
@@ -86,7 +86,10 @@ class BuildChrootList(Resource):
     @pagination
     @query_to_parameters
     @apiv3_bchroots_ns.doc(params=build_id_params | pagination_params)
-    @apiv3_bchroots_ns.marshal_list_with(pagination_build_chroot_model)
+    # the response is streamed, and marshalled item by item
+    @apiv3_bchroots_ns.response(
+        HTTPStatus.OK.value, HTTPStatus.OK.description, pagination_build_chroot_model
+    )
     @apiv3_bchroots_ns.response(
         HTTPStatus.PARTIAL_CONTENT.value, HTTPStatus.PARTIAL_CONTENT.description
     )
@@ -99,9 +102,9 @@ class BuildChrootList(Resource):
         if kwargs.get("order") == "name":
             kwargs.pop("order")
         query = BuildChrootsLogic.filter_by_build_id(BuildChrootsLogic.get_multiply(), build_id)
-        paginator = Paginator(query, models.BuildChroot, **kwargs)
-        chroots = paginator.map(to_dict)
-        return {"items": chroots, "meta": paginator.meta}
+        paginator = Paginator(query, models.BuildChroot, keyset=True, **kwargs)
+        return streamed_pagination_response(paginator, to_dict,
+                                            pagination_build_chroot_model)
 
 
 @apiv3_bchroots_ns.route("/build-config")
@@ -3,8 +3,10 @@
 # pylint: disable=missing-class-docstring
 
 import os
+from http import HTTPStatus
+
 import flask
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 
 from werkzeug.datastructures import MultiDict
 from werkzeug.utils import secure_filename
@@ -14,11 +16,14 @@ from copr_common.enums import StatusEnum
 from coprs import db, forms, models
 from coprs.exceptions import (BadRequest, AccessRestricted)
 from coprs.views.misc import api_login_required
-from coprs.views.apiv3_ns import api, rename_fields_helper, deprecated_route_method_type
+from coprs.views.apiv3_ns import api, rename_fields_helper, deprecated_route_method_type, \
+    streamed_pagination_response
 from coprs.views.apiv3_ns.schema.schemas import build_model, pagination_build_model, source_chroot_model, \
     source_build_config_model, list_build_params, create_build_url_input_model, create_build_upload_input_model, \
     create_build_scm_input_model, create_build_distgit_input_model, create_build_pypi_input_model, \
-    create_build_rubygems_input_model, create_build_custom_input_model, delete_builds_input_model, list_build_model
+    create_build_rubygems_input_model, create_build_custom_input_model, delete_builds_input_model, list_build_model, \
+    pagination_params, build_states_model, build_states_params, upload_model, start_upload_input_model, \
+    upload_chunk_params, create_build_chunked_upload_input_model
 from coprs.views.apiv3_ns.schema.docs import get_build_docs
 from coprs.logic.complex_logic import ComplexLogic
 from coprs.logic.builds_logic import BuildsLogic
@@ -31,6 +36,7 @@ from . import (
     query_to_parameters,
     pagination,
     file_upload,
+    str_to_list,
 )
 from .json2form import get_form_compatible_data
 
@@ -38,6 +44,8 @@ from .json2form import get_form_compatible_data
 apiv3_builds_ns = Namespace("build", description="Builds")
 api.add_namespace(apiv3_builds_ns)
 
+MAX_BUILD_STATES = 1000
+
 
 def to_dict(build):
     return {
@@ -143,8 +151,9 @@ class GetBuild(Resource):
 class ListBuild(Resource):
     @pagination
     @query_to_parameters
-    @apiv3_builds_ns.doc(params=list_build_params)
-    @apiv3_builds_ns.marshal_with(pagination_build_model)
+    @apiv3_builds_ns.doc(params=list_build_params | pagination_params)
+    # the response is streamed, and marshalled item by item
+    @apiv3_builds_ns.response(HTTPStatus.OK.value, HTTPStatus.OK.description, pagination_build_model)
     def get(self, ownername, projectname, packagename=None, status=None, **kwargs):
         """
         List builds
@@ -152,21 +161,13 @@ class ListBuild(Resource):
         """
         copr = get_copr(ownername, projectname)
 
-        # WORKAROUND
-        # We can't filter builds by status directly in the database, because we
-        # use a logic in Build.status property to determine a build status.
-        # Therefore if we want to filter by `status`, we need to query all builds
-        # and filter them in the application and then return the desired number.
-        limit = kwargs["limit"]
-        paginator_limit = None if status else kwargs["limit"]
-        del kwargs["limit"]
-
         # Loading relationships straight away makes running `to_dict` somewhat
         # faster, which adds up over time, and  brings a significant speedup for
-        # large projects
+        # large projects.  The one-to-many relationship is loaded by
+        # selectinload, joinedload can not be combined with yield_per.
         query = BuildsLogic.get_multiple()
         query = query.options(
-            joinedload(models.Build.build_chroots),
+            selectinload(models.Build.build_chroots),
             joinedload(models.Build.package),
             joinedload(models.Build.copr),
         )
@@ -174,16 +175,42 @@ class ListBuild(Resource):
         subquery = query.filter(models.Build.copr == copr)
         if packagename:
             subquery = BuildsLogic.filter_by_package_name(subquery, packagename)
+        if status:
+            subquery = BuildsLogic.filter_by_status(subquery, status)
 
-        paginator = SubqueryPaginator(query, subquery, models.Build, limit=paginator_limit, **kwargs)
+        paginator = SubqueryPaginator(query, subquery, models.Build, keyset=True, **kwargs)
+        return streamed_pagination_response(paginator, to_dict,
+                                            pagination_build_model)
 
-        builds = paginator.map(to_dict)
 
-        if status:
-            builds = [b for b in builds if b["state"] == status][:limit]
-            paginator.limit = limit
+@apiv3_builds_ns.route("/states")
+class BuildStates(Resource):
+    @query_to_parameters
+    @apiv3_builds_ns.doc(params=build_states_params)
+    @apiv3_builds_ns.marshal_with(build_states_model)
+    def get(self, build_ids=None, batch_id=None):
+        """
+        Get states of multiple builds
+        Get states of the builds specified by the list of their IDs, and/or of
+        all the builds in a batch, using just one request (e.g. for watching
+        many builds at once).
+        """
+        try:
+            build_ids = [int(x) for x in str_to_list(build_ids, ",")]
+            batch_id = int(batch_id) if batch_id else None
+        except ValueError as ex:
+            raise BadRequest("Invalid build_ids or batch_id: {}".format(ex)) from ex
+
+        if not build_ids and batch_id is None:
+            raise BadRequest("Specify build_ids and/or batch_id")
+
+        if len(build_ids) > MAX_BUILD_STATES:
+            raise BadRequest("Too many builds requested, the limit is {}"
+                             .format(MAX_BUILD_STATES))
 
-        return {"items": builds, "meta": paginator.meta}
+        states = BuildsLogic.get_states(build_ids, batch_id)
+        return {"builds": [{"id": build_id, "state": state}
+                           for build_id, state in sorted(states.items())]}
 
 
 @apiv3_builds_ns.route("/source-chroot/<int:build_id>")
@@ -313,6 +340,83 @@ class CreateFromUpload(Resource):
         return process_creating_new_build(copr, form, create_new_build)
 
 
+@apiv3_builds_ns.route("/upload")
+class StartUpload(Resource):
+    @api_login_required
+    @apiv3_builds_ns.expect(start_upload_input_model)
+    @apiv3_builds_ns.marshal_with(upload_model)
+    def post(self):
+        """
+        Start a chunked upload
+        Start uploading a (large) SRPM or spec file in multiple chunks.  The
+        chunks are then sent by PUT requests, and the build is created by the
+        /create/chunked-upload endpoint.
+        """
+        data = flask.request.json or {}
+        try:
+            size = int(data.get("size"))
+        except (TypeError, ValueError) as ex:
+            raise BadRequest("Invalid upload size: {}".format(data.get("size"))) from ex
+        return BuildsLogic.start_chunked_upload(
+            flask.g.user, data.get("filename"), size)
+
+
+@apiv3_builds_ns.route("/upload/<upload_id>")
+class Upload(Resource):
+    @api_login_required
+    @apiv3_builds_ns.marshal_with(upload_model)
+    def get(self, upload_id):
+        """
+        Get a chunked upload
+        Get the chunked upload status, namely the offset (already received
+        bytes) where the upload should continue, e.g. after a network failure.
+        """
+        return BuildsLogic.get_chunked_upload(flask.g.user, upload_id)
+
+    @api_login_required
+    @apiv3_builds_ns.doc(params=upload_chunk_params)
+    @apiv3_builds_ns.marshal_with(upload_model)
+    def put(self, upload_id):
+        """
+        Upload a chunk
+        Append the request body (application/octet-stream) to the chunked
+        upload.  The offset argument must match the already received size of
+        the upload, otherwise the chunk is refused with 409.
+        """
+        offset = flask.request.args.get("offset", type=int)
+        if offset is None:
+            raise BadRequest("The offset argument is required")
+        return BuildsLogic.append_upload_chunk(
+            flask.g.user, upload_id, offset, flask.request.stream,
+            flask.request.content_length)
+
+
+@apiv3_builds_ns.route("/create/chunked-upload")
+class CreateFromChunkedUpload(Resource):
+    @api_login_required
+    @apiv3_builds_ns.expect(create_build_chunked_upload_input_model)
+    @apiv3_builds_ns.marshal_with(build_model)
+    def post(self):
+        """
+        Create a build from chunked upload
+        Create a build from a file completely uploaded by the chunked upload
+        endpoints.
+        """
+        copr = get_copr()
+        data = get_form_compatible_data(preserve=["chroots", "exclude_chroots"])
+        # pylint: disable-next=not-callable
+        form = forms.BuildFormChunkedUploadFactory(copr.active_chroots)(data, meta={'csrf': False})
+
+        def create_new_build(options):
+            return BuildsLogic.create_new_from_chunked_upload(
+                flask.g.user, copr,
+                form.upload_id.data,
+                **options,
+            )
+
+        return process_creating_new_build(copr, form, create_new_build)
+
+
 @apiv3_builds_ns.route("/create/scm")
 class CreateFromScm(Resource):
     @api_login_required
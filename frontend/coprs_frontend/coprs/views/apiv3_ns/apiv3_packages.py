@@ -2,8 +2,10 @@
 # recognized by flask-restx and rendered in Swagger
 # pylint: disable=missing-class-docstring
 
+from http import HTTPStatus
+
 import flask
-from flask_restx import Namespace, Resource
+from flask_restx import Namespace, Resource, marshal
 
 from coprs.exceptions import (
         BadRequest,
@@ -31,6 +33,7 @@ from coprs.views.apiv3_ns.schema.schemas import (
     package_edit_input_model,
     package_get_list_params,
     pagination_package_model,
+    pagination_params,
     build_model,
     base_package_input_model,
 )
@@ -40,7 +43,7 @@ from coprs.logic.packages_logic import PackagesLogic
 # @TODO if we need to do this on several places, we should figure a better way to do it
 from coprs.views.apiv3_ns.apiv3_builds import to_dict as build_to_dict
 
-from . import get_copr, Paginator
+from . import get_copr, Paginator, streamed_pagination_response
 from .json2form import get_form_compatible_data
 
 
@@ -142,8 +145,11 @@ class GetPackage(Resource):
 class PackageGetList(Resource):
     @pagination
     @query_to_parameters
-    @apiv3_packages_ns.doc(params=package_get_list_params)
-    @apiv3_packages_ns.marshal_with(pagination_package_model)
+    @apiv3_packages_ns.doc(params=package_get_list_params | pagination_params)
+    # the response is either streamed, or marshalled explicitly
+    @apiv3_packages_ns.response(
+        HTTPStatus.OK.value, HTTPStatus.OK.description, pagination_package_model
+    )
     def get(self, ownername, projectname, with_latest_build=False,
             with_latest_succeeded_build=False, **kwargs):
         """
@@ -155,13 +161,27 @@ class PackageGetList(Resource):
 
         copr = get_copr(ownername, projectname)
         query = PackagesLogic.get_all(copr.id)
-        paginator = Paginator(query, models.Package, **kwargs)
-        packages = paginator.get().all()
-
-        if len(packages) > MAX_PACKAGES_WITHOUT_PAGINATION:
-            raise ApiError("Too many packages, please use pagination. "
-                           "Requests are limited to only {0} packages at once."
-                           .format(MAX_PACKAGES_WITHOUT_PAGINATION), 413)
+        paginator = Paginator(query, models.Package, keyset=True, **kwargs)
+
+        if paginator.limit is None:
+            # Without pagination, check the size of the list before we start
+            # streaming (or loading) it.
+            count = paginator.get_query().limit(
+                MAX_PACKAGES_WITHOUT_PAGINATION + 1).count()
+            if count > MAX_PACKAGES_WITHOUT_PAGINATION:
+                raise ApiError(
+                    "Too many packages, please use pagination. "
+                    "Requests are limited to only {0} packages at once."
+                    .format(MAX_PACKAGES_WITHOUT_PAGINATION), 413)
+
+        if not with_latest_build and not with_latest_succeeded_build:
+            # Nothing needs to be pre-loaded for all the packages at once, so
+            # we can stream the (potentially large) list of packages without
+            # keeping it in memory.
+            return streamed_pagination_response(
+                paginator, to_dict, pagination_package_model)
+
+        packages = paginator.items()
 
         # Query latest builds for all packages at once. We can't use this solution
         # for querying latest successfull builds, so that will be a little slower
@@ -173,7 +193,8 @@ class PackageGetList(Resource):
 
         items = [to_dict(p, with_latest_build, with_latest_succeeded_build)
                  for p in packages]
-        return {"items": items, "meta": paginator.meta}
+        return marshal({"items": items, "meta": paginator.meta},
+                       pagination_package_model)
 
 
 @apiv3_packages_ns.route("/add/<ownername>/<projectname>/<package_name>/<source_type_text>")
@@ -153,7 +153,7 @@ class ProjectList(Resource):
         query = CoprsLogic.get_multiple()
         if ownername:
             query = CoprsLogic.filter_by_ownername(query, ownername)
-        paginator = Paginator(query, models.Copr, **kwargs)
+        paginator = Paginator(query, models.Copr, keyset=True, **kwargs)
         projects = paginator.map(to_dict)
         return {"items": projects, "meta": paginator.meta}
 
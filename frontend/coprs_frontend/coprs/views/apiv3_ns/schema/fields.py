@@ -227,6 +227,20 @@ order_type = String(
     example="DESC",
 )
 
+cursor = String(
+    description=(
+        "Opaque keyset pagination cursor, use the `next_cursor` value from "
+        "the previous page metadata.  When used, `offset` is ignored"
+    ),
+)
+
+next_cursor = String(
+    description=(
+        "Cursor pointing to the next page of results, or null if there "
+        "are no more results (or keyset pagination isn't possible)"
+    ),
+)
+
 
 build_enable_net = Boolean(
     description="Enable networking for the builds",
@@ -161,9 +161,15 @@ class PaginationMeta(ParamsSchema):
     offset: Integer = fields.offset
     order: String = fields.order
     order_type: String = fields.order_type
+    cursor: String = fields.cursor
 
 
-_pagination_meta_model = PaginationMeta.get_cls().model()
+@dataclass
+class PaginationMetaResult(PaginationMeta):
+    next_cursor: String = fields.next_cursor
+
+
+_pagination_meta_model = PaginationMetaResult.get_cls().model()
 
 
 @dataclass
@@ -802,6 +808,83 @@ class DeleteBuilds(InputSchema):
     builds: List = List(Integer, description="List of build ids to delete")
 
 
+@dataclass
+class BuildStatesParams(ParamsSchema):
+    build_ids: String = String(
+        description="Comma-separated list of build IDs (at most 1000)",
+        example="1,2,3",
+    )
+    batch_id: Integer = Integer(
+        description="Return the states of all builds in this batch",
+        example=123,
+    )
+
+
+@dataclass
+class BuildState(Schema):
+    id: Integer = fields.id_field
+    state: String = fields.state
+
+
+_build_state_model = BuildState.get_cls().model()
+
+
+@dataclass
+class BuildStates(Schema):
+    builds: List = List(Nested(_build_state_model))
+
+
+@dataclass
+class StartUpload(InputSchema):
+    filename: String = String(
+        description="Name of the uploaded .src.rpm, .nosrc.rpm or .spec file",
+        example="foo-1.0-1.src.rpm",
+    )
+    size: Integer = Integer(
+        description="Size of the uploaded file in bytes",
+        example=1048576,
+    )
+
+
+@dataclass
+class Upload(Schema):
+    upload_id: String = String(
+        description="ID of the chunked upload",
+        example="tmpbl2b5ek5",
+    )
+    filename: String = String(example="foo-1.0-1.src.rpm")
+    size: Integer = Integer(
+        description="Size of the uploaded file in bytes",
+        example=1048576,
+    )
+    offset: Integer = Integer(
+        description="How many bytes have already been received, the next "
+                    "chunk starts here",
+        example=0,
+    )
+    chunk_size: Integer = Integer(
+        description="The maximum size of one chunk in bytes",
+        example=67108864,
+    )
+
+
+@dataclass
+class UploadChunkParams(ParamsSchema):
+    offset: Integer = Integer(
+        description="Where the uploaded chunk starts in the file",
+        example=0,
+    )
+
+
+@dataclass
+class CreateBuildChunkedUpload(_BuildDataCommon, _GenericBuildOptions, InputSchema):
+    project_dirname: String = fields.project_dirname
+    upload_id: String = String(
+        description="ID of the completed chunked upload",
+        example="tmpbl2b5ek5",
+    )
+
+
 
 # OUTPUT MODELS
 project_chroot_model = ProjectChroot.get_cls().model()
@@ -820,6 +903,8 @@ can_build_in_model = CanBuildSchema.get_cls().model()
 source_chroot_model = SourceChroot.get_cls().model()
 source_build_config_model = SourceBuildConfig.get_cls().model()
 list_build_model = DeleteBuilds.get_cls().model()
+build_states_model = BuildStates.get_cls().model()
+upload_model = Upload.get_cls().model()
 
 pagination_project_model = Pagination(items=List(Nested(project_model))).model()
 pagination_build_chroot_model = Pagination(items=List(Nested(build_chroot_model))).model()
@@ -845,6 +930,8 @@ module_add_input_model = ModuleAdd.get_cls().input_model()
 
 create_build_url_input_model = CreateBuildUrl.get_cls().input_model()
 create_build_upload_input_model = CreateBuildUpload.get_cls().input_model()
+create_build_chunked_upload_input_model = CreateBuildChunkedUpload.get_cls().input_model()
+start_upload_input_model = StartUpload.get_cls().input_model()
 create_build_scm_input_model = CreateBuildSCM.get_cls().input_model()
 create_build_distgit_input_model = CreateBuildDistGit.get_cls().input_model()
 create_build_pypi_input_model = CreateBuildPyPI.get_cls().input_model()
@@ -865,3 +952,5 @@ build_chroot_params = BuildChrootParams.get_cls().params_schema()
 build_id_params = {"build_id": build_chroot_params["build_id"]}
 can_build_params = CanBuildParams.get_cls().params_schema()
 list_build_params = ListBuild.get_cls().params_schema()
+build_states_params = BuildStatesParams.get_cls().params_schema()
+upload_chunk_params = UploadChunkParams.get_cls().params_schema()
@@ -5,7 +5,7 @@ from coprs import models
 from coprs.logic import actions_logic
 from coprs.logic.builds_logic import BuildsLogic
 from coprs.logic.complex_logic import ComplexLogic, BuildConfigLogic
-from coprs.logic.coprs_logic import CoprChrootsLogic, MockChrootsLogic
+from coprs.logic.coprs_logic import CoprsLogic, CoprChrootsLogic, MockChrootsLogic
 from coprs.exceptions import CoprHttpException, ObjectNotFound
 from coprs.helpers import streamed_json
 
@@ -495,6 +495,14 @@ def reschedule_build_chroot():
 def chroots_prunerepo_status():
     return flask.jsonify(MockChrootsLogic.chroots_prunerepo_status())
 
+@backend_ns.route("/projects-prune-flags/")
+def projects_prune_flags():
+    """
+    Return the prune-related flags of all the projects at once, so
+    copr_prune_results doesn't have to query them project by project.
+    """
+    return streamed_json(CoprsLogic.prune_flags())
+
 @backend_ns.route("/final-prunerepo-done/", methods=["POST", "PUT"])
 @misc.backend_authenticated
 def final_prunerepo_done():
@@ -46,6 +46,39 @@ class TestAPIv3BuildChrootsResults(CoprsTestCase):
         assert result.is_json
         assert result.json == built_packages
 
+    @TransactionDecorator("u1")
+    @pytest.mark.usefixtures("f_users", "f_users_api", "f_coprs",
+                             "f_mock_chroots", "f_builds", "f_db")
+    def test_build_chroot_built_packages_extra_fields(self):
+        """
+        The results.json generated by copr-rpmbuild contains more information
+        about the packages than just NEVRA
+        """
+        self.db.session.add(self.b1, self.b1_bc)
+        nevra = {
+            "name": "hello",
+            "epoch": 0,
+            "version": "2.8",
+            "release": "1.fc33",
+            "arch": "x86_64",
+        }
+        results = {"packages": [dict(
+            nevra,
+            filename="hello-2.8-1.fc33.x86_64.rpm",
+            size=1024,
+            sha256="a" * 64,
+            signed=False,
+        )]}
+        BuildChrootResultsLogic.create_from_dict(
+            self.b1.build_chroots[0], results)
+        self.db.session.commit()
+
+        endpoint = "/api_3/build-chroot/built-packages/"
+        endpoint += "?build_id={build_id}&chrootname={chrootname}"
+        params = {"build_id": self.b1.id, "chrootname": "fedora-18-x86_64"}
+        result = self.tc.get(endpoint.format(**params))
+        assert result.json == {"packages": [nevra]}
+
 
     @TransactionDecorator("u1")
     @pytest.mark.usefixtures("f_users", "f_users_api", "f_coprs",
@@ -74,6 +107,27 @@ class TestAPIv3BuildChrootsResults(CoprsTestCase):
         expected = [item1, item2] if order == "ASC" else [item2, item1]
         assert result.json["items"] == expected
 
+    @TransactionDecorator("u1")
+    @pytest.mark.usefixtures("f_users", "f_users_api", "f_coprs",
+                             "f_mock_chroots", "f_builds", "f_db")
+    def test_build_chroot_list_streamed_meta(self):
+        """
+        The list is streamed, and the meta (including the cursor) is appended
+        once all the items are processed.
+        """
+        endpoint = "/api_3/build-chroot/list/3?order_type=ASC&limit=1"
+        result = self.tc.get(endpoint)
+        assert result.is_json
+        assert [i["name"] for i in result.json["items"]] == ["fedora-17-x86_64"]
+        meta = result.json["meta"]
+        assert meta["limit"] == 1
+        assert meta["cursor"] is None
+        assert meta["next_cursor"]
+
+        result = self.tc.get(endpoint + "&cursor=" + meta["next_cursor"])
+        assert [i["name"] for i in result.json["items"]] == ["fedora-17-i386"]
+        assert result.json["meta"]["cursor"] == meta["next_cursor"]
+
 
     @TransactionDecorator("u1")
     @pytest.mark.usefixtures("f_users", "f_users_api", "f_coprs",
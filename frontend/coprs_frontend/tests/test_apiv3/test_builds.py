@@ -4,6 +4,7 @@ Test all kind of build request via v3 API
 
 import copy
 import json
+import os
 
 import pytest
 
@@ -220,6 +221,89 @@ class TestAPIv3Builds(CoprsTestCase):
         expected -= set(exclude_chroots)
         assert {ch.name for ch in build.chroots} == expected
 
+    @pytest.mark.usefixtures("f_users", "f_users_api", "f_coprs",
+                             "f_mock_chroots", "f_builds", "f_db")
+    def test_v3_build_states(self):
+        self.b2.canceled = True
+        self.db.session.commit()
+        ids = [self.b1.id, self.b2.id, 12345]
+        response = self.tc.get("/api_3/build/states?build_ids={}".format(
+            ",".join(str(i) for i in ids)))
+        assert response.status_code == 200
+        assert response.json == {"builds": [
+            {"id": self.b1.id, "state": self.b1.state},
+            {"id": self.b2.id, "state": "canceled"},
+        ]}
+
+    @pytest.mark.usefixtures("f_users", "f_users_api", "f_coprs",
+                             "f_mock_chroots", "f_builds", "f_db")
+    @pytest.mark.parametrize("query", ["", "?build_ids=a,b",
+                                       "?build_ids=" + ",".join(["1"] * 1001)])
+    def test_v3_build_states_invalid(self, query):
+        response = self.tc.get("/api_3/build/states" + query)
+        assert response.status_code == 400
+
+    @pytest.mark.usefixtures("f_users", "f_users_api", "f_coprs",
+                             "f_mock_chroots", "f_db")
+    def test_v3_build_chunked_upload(self):
+        user = self.models.User.query.filter_by(username='user2').first()
+        content = b"0123456789" * 10
+        response = self.post_api3_with_auth(
+            "/api_3/build/upload",
+            {"filename": "foo-1.0-1.src.rpm", "size": len(content)}, user)
+        assert response.status_code == 200
+        upload = response.json
+        assert upload["offset"] == 0
+        endpoint = "/api_3/build/upload/{}".format(upload["upload_id"])
+
+        headers = self.api3_auth_headers(user)
+        headers["Content-Type"] = "application/octet-stream"
+        response = self.tc.put(endpoint + "?offset=0", data=content[:60],
+                               headers=headers)
+        assert response.json["offset"] == 60
+
+        # retried chunk is refused, client asks where to continue
+        response = self.tc.put(endpoint + "?offset=0", data=content[:60],
+                               headers=headers)
+        assert response.status_code == 409
+        assert self.get_api3_with_auth(endpoint, user).json["offset"] == 60
+
+        # the build can not be created from an incomplete upload
+        data = {"ownername": "user2", "projectname": "foocopr",
+                "upload_id": upload["upload_id"]}
+        response = self.post_api3_with_auth(
+            "/api_3/build/create/chunked-upload", data, user)
+        assert response.status_code == 400
+
+        response = self.tc.put(endpoint + "?offset=60", data=content[60:],
+                               headers=headers)
+        assert response.json["offset"] == len(content)
+
+        response = self.post_api3_with_auth(
+            "/api_3/build/create/chunked-upload", data, user)
+        assert response.status_code == 200
+        build = self.models.Build.query.get(response.json["id"])
+        source_json = json.loads(build.source_json)
+        assert source_json["tmp"] == upload["upload_id"]
+        assert source_json["pkg"] == "foo-1.0-1.src.rpm"
+        path = os.path.join(self.app.config["STORAGE_DIR"],
+                            source_json["tmp"], source_json["pkg"])
+        with open(path, "rb") as fd:
+            assert fd.read() == content
+
+    @pytest.mark.usefixtures("f_users", "f_users_api", "f_coprs",
+                             "f_mock_chroots", "f_db")
+    def test_v3_build_chunked_upload_other_user(self):
+        user1 = self.models.User.query.filter_by(username='user1').first()
+        user2 = self.models.User.query.filter_by(username='user2').first()
+        response = self.post_api3_with_auth(
+            "/api_3/build/upload", {"filename": "foo.spec", "size": 10}, user1)
+        endpoint = "/api_3/build/upload/{}".format(response.json["upload_id"])
+        assert self.get_api3_with_auth(endpoint, user2).status_code == 403
+        assert self.get_api3_with_auth(
+            "/api_3/build/upload/tmp_nonexisting", user2).status_code == 404
+
+
 class TestWebUIBuilds(CoprsTestCase):
 
     @TransactionDecorator("u1")
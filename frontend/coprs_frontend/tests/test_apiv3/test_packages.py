@@ -4,6 +4,7 @@ Test all kind of build request via v3 API
 
 import copy
 import json
+from unittest import mock
 
 import pytest
 
@@ -18,6 +19,27 @@ CHROOTS = [[], ["fedora-17-i386"]]
 
 class TestAPIv3Packages(CoprsTestCase):
 
+    @pytest.mark.usefixtures("f_users", "f_coprs", "f_db")
+    @pytest.mark.parametrize("with_latest_build", [False, True])
+    @mock.patch("coprs.views.apiv3_ns.apiv3_packages"
+                ".MAX_PACKAGES_WITHOUT_PAGINATION", 1)
+    def test_v3_package_list_limit(self, with_latest_build):
+        for name in ["foo", "bar"]:
+            self.db.session.add(self.models.Package(
+                copr=self.c1, name=name, source_type=0))
+        self.db.session.commit()
+
+        params = {"ownername": "user1", "projectname": "foocopr"}
+        if with_latest_build:
+            params["with_latest_build"] = True
+        r = self.tc.get("/api_3/package/list", query_string=params)
+        assert r.status_code == 413
+
+        params["limit"] = 1
+        r = self.tc.get("/api_3/package/list", query_string=params)
+        assert r.status_code == 200
+        assert len(r.json["items"]) == 1
+
     @pytest.mark.usefixtures("f_users", "f_users_api", "f_coprs",
                              "f_mock_chroots", "f_other_distgit", "f_db")
     @pytest.mark.parametrize("case", CASES)
@@ -31,6 +31,38 @@ class TestApiv3Projects(CoprsTestCase):
         assert [p["id"] for p in projects3] == [3, 1, 2]
         assert projects3 == list(reversed(projects2))
 
+    @pytest.mark.usefixtures("f_users", "f_coprs", "f_mock_chroots",
+                             "f_copr_more_permissions", "f_users_api", "f_db")
+    @pytest.mark.parametrize("order, order_type, expected", [
+        ("id", "DESC", [3, 2, 1]),
+        ("id", "ASC", [1, 2, 3]),
+        ("name", "ASC", [3, 1, 2]),
+    ])
+    def test_get_project_list_cursor(self, order, order_type, expected):
+        url = "/api_3/project/list?order={}&order_type={}&limit=1".format(
+            order, order_type)
+        ids = []
+        response = self.tc.get(url)
+        while response.json["items"]:
+            assert response.json["meta"]["offset"] == 0
+            ids.extend([p["id"] for p in response.json["items"]])
+            cursor = response.json["meta"]["next_cursor"]
+            if not cursor:
+                break
+            response = self.tc.get(url + "&cursor=" + cursor)
+        assert ids == expected
+
+    @pytest.mark.usefixtures("f_users", "f_coprs", "f_mock_chroots",
+                             "f_users_api", "f_db")
+    def test_get_project_list_invalid_cursor(self):
+        response = self.tc.get("/api_3/project/list?cursor=foo")
+        assert response.status_code == 400
+
+        response = self.tc.get("/api_3/project/list?order=id&limit=1")
+        cursor = response.json["meta"]["next_cursor"]
+        response = self.tc.get("/api_3/project/list?order=name&cursor=" + cursor)
+        assert response.status_code == 400
+
     @TransactionDecorator("u1")
     @pytest.mark.usefixtures("f_users", "f_users_api", "f_mock_chroots", "f_db")
     @pytest.mark.parametrize("store, read", [(True, "on"), (False, "off")])
@@ -120,6 +120,37 @@ class TestBuildsLogic(CoprsTestCase):
         assert len(md[0]["build_chroots"]) == 15
     """
 
+    @pytest.mark.parametrize("source_status, chroot_states, canceled", [
+        ("succeeded", ["succeeded", "failed"], False),
+        ("succeeded", ["succeeded", "skipped"], False),
+        ("succeeded", ["waiting", "forked"], False),
+        ("succeeded", ["waiting", "waiting"], False),
+        ("succeeded", ["running", "failed"], False),
+        ("succeeded", ["pending", "starting"], False),
+        ("succeeded", [], False),
+        ("importing", ["waiting", "waiting"], False),
+        ("failed", [], False),
+        ("pending", [], True),
+    ])
+    @pytest.mark.usefixtures("f_users", "f_coprs", "f_mock_chroots",
+                             "f_builds", "f_db")
+    def test_filter_by_status(self, source_status, chroot_states, canceled):
+        build = self.b2
+        build.source_status = StatusEnum(source_status)
+        build.canceled = canceled
+        for chroot in build.build_chroots[len(chroot_states):]:
+            self.db.session.delete(chroot)
+        for chroot, state in zip(build.build_chroots, chroot_states):
+            chroot.status = StatusEnum(state)
+        self.db.session.commit()
+        self.db.session.expire_all()
+
+        builds = models.Build.query.all()
+        for status in StatusEnum.vals:
+            expected = {b.id for b in builds if b.state == status}
+            query = BuildsLogic.filter_by_status(models.Build.query, status)
+            assert {b.id for b in query} == expected, status
+
     def test_build_queue_1(self, f_users, f_coprs, f_mock_chroots, f_builds, f_db):
         self.db.session.commit()
         data = BuildsLogic.get_build_importing_queue().all()
@@ -15,6 +15,7 @@ from coprs.logic.complex_logic import (
     ReposLogic,
 )
 from coprs.logic.coprs_logic import CoprChrootsLogic
+from coprs.logic.packages_logic import PackagesLogic
 from tests.coprs_test_case import (
     CoprsTestCase,
     TransactionDecorator,
@@ -56,6 +57,40 @@ class TestComplexLogic(CoprsTestCase):
                                '6-hello-world': '00000013-hello-world',
                                '11-new-package': '00000015-new-package'}}
 
+    @pytest.mark.usefixtures("f_users", "f_fork_prepare", "f_db")
+    def test_fork_copr_in_chunks(self):
+        flask.g.user = self.u2
+        with mock.patch.dict(self.app.config, {"FORK_ACTION_CHUNK_SIZE": 3}):
+            ComplexLogic.fork_copr(self.c2, self.u2, u"dstname")
+        self.db.session.commit()
+        actions = ActionsLogic.get_many(ActionTypeEnum("fork")).all()
+        assert len(actions) == 2
+
+        builds_map = {}
+        for action in actions:
+            for chroot, chroot_map in json.loads(action.data)["builds_map"].items():
+                builds_map.setdefault(chroot, {}).update(chroot_map)
+        assert builds_map == {
+            'srpm-builds': {'00000008-whatsupthere-world': '00000012', '00000006-hello-world': '00000013',
+                            '00000010-new-package': '00000014', '00000011-new-package': '00000015'},
+            'fedora-17-x86_64': {'8-whatsupthere-world': '00000012-whatsupthere-world',
+                                 '6-hello-world': '00000013-hello-world',
+                                 '10-new-package': '00000014-new-package'},
+            'fedora-17-i386': {'8-whatsupthere-world': '00000012-whatsupthere-world',
+                               '6-hello-world': '00000013-hello-world',
+                               '11-new-package': '00000015-new-package'}}
+
+    @pytest.mark.usefixtures("f_users", "f_fork_prepare", "f_db")
+    def test_last_successful_build_chroots_in_copr(self):
+        last_successful = PackagesLogic.last_successful_build_chroots_in_copr(self.c2)
+        expected = {}
+        for package in self.c2.packages:
+            for build, build_chroots in PackagesLogic.last_successful_build_chroots(package).items():
+                for build_chroot in build_chroots:
+                    expected[(package.id, build_chroot.mock_chroot_id)] = build_chroot
+        assert expected
+        assert {key: last_successful[key] for key in expected} == expected
+
     @pytest.mark.usefixtures("f_users", "f_fork_prepare", "f_db")
     def test_fork_copr_with_eoled_chroots(self):
         flask.g.user = self.u2
@@ -599,4 +599,37 @@ class TestImportingBuilds(CoprsTestCase):
         assert data[1]["srpm_url"] == "http://bar"
 
 
+class TestPruneFlags(CoprsTestCase):
+
+    @pytest.mark.usefixtures("f_users", "f_coprs", "f_group_copr", "f_db")
+    def test_projects_prune_flags(self):
+        self.c1.persistent = True
+        self.c2.auto_prune = False
+        self.c3.auto_createrepo = False
+        self.gc2.appstream = False
+        self.gc2.deleted = True
+        self.db.session.commit()
+
+        r = self.tc.get("/backend/projects-prune-flags/")
+        data = json.loads(r.data.decode("utf-8"))
+        flags = {(p["ownername"], p["projectname"]): p for p in data}
+        assert set(flags) == {
+            ("user1", "foocopr"),
+            ("user2", "foocopr"),
+            ("user2", "barcopr"),
+            ("@group1", "groupcopr1"),
+        }
+        assert flags[("user1", "foocopr")]["persistent"] is True
+        assert flags[("user2", "foocopr")]["auto_prune"] is False
+        assert flags[("user2", "barcopr")]["devel_mode"] is True
+        assert flags[("@group1", "groupcopr1")] == {
+            "ownername": "@group1",
+            "projectname": "groupcopr1",
+            "persistent": False,
+            "auto_prune": True,
+            "devel_mode": False,
+            "appstream": True,
+        }
+
+
 # pylint: enable=unused-argument
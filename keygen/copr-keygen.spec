@@ -104,6 +104,8 @@ install -d %{buildroot}%{_datadir}/copr-keygen
 install -d %{buildroot}%{_bindir}
 install -d -m 500 %{buildroot}%{_sharedstatedir}/copr-keygen/phrases
 install -d -m 500 %{buildroot}%{_sharedstatedir}/copr-keygen/gnupg
+install -d -m 700 %{buildroot}%{_sharedstatedir}/copr-keygen/pool
+install -d -m 700 %{buildroot}%{_sharedstatedir}/copr-keygen/index
 install -d %{buildroot}%{_localstatedir}/log/copr-keygen
 install -d %{buildroot}%{_sysconfdir}/logrotate.d/
 install -d %{buildroot}%{_sysconfdir}/cron.daily
@@ -111,6 +113,8 @@ install -d %{buildroot}%{_sysconfdir}/cron.daily
 %{__install} -p -m 0755 run/gpg_copr.sh %{buildroot}/%{_bindir}/gpg_copr.sh
 %{__install} -p -m 0755 run/gpg-copr %{buildroot}/%{_bindir}/
 %{__install} -p -m 0755 run/gpg-copr-prolong %{buildroot}/%{_bindir}/
+%{__install} -p -m 0755 run/copr-keygen-fill-pool %{buildroot}/%{_bindir}/
+%{__install} -p -m 0755 run/copr-keygen-rebuild-index %{buildroot}/%{_bindir}/
 
 %{__install} -p -m 0755 run/application.py %{buildroot}%{_datadir}/copr-keygen/
 %{__install} -p -m 0644 configs/logrotate %{buildroot}%{_sysconfdir}/logrotate.d/copr-keygen
@@ -155,6 +159,8 @@ systemctl condrestart httpd &>/dev/null || :
 %{_bindir}/gpg_copr.sh
 %{_bindir}/gpg-copr
 %{_bindir}/gpg-copr-prolong
+%{_bindir}/copr-keygen-fill-pool
+%{_bindir}/copr-keygen-rebuild-index
 
 %config %{_sysconfdir}/cron.daily/*
 %config %{_sysconfdir}/logrotate.d/copr-keygen
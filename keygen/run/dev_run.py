@@ -10,6 +10,8 @@ os.environ["COPR_KEYGEN_CONFIG"] = glob.glob("./run/dev_run.conf")
 for d in [
     "/tmp/copr-keygen/var/lib/copr-keygen/phrases/",
     "/tmp/copr-keygen/var/lib/copr-keygen/gnupg",
+    "/tmp/copr-keygen/var/lib/copr-keygen/pool",
+    "/tmp/copr-keygen/var/lib/copr-keygen/index",
     "/tmp/copr-keygen/var/log/copr-keygen"
 ]:
     if not os.path.exists(d):
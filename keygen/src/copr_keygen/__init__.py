@@ -55,6 +55,11 @@ from copr_keygen.logic import (
     get_passphrase_location,
     validate_name_email,
 )
+from copr_keygen.pool import (
+    claim_key,
+    fill_pool_in_background,
+    pool_size,
+)
 
 
 @app.route('/ping')
@@ -68,6 +73,24 @@ def ping():
     return Response("pong\n", content_type="text/plain;charset=UTF-8")
 
 
+@app.route('/metrics')
+def metrics():
+    """
+    Statistics of the pool of pre-generated keys, in the Prometheus text
+    format
+
+    :status 200: always
+    """
+    lines = [
+        "# TYPE copr_keygen_pool_size gauge",
+        "copr_keygen_pool_size {}".format(pool_size(app)),
+        "# TYPE copr_keygen_pool_target gauge",
+        "copr_keygen_pool_target {}".format(app.config["GPG_POOL_SIZE"]),
+    ]
+    return Response("\n".join(lines) + "\n",
+                    content_type="text/plain;charset=UTF-8")
+
+
 @app.route('/gen_key', methods=["post"])
 def gen_key():
     """
@@ -126,14 +149,31 @@ def gen_key():
             response.status_code = 200
             return response
 
-        create_new_key(
-            app,
-            name_real=query["name_real"],
-            name_email=name_email,
-            name_comment=query.get("name_comment", None),
-            key_length=query.get("key_length", app.config["GPG_KEY_LENGTH"]),
-            expire=query.get("expire", app.config["GPG_EXPIRE"]),
-        )
+        key_length = query.get("key_length", app.config["GPG_KEY_LENGTH"])
+        expire = query.get("expire", app.config["GPG_EXPIRE"])
+
+        # Pooled keys are generated with the default parameters
+        pooled = key_length == app.config["GPG_KEY_LENGTH"] \
+            and expire == app.config["GPG_EXPIRE"] \
+            and claim_key(
+                app,
+                name_real=query["name_real"],
+                name_email=name_email,
+                name_comment=query.get("name_comment", None),
+            )
+
+        if not pooled:
+            create_new_key(
+                app,
+                name_real=query["name_real"],
+                name_email=name_email,
+                name_comment=query.get("name_comment", None),
+                key_length=key_length,
+                expire=expire,
+            )
+
+        if app.config["GPG_POOL_SIZE"] > 0:
+            fill_pool_in_background(app)
 
         response = Response("", content_type="text/plain;charset=UTF-8")
         response.status_code = 201
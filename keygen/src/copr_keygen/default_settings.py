@@ -8,6 +8,16 @@ GNUPG_HOMEDIR = "/var/lib/copr-keygen/gnupg"
 GPG_KEY_LENGTH = 2048
 GPG_EXPIRE = "5y"
 
+# Keep this many pre-generated keys in GPG_POOL_DIR, so new keys don't have to
+# be generated on demand (0 disables the pool)
+GPG_POOL_SIZE = 10
+GPG_POOL_DIR = "/var/lib/copr-keygen/pool"
+
+# Index of the keys in keyring (see copr_keygen.keyindex), and how many of
+# them are cached in memory by each process
+KEY_INDEX_DIR = "/var/lib/copr-keygen/index"
+KEY_CACHE_SIZE = 100000
+
 LOG_DIR = "/var/log/copr-keygen"
 import logging
 LOG_LEVEL = logging.INFO
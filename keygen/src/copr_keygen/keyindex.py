@@ -0,0 +1,183 @@
+"""
+Index of the keys in keyring, so we don't have to ask (slow) gpg whether the
+key for the given e-mail exists.
+
+The index is a directory tree in KEY_INDEX_DIR, sharded by the e-mail hash
+so no directory grows too large, e.g.:
+
+    KEY_INDEX_DIR/3a/7f/foo#bar@copr.fedorahosted.org
+
+Each file contains the key fingerprint (or nothing, if the key was found in
+keyring by e-mail, and the fingerprint isn't known).  The keyring itself
+can not be sharded, obs-signd expects all the keys in one GnuPG homedir.
+
+The index is populated by `copr-keygen-rebuild-index` (which creates the
+`.initialized` file), and updated when a key is generated.  The missing index
+entry still needs to be confirmed by gpg, the index update could have failed
+(and the other processes don't share the in-memory cache).  Known keys are
+additionally cached in memory.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from subprocess import PIPE, Popen
+
+from .exceptions import GpgErrorException
+from .gpg import gpg_cmd
+
+log = logging.getLogger(__name__)
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _index_path(app, name_email):
+    digest = hashlib.sha256(name_email.encode("utf-8")).hexdigest()
+    return os.path.join(app.config["KEY_INDEX_DIR"], digest[:2], digest[2:4],
+                        name_email)
+
+
+def _cache_get(name_email):
+    with _cache_lock:
+        fingerprint = _cache.get(name_email)
+        if fingerprint is not None:
+            _cache.move_to_end(name_email)
+        return fingerprint
+
+
+def _cache_put(app, name_email, fingerprint):
+    with _cache_lock:
+        _cache[name_email] = fingerprint
+        _cache.move_to_end(name_email)
+        while len(_cache) > app.config["KEY_CACHE_SIZE"]:
+            _cache.popitem(last=False)
+
+
+def drop_cache():
+    """
+    Forget all the keys cached in memory
+    """
+    with _cache_lock:
+        _cache.clear()
+
+
+def index_enabled(app):
+    """
+    The index directory needs to be created by the administrator (RPM)
+    """
+    index_dir = app.config["KEY_INDEX_DIR"]
+    return bool(index_dir) and os.path.isdir(index_dir)
+
+
+def index_initialized(app):
+    """
+    :return: True if all the keys in keyring are known to the index
+    """
+    return index_enabled(app) and os.path.exists(
+        os.path.join(app.config["KEY_INDEX_DIR"], ".initialized"))
+
+
+def known_fingerprint(app, name_email):
+    """
+    :return: fingerprint of the key for NAME_EMAIL (empty string if the
+        fingerprint is unknown), or None if the key isn't in the index
+    """
+    fingerprint = _cache_get(name_email)
+    if fingerprint is not None:
+        return fingerprint
+
+    if not index_enabled(app):
+        return None
+
+    try:
+        with open(_index_path(app, name_email)) as handle:
+            fingerprint = handle.read().strip()
+    except FileNotFoundError:
+        return None
+
+    _cache_put(app, name_email, fingerprint)
+    return fingerprint
+
+
+def remember_key(app, name_email, fingerprint=""):
+    """
+    Add the key for NAME_EMAIL into the index and cache.  Failures are only
+    logged, the index is re-populated by `copr-keygen-rebuild-index`.
+    """
+    _cache_put(app, name_email, fingerprint)
+    if not index_enabled(app):
+        return
+
+    path = _index_path(app, name_email)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "{0}.{1}.tmp".format(path, os.getpid())
+        with open(tmp_path, "w") as handle:
+            handle.write(fingerprint)
+        os.rename(tmp_path, path)
+    except OSError:
+        log.exception("Failed to add %s into key index", name_email)
+
+
+def _keyring_keys():
+    """
+    Generate (name_email, fingerprint) pairs for all the user IDs in keyring
+    """
+    cmd = gpg_cmd + ["--batch", "--with-colons", "--list-keys"]
+    try:
+        handle = Popen(cmd, stdout=PIPE, stderr=PIPE,
+                       universal_newlines=True)
+    except Exception as e:
+        log.exception(e)
+        raise GpgErrorException(msg="unhandled exception during gpg call",
+                                cmd=" ".join(map(str, cmd)), err=e)
+
+    fingerprint = None
+    primary_fingerprint = False
+    for line in handle.stdout:
+        fields = line.rstrip("\n").split(":")
+        if fields[0] == "pub":
+            fingerprint = None
+            primary_fingerprint = True
+        elif fields[0] == "fpr" and primary_fingerprint:
+            # the first fpr record after pub belongs to the primary key
+            fingerprint = fields[9]
+            primary_fingerprint = False
+        elif fields[0] == "sub":
+            primary_fingerprint = False
+        elif fields[0] == "uid" and fingerprint:
+            user_id = fields[9]
+            if "<" in user_id and user_id.endswith(">"):
+                yield user_id.rsplit("<", 1)[1][:-1], fingerprint
+
+    _, stderr = handle.communicate()
+    if handle.returncode != 0:
+        raise GpgErrorException(msg=stderr, cmd=" ".join(map(str, cmd)))
+
+
+def rebuild_index(app):
+    """
+    Add all the keys from keyring into the index, and mark it initialized.
+    Entries are never removed from the index here, because a key could have
+    been added by a concurrent request after gpg listed the keyring.
+
+    :return: number of the newly indexed keys
+    """
+    if not index_enabled(app):
+        raise GpgErrorException(msg="Key index directory {} doesn't exist"
+                                .format(app.config["KEY_INDEX_DIR"]))
+    added = 0
+    for name_email, fingerprint in _keyring_keys():
+        if known_fingerprint(app, name_email) == fingerprint:
+            continue
+        remember_key(app, name_email, fingerprint)
+        added += 1
+
+    with open(os.path.join(app.config["KEY_INDEX_DIR"], ".initialized"),
+              "w"):
+        pass
+    log.info("Key index rebuilt, {} keys added".format(added))
+    return added
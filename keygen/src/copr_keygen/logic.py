@@ -9,6 +9,7 @@ import sys
 
 from .exceptions import GpgErrorException, KeygenServiceBaseException
 from .gpg import gpg_cmd
+from .keyindex import known_fingerprint, remember_key
 
 log = logging.getLogger(__name__)
 
@@ -66,13 +67,25 @@ def validate_name_email(name_email):
     return True
 
 
-def user_exists(app, mail):
+def user_exists(app, mail, use_index=True):
     """ Checks if the user identified by mail presents in keyring
 
+    :param use_index: consult the key index first, and ask gpg only when
+        the key isn't in the index
     :return: bool True when user present
     :raises: GpgErrorException
 
     """
+    if use_index:
+        if known_fingerprint(app, mail) is not None:
+            log.debug("user {} has keys in key index".format(mail))
+            ensure_passphrase_exist(app, mail)
+            return True
+        # Even the initialized index may miss the key (failed index write
+        # in another process), and we must not generate a second key.  This
+        # is only the case before the key is generated, anyway.
+        log.debug("user {} not found in key index, asking gpg".format(mail))
+
     cmd = gpg_cmd + ["--armor", "--batch", "--export", "<{0}>".format(mail)]
 
     try:
@@ -87,6 +100,8 @@ def user_exists(app, mail):
         # TODO: validate that the key is ultimately trusted
         log.debug("user {} has keys in keyring".format(mail))
         ensure_passphrase_exist(app, mail)
+        if use_index:
+            remember_key(app, mail)
         return True
     elif "nothing exported" in stderr.decode("utf-8"):
         log.debug("user {} not found in keyring".format(mail))
@@ -98,6 +113,19 @@ def user_exists(app, mail):
         raise err
 
 
+def created_fingerprint(status_output):
+    """
+    Find the fingerprint of the generated key in the `gpg --status-fd` output
+    :return: fingerprint, or empty string if not found
+    """
+    for line in status_output.splitlines():
+        # [GNUPG:] KEY_CREATED P <fingerprint>
+        fields = line.split()
+        if fields[:2] == ["[GNUPG:]", "KEY_CREATED"]:
+            return fields[3]
+    return ""
+
+
 template = """
 %no-protection
 Key-Type: {key_type}
@@ -148,7 +176,7 @@ def create_new_key(
         raise GpgErrorException(msg="Failed to write tmp file for gen_key",
                                 err=e)
 
-    cmd = gpg_cmd + ["--batch", "--gen-key", out.name]
+    cmd = gpg_cmd + ["--batch", "--status-fd", "1", "--gen-key", out.name]
 
     log.debug("CMD: {}".format(' '.join(map(str, cmd))))
     try:
@@ -166,10 +194,11 @@ def create_new_key(
     log.info("stderr: {}".format(stderr))
     if handle.returncode == 0:
         # TODO: validate that we really got armored gpg key
-        if not user_exists(app, name_email):
+        if not user_exists(app, name_email, use_index=False):
             raise GpgErrorException(
                 msg="Key was created, but not found in keyring"
                     "this shouldn't be possible")
+        remember_key(app, name_email, created_fingerprint(stdout.decode()))
         log.info("Created key-pair for: {} ".format(name_email))
     else:
         raise GpgErrorException(msg=stderr.decode())
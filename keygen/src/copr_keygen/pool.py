@@ -0,0 +1,226 @@
+"""
+Pool of pre-generated GPG key-pairs.
+
+Generating a new RSA key may take many seconds (especially on VMs starving
+for entropy), and the first build of every new project waits for it.  So we
+keep a pool of keys generated in advance with a placeholder user ID.  When
+a new key is requested, the requested user ID is added to one of the pooled
+keys and the placeholder user ID is removed, which is a matter of
+milliseconds.  The pooled keys don't expire, the expiration (GPG_EXPIRE) is
+set when the key is claimed, so the time spent in the pool isn't taken off
+the key lifetime.
+
+Each pooled key is represented by an empty file named by the key fingerprint
+in the GPG_POOL_DIR directory.  Claiming the key means removing the file,
+so only one process can succeed.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from subprocess import PIPE, Popen
+
+from .exceptions import GpgErrorException
+from .gpg import gpg_cmd
+from .keyindex import remember_key
+from .logic import created_fingerprint, user_exists
+from .util import file_lock
+
+log = logging.getLogger(__name__)
+
+
+PLACEHOLDER_NAME = "copr-keygen pool key"
+PLACEHOLDER_DOMAIN = "copr-keygen.invalid"
+
+template = """
+%no-protection
+Key-Type: RSA
+Key-Length: {key_length}
+Name-Real: {name_real}
+Name-Email: {name_email}
+Expire-Date: {expire}
+%commit
+"""
+
+
+def _gpg(args, stdin=None):
+    """
+    Run the gpg command with ARGS, optionally feeding it with STDIN
+    :return: stdout of the command
+    :raises: GpgErrorException
+    """
+    cmd = gpg_cmd + args
+    log.debug("CMD: {}".format(' '.join(map(str, cmd))))
+    try:
+        handle = Popen(cmd, stdin=PIPE, stdout=PIPE, stderr=PIPE)
+        stdout, stderr = handle.communicate(
+            stdin.encode("utf-8") if stdin else None)
+    except Exception as e:
+        log.exception(e)
+        raise GpgErrorException(msg="unhandled exception during gpg call",
+                                cmd=" ".join(map(str, cmd)), err=e)
+
+    if handle.returncode != 0:
+        raise GpgErrorException(msg=stderr.decode(),
+                                cmd=" ".join(map(str, cmd)))
+    return stdout.decode("utf-8")
+
+
+def pool_keys(app):
+    """
+    :return: sorted list of fingerprints of the keys available in the pool
+    """
+    try:
+        names = os.listdir(app.config["GPG_POOL_DIR"])
+    except FileNotFoundError:
+        return []
+    return sorted(name for name in names if not name.startswith("."))
+
+
+def pool_size(app):
+    """
+    :return: number of the keys available in the pool
+    """
+    return len(pool_keys(app))
+
+
+def generate_pool_key(app):
+    """
+    Generate a new key with a placeholder user ID, and put it into the pool
+    :return: fingerprint of the new key
+    """
+    params = template.format(
+        key_length=app.config["GPG_KEY_LENGTH"],
+        name_real=PLACEHOLDER_NAME,
+        name_email="pool-{0}@{1}".format(uuid.uuid4().hex,
+                                         PLACEHOLDER_DOMAIN),
+        # set in _assign_key()
+        expire=0,
+    )
+    stdout = _gpg(["--batch", "--status-fd", "1", "--gen-key"], stdin=params)
+
+    fingerprint = created_fingerprint(stdout)
+    if not fingerprint:
+        raise GpgErrorException(msg="Pool key created, but gpg didn't "
+                                    "report its fingerprint", stdout=stdout)
+
+    with open(os.path.join(app.config["GPG_POOL_DIR"], fingerprint), "w"):
+        pass
+    log.info("Generated pool key {}".format(fingerprint))
+    return fingerprint
+
+
+def fill_pool(app):
+    """
+    Generate keys until there's GPG_POOL_SIZE of them in the pool.  Does
+    nothing if the pool is already being filled by another thread/process.
+    :return: number of generated keys
+    """
+    pool_dir = app.config["GPG_POOL_DIR"]
+    if not os.path.isdir(pool_dir):
+        os.makedirs(pool_dir, mode=0o700)
+
+    generated = 0
+    with file_lock(os.path.join(pool_dir, ".lock"), blocking=False) as locked:
+        if not locked:
+            log.debug("Key pool is already being filled")
+            return generated
+        while pool_size(app) < app.config["GPG_POOL_SIZE"]:
+            generate_pool_key(app)
+            generated += 1
+    return generated
+
+
+def _fill_pool_no_raise(app):
+    try:
+        fill_pool(app)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Failed to fill the key pool")
+
+
+def fill_pool_in_background(app):
+    """
+    Start filling the pool in a daemon thread, if the pool isn't full
+    """
+    if pool_size(app) >= app.config["GPG_POOL_SIZE"]:
+        return None
+    thread = threading.Thread(target=_fill_pool_no_raise, args=(app,),
+                              daemon=True)
+    thread.start()
+    return thread
+
+
+def _placeholder_uid_hash(fingerprint):
+    stdout = _gpg(["--batch", "--with-colons", "--list-keys", fingerprint])
+    for line in stdout.splitlines():
+        fields = line.split(":")
+        if fields[0] != "uid":
+            continue
+        if fields[9].endswith("@{0}>".format(PLACEHOLDER_DOMAIN)):
+            return fields[7]
+    return None
+
+
+def _assign_key(app, fingerprint, name_real, name_email, name_comment):
+    uid = name_real
+    if name_comment:
+        uid += " ({0})".format(name_comment)
+    uid += " <{0}>".format(name_email)
+    _gpg(["--batch", "--quick-add-uid", fingerprint, uid])
+
+    uid_hash = _placeholder_uid_hash(fingerprint)
+    if uid_hash:
+        _gpg(["--batch", "--command-fd", "0", "--edit-key", fingerprint],
+             stdin="uid {0}\ndeluid\ny\nsave\n".format(uid_hash))
+
+    _gpg(["--batch", "--quick-set-expire", fingerprint,
+          app.config["GPG_EXPIRE"]])
+
+    if not user_exists(app, name_email, use_index=False):
+        raise GpgErrorException(
+            msg="User ID was added to pool key {}, but not found in "
+                "keyring".format(fingerprint))
+    remember_key(app, name_email, fingerprint)
+
+
+def _drop_key(fingerprint):
+    try:
+        _gpg(["--batch", "--yes", "--delete-secret-and-public-key",
+              fingerprint])
+    except GpgErrorException:
+        log.exception("Failed to remove broken pool key %s", fingerprint)
+
+
+def claim_key(app, name_real, name_email, name_comment=None):
+    """
+    Take a key from the pool, and re-identify it as NAME_REAL, NAME_EMAIL and
+    NAME_COMMENT (see `create_new_key`).
+    WARNING! This method doesn't check for the key duplicity.
+
+    :return: True if the key was taken from the pool, False if the pool is
+        empty (or disabled) and the key needs to be generated
+    """
+    if app.config["GPG_POOL_SIZE"] <= 0:
+        return False
+
+    for fingerprint in pool_keys(app):
+        try:
+            os.unlink(os.path.join(app.config["GPG_POOL_DIR"], fingerprint))
+        except FileNotFoundError:
+            # claimed by someone else in the meantime
+            continue
+
+        try:
+            _assign_key(app, fingerprint, name_real, name_email, name_comment)
+        except GpgErrorException:
+            log.exception("Failed to use pool key %s for %s", fingerprint,
+                          name_email)
+            _drop_key(fingerprint)
+            continue
+
+        log.info("Assigned pool key {} to: {}".format(fingerprint, name_email))
+        return True
+
+    log.info("Key pool is empty")
+    return False
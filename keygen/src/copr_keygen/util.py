@@ -5,13 +5,24 @@ import os
 from contextlib import contextmanager
 
 @contextmanager
-def file_lock(lock_file):
+def file_lock(lock_file, blocking=True):
+    """
+    Exclusively lock LOCK_FILE.  With BLOCKING=False, don't wait for the lock
+    and yield False if it is held by someone else (True otherwise).
+    """
     if not os.path.isfile(lock_file):
         with open(lock_file, "w") as fd:
             fd.write("1")
     with open(lock_file, "r") as fd:
+        flags = fcntl.LOCK_EX
+        if not blocking:
+            flags |= fcntl.LOCK_NB
         try:
-            fcntl.flock(fd, fcntl.LOCK_EX)
-            yield
+            fcntl.flock(fd, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
         finally:
             fcntl.flock(fd, fcntl.LOCK_UN)
@@ -8,6 +8,7 @@ from copr_keygen.exceptions import KeygenServiceBaseException
 
 
 app.config["PHRASES_DIR"] = "/tmp"
+app.config["GPG_POOL_SIZE"] = 0
 
 def test_ping():
     """ Simple check for simple handle
@@ -89,3 +90,68 @@ class TestGenKey(object):
         with app.test_client() as c:
             rv = c.post('/gen_key', data=json_data)
             assert rv.status_code == 500
+
+
+@mock.patch("copr_keygen.fill_pool_in_background")
+@mock.patch("copr_keygen.claim_key")
+@mock.patch("copr_keygen.create_new_key")
+@mock.patch("copr_keygen.user_exists")
+class TestGenKeyPool(object):
+
+    def setup_method(self, _method):
+        app.config["GPG_POOL_SIZE"] = 5
+
+    def teardown_method(self, _method):
+        app.config["GPG_POOL_SIZE"] = 0
+
+    def test_gen_key_from_pool(self, user_exists, create_new_key, claim_key,
+                               fill_pool):
+        user_exists.return_value = False
+        claim_key.return_value = True
+
+        with app.test_client() as c:
+            rv = c.post('/gen_key', data=json_data)
+            assert rv.status_code == 201
+
+        assert claim_key.called
+        assert not create_new_key.called
+        assert fill_pool.called
+
+    def test_gen_key_empty_pool(self, user_exists, create_new_key, claim_key,
+                                fill_pool):
+        user_exists.return_value = False
+        claim_key.return_value = False
+
+        with app.test_client() as c:
+            rv = c.post('/gen_key', data=json_data)
+            assert rv.status_code == 201
+
+        assert claim_key.called
+        assert create_new_key.called
+        assert fill_pool.called
+
+    def test_gen_key_non_default_params(self, user_exists, create_new_key,
+                                        claim_key, _fill_pool):
+        user_exists.return_value = False
+        data = json.dumps({
+            "name_real": "foo_bar",
+            "name_email": "foo#bar@example.com",
+            "key_length": 4096,
+        })
+
+        with app.test_client() as c:
+            rv = c.post('/gen_key', data=data)
+            assert rv.status_code == 201
+
+        assert not claim_key.called
+        assert create_new_key.call_args[1]["key_length"] == 4096
+
+
+@mock.patch("copr_keygen.pool_size")
+def test_metrics(pool_size):
+    pool_size.return_value = 3
+    with app.test_client() as c:
+        rv = c.get('/metrics')
+        assert rv.status_code == 200
+        assert b"copr_keygen_pool_size 3\n" in rv.data
+        assert b"copr_keygen_pool_target 0\n" in rv.data
@@ -0,0 +1,119 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+from unittest import mock
+
+import pytest
+
+from copr_keygen import app
+from copr_keygen.keyindex import (
+    drop_cache,
+    index_initialized,
+    known_fingerprint,
+    rebuild_index,
+    remember_key,
+)
+from copr_keygen.logic import user_exists
+
+
+GPG_BINARY = shutil.which("gpg2") or shutil.which("gpg")
+
+TEST_EMAIL = "foo#bar@copr.fedorahosted.org"
+
+
+class TestKeyIndex(object):
+
+    def setup_method(self, _method):
+        self.workdir = tempfile.mkdtemp(prefix="copr-keygen-test-")
+        self.index_dir = os.path.join(self.workdir, "index")
+        os.mkdir(self.index_dir)
+        self.homedir = os.path.join(self.workdir, "gnupg")
+        os.mkdir(self.homedir, 0o700)
+        self.gpg_cmd = [GPG_BINARY, "--homedir", self.homedir,
+                        "--no-auto-check-trustdb"]
+        self.patchers = [
+            mock.patch("copr_keygen.keyindex.gpg_cmd", self.gpg_cmd),
+            mock.patch.dict(app.config, {
+                "PHRASES_DIR": self.workdir,
+                "KEY_INDEX_DIR": self.index_dir,
+                "KEY_CACHE_SIZE": 2,
+            }),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        drop_cache()
+
+    def teardown_method(self, _method):
+        for patcher in self.patchers:
+            patcher.stop()
+        drop_cache()
+        subprocess.call(["gpgconf", "--homedir", self.homedir, "--kill",
+                         "all"], stderr=subprocess.DEVNULL)
+        shutil.rmtree(self.workdir)
+
+    def test_remember_key(self):
+        assert known_fingerprint(app, TEST_EMAIL) is None
+        remember_key(app, TEST_EMAIL, "ABCDEF")
+        assert known_fingerprint(app, TEST_EMAIL) == "ABCDEF"
+
+        # sharded by the e-mail hash
+        files = []
+        for root, _, filenames in os.walk(self.index_dir):
+            files += [os.path.relpath(os.path.join(root, name),
+                                      self.index_dir) for name in filenames]
+        assert len(files) == 1
+        assert files[0].split(os.sep)[2] == TEST_EMAIL
+
+        # read from the index, not from the cache
+        drop_cache()
+        assert known_fingerprint(app, TEST_EMAIL) == "ABCDEF"
+
+    def test_disabled_index(self):
+        app.config["KEY_INDEX_DIR"] = os.path.join(self.workdir, "missing")
+        remember_key(app, TEST_EMAIL, "ABCDEF")
+        assert not os.path.exists(app.config["KEY_INDEX_DIR"])
+        # still cached in memory
+        assert known_fingerprint(app, TEST_EMAIL) == "ABCDEF"
+
+    @mock.patch("copr_keygen.logic.Popen")
+    def test_user_exists(self, popen):
+        remember_key(app, TEST_EMAIL, "ABCDEF")
+        assert user_exists(app, TEST_EMAIL)
+        assert os.path.exists(os.path.join(self.workdir, TEST_EMAIL))
+
+        # the index isn't initialized yet, we need to ask gpg
+        popen.return_value.communicate.return_value = (
+            b"", b"gpg: WARNING: nothing exported")
+        assert not user_exists(app, "foo#baz@copr.fedorahosted.org")
+        assert popen.called
+
+        # even the initialized index may miss the key (failed index write)
+        popen.reset_mock()
+        with open(os.path.join(self.index_dir, ".initialized"), "w"):
+            pass
+        popen.return_value.communicate.return_value = (
+            b"-----BEGIN PGP PUBLIC KEY BLOCK-----", b"")
+        assert user_exists(app, "foo#baz@copr.fedorahosted.org")
+        assert popen.called
+        assert known_fingerprint(app, "foo#baz@copr.fedorahosted.org") == ""
+
+    @pytest.mark.skipif(GPG_BINARY is None, reason="gpg not installed")
+    def test_rebuild_index(self):
+        subprocess.check_call(
+            self.gpg_cmd + ["--batch", "--passphrase", "", "--quick-gen-key",
+                            "foo_bar <{}>".format(TEST_EMAIL), "rsa1024"],
+            stderr=subprocess.DEVNULL)
+        stdout = subprocess.check_output(
+            self.gpg_cmd + ["--batch", "--with-colons", "--list-keys"])
+        fingerprint = [line.split(":")[9] for line in
+                       stdout.decode().splitlines()
+                       if line.startswith("fpr:")][0]
+
+        assert not index_initialized(app)
+        assert rebuild_index(app) == 1
+        assert index_initialized(app)
+        drop_cache()
+        assert known_fingerprint(app, TEST_EMAIL) == fingerprint
+        assert rebuild_index(app) == 0
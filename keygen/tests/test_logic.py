@@ -13,6 +13,7 @@ import pytest
 from copr_keygen import app
 from copr_keygen.exceptions import GpgErrorException, KeygenServiceBaseException
 from copr_keygen.logic import ensure_passphrase_exist
+from copr_keygen.keyindex import drop_cache
 
 import copr_keygen.logic as logic
 
@@ -96,6 +97,9 @@ class MockPopenHandle(object):
 @mock.patch("copr_keygen.logic.ensure_passphrase_exist")
 @mock.patch("copr_keygen.logic.Popen")
 class TestUserExists(TestCase):
+    def setUp(self):
+        drop_cache()
+
     def test_exists(self, popen, ensure_passphrase):
         stdout = "-----BEGIN PGP PUBLIC KEY BLOCK-----\n\nmQENB..."
         popen.return_value = MockPopenHandle(stdout=stdout)
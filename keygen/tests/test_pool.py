@@ -0,0 +1,108 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from unittest import mock
+
+import pytest
+
+from copr_keygen import app
+from copr_keygen.keyindex import drop_cache
+from copr_keygen.logic import user_exists
+from copr_keygen.pool import claim_key, fill_pool, pool_keys, pool_size
+
+import copr_keygen.pool as pool
+
+
+GPG_BINARY = shutil.which("gpg2") or shutil.which("gpg")
+
+
+@pytest.mark.skipif(GPG_BINARY is None, reason="gpg not installed")
+class TestPool(object):
+
+    def setup_method(self, _method):
+        self.workdir = tempfile.mkdtemp(prefix="copr-keygen-test-")
+        self.homedir = os.path.join(self.workdir, "gnupg")
+        os.mkdir(self.homedir, 0o700)
+        self.gpg_cmd = [GPG_BINARY, "--homedir", self.homedir,
+                        "--no-auto-check-trustdb"]
+        self.patchers = [
+            mock.patch("copr_keygen.pool.gpg_cmd", self.gpg_cmd),
+            mock.patch("copr_keygen.logic.gpg_cmd", self.gpg_cmd),
+            mock.patch.dict(app.config, {
+                "PHRASES_DIR": self.workdir,
+                "GPG_POOL_DIR": os.path.join(self.workdir, "pool"),
+                "GPG_POOL_SIZE": 2,
+            }),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def teardown_method(self, _method):
+        for patcher in self.patchers:
+            patcher.stop()
+        drop_cache()
+        # stop the gpg-agent started for the testing homedir
+        subprocess.call(["gpgconf", "--homedir", self.homedir, "--kill",
+                         "all"], stderr=subprocess.DEVNULL)
+        shutil.rmtree(self.workdir)
+
+    def _uids(self, fingerprint):
+        stdout = subprocess.check_output(
+            self.gpg_cmd + ["--batch", "--with-colons", "--list-keys",
+                            fingerprint])
+        return [line.split(":")[9] for line in stdout.decode().splitlines()
+                if line.startswith("uid:")]
+
+    def test_claim_key(self):
+        assert pool_size(app) == 0
+        assert not claim_key(app, "foo_bar", "foo#bar@example.com")
+
+        assert fill_pool(app) == 2
+        assert fill_pool(app) == 0
+        fingerprint = pool_keys(app)[0]
+
+        assert claim_key(app, "foo_bar", "foo#bar@example.com", "comment")
+        assert pool_size(app) == 1
+        assert fingerprint not in pool_keys(app)
+        assert self._uids(fingerprint) == [
+            "foo_bar (comment) <foo#bar@example.com>"]
+        assert user_exists(app, "foo#bar@example.com")
+        assert os.path.exists(os.path.join(self.workdir,
+                                           "foo#bar@example.com"))
+
+    def _expires(self, fingerprint):
+        stdout = subprocess.check_output(
+            self.gpg_cmd + ["--batch", "--with-colons", "--list-keys",
+                            fingerprint])
+        return [line.split(":")[6] for line in stdout.decode().splitlines()
+                if line.startswith("pub:")][0]
+
+    def test_expire_on_claim(self):
+        app.config["GPG_EXPIRE"] = "1y"
+        fill_pool(app)
+        fingerprint = pool_keys(app)[0]
+        # time spent in the pool doesn't count
+        assert self._expires(fingerprint) == ""
+
+        with mock.patch("copr_keygen.pool.pool_keys",
+                        return_value=[fingerprint]):
+            assert claim_key(app, "foo_bar", "foo#bar@example.com")
+        expires = int(self._expires(fingerprint))
+        assert abs(expires - time.time() - 365 * 24 * 3600) < 3 * 24 * 3600
+
+    def test_broken_pool_key(self):
+        os.mkdir(os.path.join(self.workdir, "pool"))
+        # the key doesn't exist in keyring
+        with open(os.path.join(self.workdir, "pool", "ABCDEF"), "w"):
+            pass
+        assert not claim_key(app, "foo_bar", "foo#bar@example.com")
+        assert pool_size(app) == 0
+
+    def test_disabled(self):
+        app.config["GPG_POOL_SIZE"] = 0
+        assert fill_pool(app) == 0
+        assert pool.fill_pool_in_background(app) is None
+        assert not claim_key(app, "foo_bar", "foo#bar@example.com")
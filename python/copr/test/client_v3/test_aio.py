@@ -0,0 +1,207 @@
+"""
+Test the asynchronous client against a local mock Copr Frontend
+"""
+
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+# pylint: disable=wrong-import-position
+from aiohttp import web
+
+from copr.v3 import (CoprNoResultException, CoprRequestException,
+                     CoprValidationException)
+from copr.v3.aio import Client, BuildProxy, next_page
+from copr.v3.proxies.build import BuildProxy as SyncBuildProxy
+
+
+BUILDS = {i: {"id": i, "state": "running"} for i in range(1, 26)}
+
+
+async def _build(request):
+    build_id = int(request.match_info["build_id"])
+    if build_id not in BUILDS:
+        return web.json_response({"error": "Build {0} doesn't exist.".format(build_id)},
+                                 status=404)
+    return web.json_response(BUILDS[build_id])
+
+
+async def _build_list(request):
+    assert request.query["ownername"] == "@copr"
+    assert "packagename" not in request.query
+    limit = int(request.query.get("limit", 10))
+    start = int(request.query.get("cursor", 0))
+    ids = sorted(BUILDS)[start:start + limit]
+    next_cursor = str(start + limit) if start + limit < len(BUILDS) else None
+    return web.json_response({
+        "items": [BUILDS[i] for i in ids],
+        "meta": {"limit": limit, "offset": 0, "order": "id",
+                 "order_type": "ASC", "next_cursor": next_cursor},
+    })
+
+
+async def _build_create_url(request):
+    if request.headers.get("Authorization") is None:
+        return web.json_response({"error": "Login invalid/expired"}, status=403)
+    data = await request.json()
+    return web.json_response({
+        "items": [{"id": 100, "source_package": {"url": data["pkgs"][0]},
+                   "chroots": data.get("chroots")}],
+        "meta": {},
+    })
+
+
+async def _package_build(request):
+    data = await request.json()
+    return web.json_response({"id": 101, "package": data["package_name"]})
+
+
+async def _can_build_in(request):
+    return web.json_response({
+        "can_build_in": request.match_info["who"] == "praiskup"})
+
+
+async def _set_permissions(_request):
+    return web.json_response({"updated": True})
+
+
+async def _monitor(request):
+    return web.json_response({
+        "output": "ok",
+        "fields": request.query.getall("additional_fields[]"),
+    })
+
+
+async def _broken(_request):
+    return web.Response(text="Internal Server Error", status=500)
+
+
+class _MockFrontend(object):
+    def __init__(self):
+        self.runner = None
+        self.url = None
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/api_3/build/list", _build_list)
+        app.router.add_get("/api_3/build/{build_id}", _build)
+        app.router.add_post("/api_3/build/create/url", _build_create_url)
+        app.router.add_post("/api_3/package/build", _package_build)
+        app.router.add_get(
+            "/api_3/project/permissions/can_build_in/{who}/{owner}/{project}",
+            _can_build_in)
+        app.router.add_put(
+            "/api_3/project/permissions/set/{owner}/{project}",
+            _set_permissions)
+        app.router.add_get("/api_3/monitor", _monitor)
+        app.router.add_get("/api_3/project", _broken)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+        self.url = "http://127.0.0.1:{0}".format(port)
+        return self
+
+    async def __aexit__(self, *_args):
+        await self.runner.cleanup()
+
+    @property
+    def config(self):
+        return {"copr_url": self.url, "login": "test", "token": "test"}
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine())
+
+
+def test_concurrent_gets():
+    async def _test():
+        async with _MockFrontend() as frontend:
+            async with Client(frontend.config) as client:
+                builds = await asyncio.gather(*[
+                    client.build_proxy.get(build_id) for build_id in BUILDS])
+                assert [b.id for b in builds] == list(BUILDS)
+                assert builds[0].__proxy__ is client.build_proxy
+                assert builds[0].__response__.status_code == 200
+    _run(_test)
+
+
+def test_errors():
+    async def _test():
+        async with _MockFrontend() as frontend:
+            async with Client(frontend.config) as client:
+                with pytest.raises(CoprNoResultException) as exc:
+                    await client.build_proxy.get(1000)
+                assert "doesn't exist" in str(exc.value)
+                with pytest.raises(CoprRequestException) as exc:
+                    await client.project_proxy.get("@copr", "foo")
+                assert "not in JSON format" in str(exc.value)
+                with pytest.raises(CoprValidationException):
+                    await client.build_proxy.create_from_url(
+                        "@copr", "foo", "http://a http://b")
+    _run(_test)
+
+
+def test_unable_to_connect():
+    async def _test():
+        async with _MockFrontend() as frontend:
+            config = frontend.config
+        proxy = BuildProxy(config)
+        with pytest.raises(CoprRequestException) as exc:
+            await proxy.get(1)
+        assert "Unable to connect" in str(exc.value)
+        await proxy.session.close()
+    _run(_test)
+
+
+def test_create_with_auth():
+    async def _test():
+        async with _MockFrontend() as frontend:
+            async with Client(frontend.config) as client:
+                build = await client.build_proxy.create_from_url(
+                    "@copr", "foo", "http://example.com/foo.src.rpm",
+                    buildopts={"chroots": ["fedora-rawhide-x86_64"]})
+                assert build.id == 100
+                assert build.chroots == ["fedora-rawhide-x86_64"]
+    _run(_test)
+
+
+def test_query_params_and_pagination():
+    async def _test():
+        async with _MockFrontend() as frontend:
+            async with Client(frontend.config) as client:
+                result = await client.monitor_proxy.monitor(
+                    "@copr", "foo", additional_fields=["build_url", "url_build_log"])
+                assert result.fields == ["build_url", "url_build_log"]
+
+                page = await client.build_proxy.get_list(
+                    "@copr", "foo", pagination={"limit": 10})
+                ids = []
+                while page:
+                    ids.extend(build.id for build in page)
+                    page = await next_page(page)
+                assert ids == list(BUILDS)
+    _run(_test)
+
+
+def test_generated_from_sync():
+    async def _test():
+        async with _MockFrontend() as frontend:
+            async with Client(frontend.config) as client:
+                build = await client.package_proxy.build("@copr", "foo", "bar")
+                assert build.id == 101
+                assert build.package == "bar"
+                assert build.__proxy__ is client.package_proxy
+
+                proxy = client.project_proxy
+                assert await proxy.can_build_in("praiskup", "@copr", "foo")
+                assert not await proxy.can_build_in("frostyx", "@copr", "foo")
+                assert await proxy.set_permissions(
+                    "@copr", "foo", {"praiskup": {"admin": "approved"}}) is None
+                # authenticated only once
+                assert proxy._auth is not None  # pylint: disable=protected-access
+
+    assert BuildProxy.get.__doc__ == SyncBuildProxy.get.__doc__
+    _run(_test)
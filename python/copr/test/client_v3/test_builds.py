@@ -1,4 +1,6 @@
+import pytest
 from requests import Response
+from requests.exceptions import ConnectionError, ReadTimeout  # pylint: disable=redefined-builtin
 from copr.v3 import Client, BuildProxy
 from copr.v3.requests import Request
 
@@ -35,3 +37,81 @@ def test_build_distgit(send):
         'ownername': 'praiskup', 'projectname': 'ping',
         'distgit': None, 'namespace': None, 'package_name': 'mock',
         'committish': 'master', 'project_dirname': None}
+
+
+class _FakeUploadFrontend(object):
+    """
+    Implement the chunked upload protocol, fail the second PUT request (by
+    PUT_ERROR), and the first FAILED_GETS offset queries
+    """
+    def __init__(self, put_error=ConnectionError, failed_gets=0):
+        self.data = b""
+        self.puts = 0
+        self.gets = 0
+        self.created = None
+        self.put_error = put_error
+        self.failed_gets = failed_gets
+
+    def _response(self, data, status_code=200):
+        response = mock.Mock(spec=Response)
+        response.status_code = status_code
+        response.json.return_value = data
+        return response
+
+    def _upload(self):
+        return {"upload_id": "tmp123", "offset": len(self.data),
+                "size": 25, "chunk_size": 100}
+
+    def request(self, method, url, **kwargs):
+        if url.endswith("/build/upload"):
+            return self._response(self._upload())
+        if url.endswith("/build/upload/tmp123") and method == "GET":
+            self.gets += 1
+            if self.gets <= self.failed_gets:
+                raise ConnectionError()
+            return self._response(self._upload())
+        if url.endswith("/build/upload/tmp123"):
+            self.puts += 1
+            if kwargs["params"]["offset"] != len(self.data):
+                return self._response({"error": "Wrong offset"}, 409)
+            self.data += kwargs["data"]
+            if self.puts == 2:
+                # the chunk was stored, but the connection broke
+                raise self.put_error()
+            return self._response(self._upload())
+        if url.endswith("/build/create/chunked-upload"):
+            self.created = kwargs["json"]
+            return self._response({"id": 1})
+        raise AssertionError(url)
+
+
+@pytest.mark.parametrize("put_error,failed_gets", [
+    (ConnectionError, 0),
+    (ReadTimeout, 2),
+])
+@mock.patch("copr.v3.proxies.build.time.sleep")
+def test_build_chunked_upload(_sleep, put_error, failed_gets, tmpdir):
+    path = str(tmpdir.join("foo-1.0-1.src.rpm"))
+    with open(path, "wb") as f:
+        f.write(b"0123456789" * 2 + b"abcde")
+
+    config = {"copr_url": "http://copr", "login": "test", "token": "test",
+              "chunked_upload_threshold": 10, "upload_chunk_size": 10}
+    frontend = _FakeUploadFrontend(put_error, failed_gets)
+    progress = mock.Mock()
+    with mock.patch("requests.Session.request", side_effect=frontend.request):
+        build = BuildProxy(config).create_from_file(
+            "praiskup", "ping", path,
+            buildopts={"chroots": ["fedora-rawhide-x86_64"],
+                       "progress_callback": progress})
+    assert build.id == 1
+    assert frontend.data == b"0123456789" * 2 + b"abcde"
+    # the failed chunk is not re-sent, the upload continues after it
+    assert frontend.puts == 3
+    assert frontend.gets == failed_gets + 1
+    assert [c[0][0].bytes_read for c in progress.call_args_list] == [10, 20, 25]
+    assert frontend.created == {
+        "ownername": "praiskup", "projectname": "ping",
+        "project_dirname": None, "upload_id": "tmp123",
+        "chroots": ["fedora-rawhide-x86_64"],
+    }
@@ -0,0 +1,70 @@
+import pytest
+from copr.test import mock
+from copr.v3 import (BuildProxy, PackageProxy, CoprNoResultException,
+                     CoprValidationException)
+from copr.v3.bulk import run_concurrently, BulkResult
+from munch import Munch
+
+
+def test_run_concurrently():
+    def _fun(item):
+        if item % 3 == 0:
+            raise ValueError(item)
+        return item * 2
+
+    results = run_concurrently(_fun, range(10), concurrency=3)
+    assert [r.item for r in results] == list(range(10))
+    assert [r.ok for r in results] == [i % 3 != 0 for i in range(10)]
+    assert [r.result for r in results if r.ok] == [2, 4, 8, 10, 14, 16]
+    assert all(isinstance(r.exception, ValueError)
+               for r in results if not r.ok)
+
+
+def test_run_concurrently_empty():
+    assert run_concurrently(lambda x: x, []) == []
+
+
+class TestBulkProxies(object):
+    config = {"copr_url": "http://copr", "login": "test", "token": "test"}
+
+    @mock.patch.object(BuildProxy, "get")
+    def test_get_many(self, get):
+        def _get(build_id):
+            if build_id == 2:
+                raise CoprNoResultException("Build 2 doesn't exist")
+            return Munch(id=build_id)
+        get.side_effect = _get
+
+        results = BuildProxy(self.config).get_many([1, 2, 3])
+        assert all(isinstance(r, BulkResult) for r in results)
+        assert [r.result.id for r in results if r.ok] == [1, 3]
+        assert isinstance(results[1].exception, CoprNoResultException)
+
+    @mock.patch("copr.v3.proxies.build.BuildProxy._create")
+    @mock.patch("copr.v3.auth.token.ApiToken.make")
+    def test_create_many(self, _make, create):
+        create.side_effect = lambda endpoint, data, buildopts: Munch(
+            endpoint=endpoint, package=data["package_name"], opts=buildopts)
+        buildopts = {"chroots": ["fedora-rawhide-x86_64"]}
+        results = BuildProxy(self.config).create_many("distgit", [
+            {"ownername": "@copr", "projectname": "foo", "packagename": "a",
+             "buildopts": buildopts},
+            {"ownername": "@copr", "projectname": "foo", "packagename": "b",
+             "buildopts": buildopts},
+        ])
+        assert [r.result.package for r in results] == ["a", "b"]
+        assert results[0].result.endpoint == "/build/create/distgit"
+        assert results[0].result.opts is not buildopts
+
+    def test_create_many_invalid(self):
+        with pytest.raises(CoprValidationException):
+            BuildProxy(self.config).create_many("foo", [{}])
+
+    @mock.patch.object(PackageProxy, "delete")
+    @mock.patch("copr.v3.auth.token.ApiToken.make")
+    def test_package_delete_many(self, _make, delete):
+        delete.side_effect = lambda owner, project, name: Munch(name=name)
+        results = PackageProxy(self.config).delete_many(
+            "@copr", "foo", ["a", "b", "c"], concurrency=2)
+        assert [r.result.name for r in results] == ["a", "b", "c"]
+        assert delete.call_count == 3
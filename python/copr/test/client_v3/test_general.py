@@ -1,3 +1,9 @@
+import os
+import subprocess
+import sys
+
+import copr
+
 from copr.v3.proxies import BaseProxy
 
 
@@ -9,3 +15,13 @@ class TestBaseProxy(object):
         # Slashes or port number should not be a problem
         proxy = BaseProxy({"copr_url": "http://copr:5000/"})
         assert proxy.api_base_url == "http://copr:5000/api_3/"
+
+
+def test_submodule_attributes():
+    # a fresh interpreter, the submodules are not imported by the tests yet
+    script = ("import copr.v3; "
+              "print(copr.v3.helpers.wait.__name__, copr.v3.bulk.__name__)")
+    topdir = os.path.dirname(os.path.dirname(copr.__file__))
+    output = subprocess.check_output([sys.executable, "-c", script],
+                                     cwd=topdir)
+    assert output.decode("utf-8").split() == ["wait", "copr.v3.bulk"]
@@ -1,8 +1,11 @@
 import pytest
 from munch import Munch
 from copr.test import mock
-from copr.v3.helpers import wait, succeeded, List
+from copr.v3.helpers import (
+    wait, succeeded, List, Backoff, get_build_states,
+)
 from copr.v3 import BuildProxy, CoprException
+from copr.v3.exceptions import CoprNoResultException, CoprRequestException
 
 
 class TestHelpers(object):
@@ -19,6 +22,17 @@ class TestHelpers(object):
 
 
 class TestWait(object):
+    @pytest.fixture(autouse=True)
+    def _old_frontend(self):
+        """
+        By default, simulate older frontend without the /build/states endpoint
+        """
+        not_found = CoprNoResultException(
+            "Not found", response=mock.Mock(status_code=404))
+        with mock.patch("copr.v3.proxies.build.BuildProxy.get_states",
+                        side_effect=not_found):
+            yield
+
     @mock.patch("copr.v3.proxies.build.BuildProxy.get")
     def test_wait(self, mock_get):
         build = MunchMock(id=1, state="importing")
@@ -64,6 +78,60 @@ class TestWait(object):
         wait(build, interval=0, callback=callback)
         assert callback.called
 
+    @mock.patch("time.sleep")
+    @mock.patch("copr.v3.proxies.build.BuildProxy.get_states")
+    @mock.patch("copr.v3.proxies.build.BuildProxy.get")
+    def test_wait_batched_states(self, mock_get, mock_states, mock_sleep):
+        builds = [MunchMock(id=1, state="running"), MunchMock(id=2, state="running")]
+        mock_states.side_effect = [
+            Munch(builds=[{"id": 1, "state": "running"}, {"id": 2, "state": "running"}]),
+            Munch(builds=[{"id": 1, "state": "running"}, {"id": 2, "state": "running"}]),
+            Munch(builds=[{"id": 1, "state": "succeeded"}, {"id": 2, "state": "running"}]),
+            Munch(builds=[{"id": 2, "state": "failed"}]),
+        ]
+        mock_get.side_effect = lambda build_id: MunchMock(
+            id=build_id, state="succeeded" if build_id == 1 else "failed")
+
+        result = wait(builds, interval=30, min_interval=5)
+        assert sorted(b.state for b in result) == ["failed", "succeeded"]
+        # full build info is only downloaded for the changed builds
+        assert sorted(c[0][0] for c in mock_get.call_args_list) == [1, 2]
+        assert [c[0][0] for c in mock_sleep.call_args_list] == [5, 10, 5]
+
+    def test_wait_empty(self):
+        callback = mock.Mock()
+        assert wait([], callback=callback) == []
+        callback.assert_called_once_with([])
+
+    @mock.patch("copr.v3.proxies.build.BuildProxy.get_states")
+    @mock.patch("copr.v3.proxies.build.BuildProxy.get")
+    def test_build_states_fallback(self, mock_get, mock_states):
+        proxy = MunchMock.__proxy__
+        mock_get.side_effect = lambda build_id: MunchMock(id=build_id,
+                                                          state="running")
+        # older frontend without the /build/states endpoint
+        mock_states.side_effect = CoprNoResultException(
+            "Not found", response=mock.Mock(status_code=404))
+        assert get_build_states(proxy, [1, 2]) == {1: "running", 2: "running"}
+        assert mock_get.call_count == 2
+
+    @mock.patch("copr.v3.proxies.build.BuildProxy.get_states")
+    @mock.patch("copr.v3.proxies.build.BuildProxy.get")
+    def test_build_states_error(self, mock_get, mock_states):
+        mock_states.side_effect = CoprRequestException(
+            "Internal error", response=mock.Mock(status_code=500))
+        with pytest.raises(CoprRequestException):
+            get_build_states(MunchMock.__proxy__, [1, 2])
+        assert not mock_get.called
+
+
+
+def test_backoff():
+    backoff = Backoff(5, 30)
+    assert [backoff.next() for _ in range(5)] == [5, 10, 20, 30, 30]
+    assert backoff.next(changed=True) == 5
+    assert Backoff(60, 30).next(changed=True) == 30
+
 
 class MunchMock(Munch):
     __proxy__ = BuildProxy({"copr_url": "http://copr", "login": "test", "token": "test"})
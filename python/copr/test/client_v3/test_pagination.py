@@ -0,0 +1,57 @@
+"""
+Test following the pages of APIv3 list responses
+"""
+
+from requests import PreparedRequest, Response
+from copr.test import mock
+from copr.v3.helpers import List
+from copr.v3.pagination import next_page, all_pages
+from copr.v3.requests import munchify
+
+
+def _response(url, items, meta):
+    response = mock.Mock(spec=Response)
+    response.json.return_value = {"items": items, "meta": meta}
+    request = PreparedRequest()
+    request.prepare(method="GET", url=url)
+    response.request = request
+    return response
+
+
+class TestPagination(object):
+    url = "http://copr/api_3/build/list?ownername=foo&projectname=bar"
+
+    @mock.patch("requests.Session.send")
+    def test_next_page_offset(self, send):
+        meta = {"limit": 2, "offset": 0, "order": "id", "order_type": "DESC"}
+        objects = munchify(_response(self.url, [{"id": 2}, {"id": 1}], meta))
+        next_page(objects)
+        request = send.call_args[0][0]
+        assert "offset=2" in request.url
+        assert "cursor" not in request.url
+
+    @mock.patch("requests.Session.send")
+    def test_next_page_cursor(self, send):
+        meta = {"limit": 2, "offset": 0, "order": "id", "order_type": "DESC",
+                "cursor": None, "next_cursor": "abc"}
+        objects = munchify(_response(self.url + "&offset=10",
+                                     [{"id": 2}, {"id": 1}], meta))
+        next_page(objects)
+        request = send.call_args[0][0]
+        assert "cursor=abc" in request.url
+        assert "offset" not in request.url
+
+    @mock.patch("requests.Session.send")
+    def test_all_pages_cursor(self, send):
+        meta = {"limit": 2, "offset": 0, "order": "id", "order_type": "DESC",
+                "cursor": None}
+        send.side_effect = [
+            _response(self.url, [{"id": 2}, {"id": 1}],
+                      dict(meta, next_cursor="second")),
+            _response(self.url, [{"id": 0}], dict(meta, next_cursor=None)),
+        ]
+        objects = munchify(_response(self.url, [{"id": 4}, {"id": 3}],
+                                     dict(meta, next_cursor="first")))
+        assert isinstance(objects, List)
+        assert [o.id for o in all_pages(objects)] == [4, 3, 2, 1, 0]
+        assert send.call_count == 2
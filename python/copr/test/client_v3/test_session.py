@@ -0,0 +1,93 @@
+"""
+Test the pooled (keep-alive) HTTP session shared by the client proxies,
+against a local stub Copr Frontend server.
+"""
+
+import json
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from copr.v3 import Client
+from copr.v3.proxies.build import BuildProxy
+
+
+class _StubFrontend(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), _StubHandler)
+        self.connections = 0
+        self.requests = 0
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.requests += 1
+        build_id = int(self.path.rstrip("/").split("/")[-1])
+        body = json.dumps({"id": build_id, "state": "succeeded"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestSession(object):
+    server = None
+    thread = None
+
+    def setup_method(self, _method):
+        self.server = _StubFrontend()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def teardown_method(self, _method):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    @property
+    def config(self):
+        return {
+            "copr_url": "http://127.0.0.1:{0}".format(self.server.server_port),
+            "login": "test",
+            "token": "test",
+        }
+
+    def test_shared_session(self):
+        client = Client(self.config)
+        assert client.build_proxy.session is client.session
+        assert client.package_proxy.session is client.session
+        assert client.build_proxy.get(1).id == 1
+        assert client.project_proxy.request.session.get(
+            self.config["copr_url"] + "/api_3/build/2").json()["id"] == 2
+        assert self.server.connections == 1
+        client.close()
+
+    def test_benchmark_build_get(self):
+        """
+        1000 sequential build_proxy.get() calls go through one connection
+        """
+        calls = 1000
+        proxy = BuildProxy(self.config)
+        for build_id in range(calls):
+            assert proxy.get(build_id).id == build_id
+        assert self.server.requests == calls
+        assert self.server.connections == 1
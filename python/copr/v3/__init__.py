@@ -1,22 +1,66 @@
+"""
+Python client for Copr APIv3.  The public names are imported lazily (on
+Python 3.7+), so e.g. `from copr.v3 import config_from_file` doesn't import
+the HTTP stack (requests, urllib3, ...) and all the proxies.
+"""
+
 from __future__ import absolute_import
 
-from .helpers import config_from_file
-from .client import Client
-from .proxies import BaseProxy
-from .proxies.project import ProjectProxy
-from .proxies.build import BuildProxy
-from .proxies.package import PackageProxy
-from .proxies.mock_chroot import MockChrootProxy
-from .proxies.project_chroot import ProjectChrootProxy
-from .proxies.build_chroot import BuildChrootProxy
-from .proxies.module import ModuleProxy
-from .exceptions import (CoprException,
-                         CoprRequestException,
-                         CoprNoResultException,
-                         CoprValidationException,
-                         CoprNoConfigException,
-                         CoprConfigException,
-                         CoprAuthException)
+import importlib
+import sys
+
+
+# Public name => module (relative to this package) it is defined in
+_LAZY_IMPORTS = {
+    "config_from_file": ".helpers",
+    "Client": ".client",
+
+    "BaseProxy": ".proxies",
+    "BuildProxy": ".proxies.build",
+    "PackageProxy": ".proxies.package",
+    "MockChrootProxy": ".proxies.mock_chroot",
+    "ProjectChrootProxy": ".proxies.project_chroot",
+    "BuildChrootProxy": ".proxies.build_chroot",
+    "ModuleProxy": ".proxies.module",
+    "ProjectProxy": ".proxies.project",
+
+    "CoprException": ".exceptions",
+    "CoprRequestException": ".exceptions",
+    "CoprNoResultException": ".exceptions",
+    "CoprValidationException": ".exceptions",
+    "CoprNoConfigException": ".exceptions",
+    "CoprConfigException": ".exceptions",
+    "CoprAuthException": ".exceptions",
+}
+
+# Submodules that used to be available as attributes (e.g. `copr.v3.helpers`)
+# thanks to the eager imports, the asynchronous `aio` needs to be imported
+# explicitly
+_SUBMODULES = ["auth", "bulk", "client", "exceptions", "helpers",
+               "pagination", "proxies", "requests"]
+
+
+def _import(name):
+    module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name in _SUBMODULES:
+            return importlib.import_module("." + name, __name__)
+        if name not in _LAZY_IMPORTS:
+            raise AttributeError("module {0!r} has no attribute {1!r}"
+                                 .format(__name__, name))
+        return _import(name)
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_IMPORTS) | set(_SUBMODULES))
+else:
+    for _name in _LAZY_IMPORTS:
+        _import(_name)
 
 
 __all__ = [
@@ -0,0 +1,75 @@
+"""
+Asynchronous (asyncio) Copr APIv3 client, requires the `aiohttp` package.
+
+    async with Client.create_from_config_file() as client:
+        builds = await asyncio.gather(*[
+            client.build_proxy.get(build_id) for build_id in build_ids])
+"""
+
+from ..helpers import config_from_file
+from ..pagination import next_page_url
+from ..requests import munchify
+from .requests import AsyncResponse, create_session
+from .proxies import (BaseProxy, BuildProxy, PackageProxy, ProjectProxy,
+                      MonitorProxy)
+
+
+class Client(object):
+    """
+    Asynchronous variant of `copr.v3.Client`, all the proxies share one pool
+    of keep-alive connections.  It needs to be created from a coroutine, and
+    closed by `await client.close()` (or used as `async with Client(...)`).
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.session = create_session(config)
+        self.base_proxy = BaseProxy(config, self.session)
+        self.project_proxy = ProjectProxy(config, self.session)
+        self.build_proxy = BuildProxy(config, self.session)
+        self.package_proxy = PackageProxy(config, self.session)
+        self.monitor_proxy = MonitorProxy(config, self.session)
+
+    async def close(self):
+        """
+        Close all the connections kept alive by this client
+        """
+        await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_args):
+        await self.close()
+
+    @classmethod
+    def create_from_config_file(cls, path=None):
+        config = config_from_file(path)
+        return cls(config)
+
+
+async def next_page(objects):
+    """
+    Asynchronous variant of `copr.v3.pagination.next_page()`, OBJECTS is
+    a list returned by one of the `get_list()` coroutines.
+    """
+    url = next_page_url(objects)
+    if not url:
+        return None
+    proxy = objects.__proxy__
+    async with proxy.session.get(url) as response:
+        content = await response.read()
+    result = munchify(AsyncResponse(response, content))
+    result.__proxy__ = proxy
+    return result
+
+
+__all__ = [
+    "Client",
+    "BaseProxy",
+    "BuildProxy",
+    "PackageProxy",
+    "ProjectProxy",
+    "MonitorProxy",
+    "next_page",
+]
@@ -0,0 +1,208 @@
+"""
+Asynchronous variants of the `copr.v3.proxies` classes.  The methods accept
+the same arguments as their synchronous counterparts (see their documentation
+for details), but they are coroutines.
+
+The coroutines are generated from the synchronous methods, so the endpoints,
+payloads and result processing are not duplicated here.  The synchronous
+method is run with a request object which doesn't talk to the server; it
+records the request, and the coroutine sends it asynchronously.  Then the
+synchronous method is run again, and the recorded request returns the
+received response (or raises the received exception).  This repeats until
+the synchronous method finishes without any new request.
+"""
+
+import os
+from functools import wraps
+
+from munch import Munch
+
+from ..auth import auth_from_config
+from ..exceptions import CoprException
+from ..helpers import config_from_file, List
+from ..requests import GET
+from .. import proxies
+from ..proxies import build, package, project, monitor
+from .requests import AsyncRequest, create_session
+
+
+class _RequestNeeded(BaseException):
+    """
+    Raised by _ReplayRequest when the synchronous method sends a request that
+    was not sent yet.  Not an Exception subclass, so no `except Exception`
+    in the synchronous code catches it.
+    """
+
+    def __init__(self, kwargs):
+        super().__init__()
+        self.kwargs = kwargs
+
+
+class _ReplayRequest(object):
+    """
+    A stand-in for `copr.v3.requests.Request`, replaying the already received
+    responses (or exceptions) in order.
+    """
+
+    def __init__(self):
+        self.results = []
+        self.position = 0
+
+    def send(self, endpoint, method=GET, data=None, params=None, headers=None,
+             auth=None):
+        # pylint: disable=too-many-arguments
+        if self.position == len(self.results):
+            raise _RequestNeeded({
+                "endpoint": endpoint,
+                "method": method,
+                "data": data,
+                "params": params,
+                "headers": headers,
+                "auth": auth,
+            })
+        result = self.results[self.position]
+        self.position += 1
+        if isinstance(result, CoprException):
+            raise result
+        return result
+
+
+def _asynchronous(method):
+    """
+    Generate a coroutine from the synchronous proxy METHOD
+    """
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        request = _ReplayRequest()
+        sync_proxy = self._sync_proxy(request)
+        while True:
+            request.position = 0
+            try:
+                result = method(sync_proxy, *args, **kwargs)
+                break
+            except _RequestNeeded as needed:
+                request_kwargs = needed.kwargs
+            finally:
+                # don't authenticate again in the next call
+                self._auth = sync_proxy._auth  # pylint: disable=protected-access
+
+            try:
+                response = await self.request.send(**request_kwargs)
+            except CoprException as ex:
+                response = ex
+            request.results.append(response)
+
+        if type(result) in [List, Munch]:
+            result.__proxy__ = self
+        return result
+    return wrapper
+
+
+def generate_from(sync_class, *names):
+    """
+    Class decorator, add coroutines generated from the methods NAMES of the
+    synchronous proxy SYNC_CLASS
+    """
+    def decorate(cls):
+        cls.sync_class = sync_class
+        for name in names:
+            setattr(cls, name, _asynchronous(getattr(sync_class, name)))
+        return cls
+    return decorate
+
+
+@generate_from(proxies.BaseProxy, "home", "auth_check")
+class BaseProxy(object):
+    """
+    Parent class for all other asynchronous proxies
+    """
+
+    sync_class = None
+
+    def __init__(self, config, session=None):
+        """
+        :param config: the client configuration dict
+        :param session: an `aiohttp.ClientSession` shared with other proxies
+            (see `copr.v3.aio.Client`), a new one is created if not specified
+        """
+        self.config = config
+        self.session = session or create_session(config)
+        self.request = AsyncRequest(
+            api_base_url=self.api_base_url,
+            connection_attempts=config.get("connection_attempts", 1),
+            session=self.session,
+        )
+        self._auth = None
+
+    @classmethod
+    def create_from_config_file(cls, path=None):
+        config = config_from_file(path)
+        return cls(config)
+
+    @property
+    def api_base_url(self):
+        return os.path.join(self.config["copr_url"], "api_3", "")
+
+    @property
+    def auth(self):
+        if not self._auth:
+            self._auth = auth_from_config(self.config)
+        return self._auth
+
+    def _sync_proxy(self, request):
+        """
+        Create an instance of the synchronous proxy sending its requests
+        through REQUEST
+        """
+        # pylint: disable=protected-access
+        sync_proxy = self.sync_class.__new__(self.sync_class)
+        sync_proxy.config = self.config
+        sync_proxy.session = self.session
+        sync_proxy.request = request
+        sync_proxy._auth = self._auth
+        return sync_proxy
+
+
+@generate_from(
+    build.BuildProxy,
+    "get", "get_source_chroot", "get_source_build_config",
+    "get_built_packages", "get_list", "get_states", "cancel",
+    "create_from_urls", "create_from_url", "create_from_scm",
+    "create_from_distgit", "create_from_pypi", "create_from_rubygems",
+    "create_from_custom", "delete", "delete_list",
+)
+class BuildProxy(BaseProxy):
+    """
+    Asynchronous `copr.v3.proxies.build.BuildProxy`, uploading SRPM files is
+    not supported.
+    """
+
+
+@generate_from(
+    package.PackageProxy,
+    "get", "get_list", "add", "edit", "reset", "build", "delete",
+)
+class PackageProxy(BaseProxy):
+    """
+    Asynchronous `copr.v3.proxies.package.PackageProxy`
+    """
+
+
+@generate_from(
+    project.ProjectProxy,
+    "get", "get_list", "search", "delete", "fork", "can_build_in",
+    "get_permissions", "set_permissions", "request_permissions",
+    "regenerate_repos",
+)
+class ProjectProxy(BaseProxy):
+    """
+    Asynchronous `copr.v3.proxies.project.ProjectProxy`, creating and editing
+    projects is only supported by the synchronous client.
+    """
+
+
+@generate_from(monitor.MonitorProxy, "monitor")
+class MonitorProxy(BaseProxy):
+    """
+    Asynchronous `copr.v3.proxies.monitor.MonitorProxy`
+    """
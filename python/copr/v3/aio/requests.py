@@ -0,0 +1,134 @@
+"""
+Send the APIv3 requests asynchronously, through aiohttp
+"""
+
+import asyncio
+import base64
+import json
+
+import aiohttp
+from munch import Munch
+
+from ..requests import Request, handle_errors, GET, POOL_SIZE
+from ..exceptions import CoprRequestException
+
+
+def create_session(config=None):
+    """
+    Create an `aiohttp.ClientSession` keeping at most `pool_size` (option in
+    CONFIG) connections to Copr Frontend alive.  This needs to be called from
+    a coroutine (a running event loop is needed).
+    """
+    config = config or {}
+    connector = aiohttp.TCPConnector(
+        limit_per_host=int(config.get("pool_size", POOL_SIZE)))
+    return aiohttp.ClientSession(connector=connector)
+
+
+class AsyncResponse(object):
+    """
+    A `requests.Response`-like wrapper around an (already read) aiohttp
+    response, so the synchronous `handle_errors()` and `munchify()` can be
+    re-used for the asynchronous client.
+    """
+
+    def __init__(self, response, content):
+        self.status_code = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.request = Munch(method=response.method, url=self.url)
+        self.content = content
+
+    @property
+    def text(self):
+        """
+        The response body, decoded
+        """
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        """
+        Parse the response body, raise ValueError for invalid JSON
+        """
+        return json.loads(self.text)
+
+
+def _query(params):
+    """
+    Convert the query PARAMS to the aiohttp format the same way `requests`
+    does; drop `None` values, send booleans as "True"/"False", and lists as
+    repeated arguments.
+    """
+    query = []
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        query.extend((key, str(item)) for item in values)
+    return query
+
+
+def _basic_auth(login, token):
+    credentials = "{0}:{1}".format(login, token).encode("utf-8")
+    return "Basic " + base64.b64encode(credentials).decode("ascii")
+
+
+class AsyncRequest(Request):
+    """
+    Asynchronous variant of `copr.v3.requests.Request`, the request parameters
+    (URL, auth, etc.) are constructed by the very same code.
+    """
+
+    async def send(self, endpoint, method=GET, data=None, params=None,
+                   headers=None, auth=None):
+        # pylint: disable=invalid-overridden-method,too-many-arguments
+        if auth and not auth.username:
+            # The first authentication may be expensive (e.g. GSSAPI),
+            # don't block the event loop.
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, auth.make)
+
+        request_params = self._request_params(
+            endpoint, method, data, params, headers, auth)
+
+        response = await self._send_request_repeatedly(request_params, auth)
+
+        handle_errors(response)
+        return response
+
+    async def _send_request_repeatedly(self, request_params, auth):
+        # pylint: disable=invalid-overridden-method
+        sleep = 5
+        for i in range(1, self.connection_attempts + 1):
+            try:
+                response = await self._send_once(request_params)
+                if response.status_code == 401 and i < self.connection_attempts:
+                    # try to authenticate again, don't sleep!
+                    self._update_auth_params(request_params, auth, reauth=True)
+                    continue
+                # Return the response object (even for non-200 status codes!)
+                return response
+            except aiohttp.ClientConnectionError:
+                if i < self.connection_attempts:
+                    await asyncio.sleep(sleep)
+
+        raise CoprRequestException("Unable to connect to {0}.".format(self.api_base_url))
+
+    async def _send_once(self, request_params):
+        headers = dict(request_params["headers"] or {})
+        if request_params.get("auth"):
+            headers["Authorization"] = _basic_auth(*request_params["auth"])
+        kwargs = {
+            "params": _query(request_params["params"]),
+            "json": request_params["json"],
+            "headers": headers,
+        }
+        if request_params.get("cookies"):
+            kwargs["cookies"] = request_params["cookies"]
+
+        async with self.session.request(request_params["method"],
+                                        request_params["url"],
+                                        **kwargs) as response:
+            content = await response.read()
+        return AsyncResponse(response, content)
@@ -0,0 +1,80 @@
+"""
+Helpers for running many independent API calls concurrently
+"""
+
+from __future__ import absolute_import
+
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+# How many API calls are done in parallel by default
+CONCURRENCY = 8
+
+
+class BulkResult(object):
+    """
+    Result of one call done by `run_concurrently()`.  Either the `result` is
+    set (the value returned by the call, e.g. Munch), or the `exception` (e.g.
+    CoprRequestException) raised by the call.
+    """
+
+    def __init__(self, item, result=None, exception=None):
+        self.item = item
+        self.result = result
+        self.exception = exception
+
+    @property
+    def ok(self):
+        """
+        True if the call didn't fail
+        """
+        return self.exception is None
+
+    def __repr__(self):
+        if self.ok:
+            return "BulkResult({0!r}, result={1!r})".format(self.item, self.result)
+        return "BulkResult({0!r}, exception={1!r})".format(self.item, self.exception)
+
+
+def run_concurrently(function, items, concurrency=CONCURRENCY):
+    """
+    Call FUNCTION(item) for each of ITEMS, using at most CONCURRENCY threads
+    at the same time.  Exceptions raised by FUNCTION are not propagated, but
+    stored in the results.
+
+    :param callable function:
+    :param list items:
+    :param int concurrency:
+    :return: list of BulkResult, in the same order as ITEMS
+    """
+    items = list(items)
+    results = [None] * len(items)
+    tasks = queue.Queue()
+    for index, item in enumerate(items):
+        tasks.put((index, item))
+
+    def _worker():
+        while True:
+            try:
+                index, item = tasks.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[index] = BulkResult(item, result=function(item))
+            except Exception as ex:  # pylint: disable=broad-except
+                results[index] = BulkResult(item, exception=ex)
+
+    threads = []
+    for _ in range(max(1, min(concurrency, len(items)))):
+        thread = threading.Thread(target=_worker)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return results
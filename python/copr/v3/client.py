@@ -1,4 +1,5 @@
 from .helpers import config_from_file
+from .requests import create_session
 from .proxies import BaseProxy
 from .proxies.project import ProjectProxy
 from .proxies.build import BuildProxy
@@ -14,16 +15,24 @@ from .proxies.webhook import WebhookProxy
 class Client(object):
     def __init__(self, config):
         self.config = config
-        self.base_proxy = BaseProxy(config)
-        self.project_proxy = ProjectProxy(config)
-        self.build_proxy = BuildProxy(config)
-        self.package_proxy = PackageProxy(config)
-        self.module_proxy = ModuleProxy(config)
-        self.mock_chroot_proxy = MockChrootProxy(config)
-        self.monitor_proxy = MonitorProxy(config)
-        self.project_chroot_proxy = ProjectChrootProxy(config)
-        self.build_chroot_proxy = BuildChrootProxy(config)
-        self.webhook_proxy = WebhookProxy(config)
+        # One pool of keep-alive connections shared by all the proxies
+        self.session = create_session(config)
+        self.base_proxy = BaseProxy(config, self.session)
+        self.project_proxy = ProjectProxy(config, self.session)
+        self.build_proxy = BuildProxy(config, self.session)
+        self.package_proxy = PackageProxy(config, self.session)
+        self.module_proxy = ModuleProxy(config, self.session)
+        self.mock_chroot_proxy = MockChrootProxy(config, self.session)
+        self.monitor_proxy = MonitorProxy(config, self.session)
+        self.project_chroot_proxy = ProjectChrootProxy(config, self.session)
+        self.build_chroot_proxy = BuildChrootProxy(config, self.session)
+        self.webhook_proxy = WebhookProxy(config, self.session)
+
+    def close(self):
+        """
+        Close all the connections kept alive by this client
+        """
+        self.session.close()
 
     @classmethod
     def create_from_config_file(cls, path=None):
@@ -78,17 +78,81 @@ def bind_proxy(func):
     return wrapper
 
 
-def wait(waitable, interval=30, callback=None, timeout=0):
+# How many build states we ask for at once, see BuildProxy.get_states
+BUILD_STATES_CHUNK = 1000
+
+
+class Backoff(object):
+    """
+    Adaptive polling interval.  Start with MINIMUM seconds, and double the
+    interval (up to MAXIMUM seconds) every time nothing changed since the last
+    poll.  Once something changes, start from MINIMUM again.
+    """
+
+    def __init__(self, minimum, maximum):
+        self.minimum = min(minimum, maximum)
+        self.maximum = maximum
+        self.current = None
+
+    def next(self, changed=False):
+        """
+        Return how many seconds to sleep before the next poll
+        """
+        if changed or self.current is None:
+            self.current = self.minimum
+        else:
+            self.current = min(self.current * 2, self.maximum)
+        return self.current
+
+
+def get_build_states(proxy, build_ids):
+    """
+    Return the {build_id: state} dictionary for all the BUILD_IDS, using as
+    few requests as possible.  Fall back to one request per build for older
+    Copr Frontends without the batched /build/states endpoint (HTTP 404), other
+    errors are raised.
+
+    :param BuildProxy proxy:
+    :param list[int] build_ids:
+    :return: dict
+    """
+    build_ids = list(build_ids)
+    states = {}
+    if hasattr(proxy, "get_states"):
+        try:
+            for start in range(0, len(build_ids), BUILD_STATES_CHUNK):
+                chunk = build_ids[start:start+BUILD_STATES_CHUNK]
+                for build in proxy.get_states(chunk)["builds"]:
+                    states[build["id"]] = build["state"]
+        except CoprException as ex:
+            response = ex.result.get("__response__")
+            if response is None or response.status_code != 404:
+                raise
+
+    for build_id in build_ids:
+        if build_id not in states:
+            states[build_id] = proxy.get(build_id).state
+    return states
+
+
+def wait(waitable, interval=30, callback=None, timeout=0, min_interval=5):
     """
     Wait for a waitable thing to finish. At this point, it is possible to wait only
     for builds, but this function should be enhanced to wait for
     e.g. modules or images, etc in the future
 
+    The states of all the watched builds are queried at once, and the build
+    details are re-downloaded only for the builds which changed their state.
+    The polling interval adapts, it starts at `min_interval` seconds and it is
+    doubled up to `interval` seconds while no build changes its state.
+
     :param Munch/list waitable: A Munch result or list of munches
-    :param int interval: How many seconds wait before requesting updated Munches from frontend
+    :param int interval: Maximum number of seconds to wait before requesting
+                         updated Munches from frontend
     :param callable callback: Callable taking one argument (list of build Munches).
                               It will be triggered before every sleep interval.
     :param int timeout: Limit how many seconds should be waited before this function unsuccessfully ends
+    :param int min_interval: The initial (and minimal) polling interval
     :return: list of build Munches
 
     Example usage:
@@ -101,23 +165,27 @@ def wait(waitable, interval=30, callback=None, timeout=0):
     builds = waitable if isinstance(waitable, list) else [waitable]
     watched = set([build.id for build in builds])
     munches = dict((build.id, build) for build in builds)
-    failed = []
     terminate = time.time() + timeout
+    backoff = Backoff(min_interval, interval)
+
+    def _proxy(build_id):
+        if hasattr(munches[build_id], "__proxy__"):
+            return munches[build_id].__proxy__
+        return waitable.__proxy__
 
     while True:
-        for build_id in watched.copy():
-            if hasattr(munches[build_id], "__proxy__"):
-                proxy = munches[build_id].__proxy__
-            else:
-                proxy = waitable.__proxy__
-            build = munches[build_id] = proxy.get(build_id)
-
-            if build.state in ["failed"]:
-                failed.append(build_id)
-            if build.state in ["succeeded", "skipped", "failed", "canceled"]:
-                watched.remove(build_id)
-            if build.state == "unknown":
+        changed = False
+        states = {}
+        if watched:
+            states = get_build_states(_proxy(min(watched)), watched)
+        for build_id, state in states.items():
+            if state == "unknown":
                 raise CoprException("Unknown status.")
+            if state != munches[build_id].get("state"):
+                munches[build_id] = _proxy(build_id).get(build_id)
+                changed = True
+            if munches[build_id].state in ["succeeded", "skipped", "failed", "canceled"]:
+                watched.remove(build_id)
 
         if callback:
             callback(list(munches.values()))
@@ -125,7 +193,7 @@ def wait(waitable, interval=30, callback=None, timeout=0):
             break
         if timeout and time.time() >= terminate:
             raise CoprException("Timeouted")
-        time.sleep(interval)
+        time.sleep(backoff.next(changed))
     return list(munches.values())
 
 
@@ -1,8 +1,5 @@
 from __future__ import absolute_import
 
-import requests
-from .requests import munchify
-
 try:
     import urlparse
     from urllib import urlencode
@@ -11,19 +8,48 @@ except ImportError:
     from urllib.parse import urlencode
 
 
-def next_page(objects):
-    request = objects.__response__.request
-
-    # Add offset to the previous request URL
-    url_parts = list(urlparse.urlparse(request.url))
+def next_page_url(objects):
+    """
+    Return the URL of the page following the OBJECTS page, or None if there's
+    no such page
+    """
+    url_parts = list(urlparse.urlparse(objects.__response__.request.url))
     query = dict(urlparse.parse_qsl(url_parts[4]))
-    query.update({"offset": objects.meta.offset + objects.meta.limit})
+
+    if "next_cursor" in objects.meta:
+        # The server supports keyset pagination for this endpoint, follow the
+        # cursor (this is much cheaper for the server than large offsets)
+        if not objects.meta.next_cursor:
+            return None
+        query.pop("offset", None)
+        query.update({"cursor": objects.meta.next_cursor})
+    else:
+        # Add offset to the previous request URL
+        query.update({"offset": objects.meta.offset + objects.meta.limit})
+
     url_parts[4] = urlencode(query)
-    request.url = urlparse.urlunparse(url_parts)
+    return urlparse.urlunparse(url_parts)
+
+
+def next_page(objects):
+    # Imported lazily, to keep the `copr-cli` startup fast
+    # pylint: disable=import-outside-toplevel
+    import requests
+    from .requests import munchify
+
+    request = objects.__response__.request
+    url = next_page_url(objects)
+    if not url:
+        return None
+    request.url = url
 
-    session = requests.Session()
+    # Re-use the pooled session of the proxy, if possible
+    proxy = getattr(objects, "__proxy__", None)
+    session = getattr(proxy, "session", None) or requests.Session()
     response = session.send(request)
-    return munchify(response)
+    result = munchify(response)
+    result.__proxy__ = proxy
+    return result
 
 
 # @TODO remove all_pages function if unlimited generator is preferred over it
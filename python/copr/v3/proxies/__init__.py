@@ -1,7 +1,8 @@
 import os
 
 from copr.v3.auth import auth_from_config
-from copr.v3.requests import munchify, Request
+from copr.v3.requests import (munchify, Request, FileRequest, create_session,
+                              POST)
 from ..helpers import for_all_methods, bind_proxy, config_from_file
 
 
@@ -11,11 +12,18 @@ class BaseProxy(object):
     Parent class for all other proxies
     """
 
-    def __init__(self, config):
+    def __init__(self, config, session=None):
+        """
+        :param config: the client configuration dict
+        :param session: a pooled `requests.Session` shared with other proxies
+            (see `copr.v3.Client`), a new one is created if not specified
+        """
         self.config = config
+        self.session = session or create_session(config)
         self.request = Request(
             api_base_url=self.api_base_url,
-            connection_attempts=config.get("connection_attempts", 1)
+            connection_attempts=config.get("connection_attempts", 1),
+            session=self.session,
         )
         self._auth = None
 
@@ -62,3 +70,28 @@ class BaseProxy(object):
         if not self.auth.username:
             self.auth.make()
         return self.auth.username
+
+    def _create(self, endpoint, data, files=None, buildopts=None):
+        """
+        Submit a build (or builds) through ENDPOINT, shared by the build and
+        package proxies
+        """
+        data = data.copy()
+
+        kwargs = {"api_base_url": self.api_base_url}
+        if files and buildopts and "progress_callback" in buildopts:
+            kwargs["progress_callback"] = buildopts["progress_callback"]
+            del buildopts["progress_callback"]
+
+        data.update(buildopts or {})
+        if not files:
+            response = self.request.send(
+                endpoint=endpoint, data=data, method=POST, auth=self.auth)
+        else:
+            kwargs["files"] = files
+            kwargs["connection_attempts"] = self.config.get("connection_attempts", 1)
+            kwargs["session"] = self.session
+            request = FileRequest(**kwargs)
+            response = request.send(
+                endpoint=endpoint, data=data, method=POST, auth=self.auth)
+        return munchify(response)
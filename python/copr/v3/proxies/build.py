@@ -1,10 +1,23 @@
 from __future__ import absolute_import
 
 import os
+import time
+import requests
+from munch import Munch
 from . import BaseProxy
-from ..requests import FileRequest, munchify, POST
-from ..exceptions import CoprValidationException
+from ..requests import RawRequest, munchify, POST, PUT
+from ..exceptions import (CoprValidationException, CoprRequestException,
+                          CoprNoResultException)
 from ..helpers import for_all_methods, bind_proxy
+from ..bulk import run_concurrently, CONCURRENCY
+
+
+# Files larger than this are uploaded in chunks (if the server supports it),
+# so a failed upload can be resumed
+CHUNKED_UPLOAD_THRESHOLD = 64 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+# How many times one chunk is re-tried
+UPLOAD_CHUNK_ATTEMPTS = 5
 
 
 @for_all_methods(bind_proxy)
@@ -76,6 +89,25 @@ class BuildProxy(BaseProxy):
         response = self.request.send(endpoint=endpoint, params=params)
         return munchify(response)
 
+    def get_states(self, build_ids=None, batch_id=None):
+        """
+        Return states of multiple builds (at most 1000 at once) using
+        one request
+
+        :param list[int] build_ids:
+        :param int batch_id: return states of all builds in this batch
+        :return: Munch, the "builds" field is a list of {"id": .., "state": ..}
+            dictionaries
+        """
+        endpoint = "/build/states"
+        params = {}
+        if build_ids:
+            params["build_ids"] = ",".join(str(i) for i in build_ids)
+        if batch_id is not None:
+            params["batch_id"] = batch_id
+        response = self.request.send(endpoint=endpoint, params=params)
+        return munchify(response)
+
     def cancel(self, build_id):
         """
         Cancel a build
@@ -127,7 +159,9 @@ class BuildProxy(BaseProxy):
 
     def create_from_file(self, ownername, projectname, path, buildopts=None, project_dirname=None):
         """
-        Create a build from local SRPM file
+        Create a build from local SRPM file.  Large files are uploaded in
+        chunks (see the `chunked_upload_threshold` and `upload_chunk_size`
+        config options), so a failed upload is resumed instead of restarted.
 
         :param str ownername:
         :param str projectname:
@@ -137,13 +171,22 @@ class BuildProxy(BaseProxy):
         :return: Munch
         """
         endpoint = "/build/create/upload"
-        f = open(path, "rb")
-
         data = {
             "ownername": ownername,
             "projectname": projectname,
             "project_dirname": project_dirname,
         }
+
+        threshold = self.config.get("chunked_upload_threshold",
+                                    CHUNKED_UPLOAD_THRESHOLD)
+        if os.path.getsize(path) >= threshold:
+            upload_id = self._upload_chunked(path, buildopts)
+            if upload_id:
+                data["upload_id"] = upload_id
+                return self._create("/build/create/chunked-upload", data,
+                                    buildopts=buildopts)
+
+        f = open(path, "rb")
         files = {
             "pkgs": (os.path.basename(f.name), f, "application/x-rpm"),
         }
@@ -327,25 +370,68 @@ class BuildProxy(BaseProxy):
         }
         return self._create(endpoint, data, buildopts=buildopts)
 
-    def _create(self, endpoint, data, files=None, buildopts=None):
-        data = data.copy()
-
-        kwargs = {"api_base_url": self.api_base_url}
-        if files and buildopts and "progress_callback" in buildopts:
-            kwargs["progress_callback"] = buildopts["progress_callback"]
-            del buildopts["progress_callback"]
+    def _upload_chunked(self, path, buildopts=None):
+        """
+        Upload the PATH file in chunks, and return the upload ID.  When a chunk
+        fails to upload, the upload is resumed from the last offset
+        acknowledged by the server.  Return None if the server doesn't support
+        chunked uploads.
+        """
+        progress_callback = None
+        if buildopts and "progress_callback" in buildopts:
+            progress_callback = buildopts.pop("progress_callback")
 
-        data.update(buildopts or {})
-        if not files:
+        size = os.path.getsize(path)
+        try:
             response = self.request.send(
-                endpoint=endpoint, data=data, method=POST, auth=self.auth)
-        else:
-            kwargs["files"] = files
-            kwargs["connection_attempts"] = self.config.get("connection_attempts", 1)
-            request = FileRequest(**kwargs)
-            response = request.send(
-                endpoint=endpoint, data=data, method=POST, auth=self.auth)
-        return munchify(response)
+                endpoint="/build/upload", method=POST, auth=self.auth,
+                data={"filename": os.path.basename(path), "size": size})
+        except CoprNoResultException:
+            # older frontend, upload the file at once
+            if progress_callback:
+                buildopts["progress_callback"] = progress_callback
+            return None
+        upload = munchify(response)
+
+        endpoint = "/build/upload/{0}".format(upload.upload_id)
+        chunk_size = min(upload.chunk_size,
+                         self.config.get("upload_chunk_size", UPLOAD_CHUNK_SIZE))
+        offset = upload.offset
+        failures = 0
+        with open(path, "rb") as f:
+            while offset is None or offset < size:
+                try:
+                    if offset is None:
+                        # continue where the server says
+                        response = self.request.send(endpoint=endpoint,
+                                                     auth=self.auth)
+                        offset = munchify(response).offset
+                    else:
+                        f.seek(offset)
+                        request = RawRequest(
+                            data=f.read(chunk_size),
+                            api_base_url=self.api_base_url,
+                            session=self.session,
+                        )
+                        response = request.send(
+                            endpoint=endpoint, method=PUT,
+                            params={"offset": offset}, auth=self.auth)
+                        offset = munchify(response).offset
+                        failures = 0
+                except (CoprRequestException, requests.RequestException):
+                    # both the failed chunk and the failed offset query count
+                    failures += 1
+                    if failures >= UPLOAD_CHUNK_ATTEMPTS:
+                        raise
+                    time.sleep(5)
+                    offset = None
+                    continue
+
+                if progress_callback:
+                    # the MultipartEncoderMonitor interface
+                    progress_callback(Munch(bytes_read=offset))
+
+        return upload.upload_id
 
     def delete(self, build_id):
         """
@@ -372,3 +458,73 @@ class BuildProxy(BaseProxy):
         response = self.request.send(
             endpoint=endpoint, data=data, method=POST, auth=self.auth)
         return munchify(response)
+
+    def get_many(self, build_ids, concurrency=CONCURRENCY):
+        """
+        Return many builds, fetched concurrently
+
+        :param list[int] build_ids:
+        :param int concurrency: how many requests are sent in parallel
+        :return: list of BulkResult (with Munch results), in the order
+            of build_ids
+        """
+        return run_concurrently(self.get, build_ids, concurrency)
+
+    def create_many(self, source_type, builds, concurrency=CONCURRENCY):
+        """
+        Submit many builds concurrently, using the `create_from_<source_type>`
+        method for each of them.  For example::
+
+            build_proxy.create_many("distgit", [
+                {"ownername": "@copr", "projectname": "foo", "packagename": "bar"},
+                {"ownername": "@copr", "projectname": "foo", "packagename": "baz"},
+            ])
+
+        :param str source_type: one of urls, url, file, scm, distgit, pypi,
+            rubygems or custom
+        :param list[dict] builds: keyword arguments for each
+            create_from_<source_type> call
+        :param int concurrency: how many requests are sent in parallel
+        :return: list of BulkResult (with Munch results), in the order
+            of builds
+        """
+        method = getattr(self, "create_from_{0}".format(source_type), None)
+        if not method:
+            raise CoprValidationException(
+                "Unknown build source type: {0}".format(source_type))
+
+        def _create_one(kwargs):
+            kwargs = kwargs.copy()
+            if kwargs.get("buildopts"):
+                # _create() modifies the buildopts dictionary
+                kwargs["buildopts"] = kwargs["buildopts"].copy()
+            return method(**kwargs)
+
+        # authenticate once, not in every thread
+        self.auth.make()
+        return run_concurrently(_create_one, builds, concurrency)
+
+    def cancel_many(self, build_ids, concurrency=CONCURRENCY):
+        """
+        Cancel many builds concurrently
+
+        :param list[int] build_ids:
+        :param int concurrency: how many requests are sent in parallel
+        :return: list of BulkResult (with Munch results), in the order
+            of build_ids
+        """
+        self.auth.make()
+        return run_concurrently(self.cancel, build_ids, concurrency)
+
+    def delete_many(self, build_ids, concurrency=CONCURRENCY):
+        """
+        Delete many builds concurrently, one request per build (so we get
+        the result for each of them, see also `delete_list`)
+
+        :param list[int] build_ids:
+        :param int concurrency: how many requests are sent in parallel
+        :return: list of BulkResult (with Munch results), in the order
+            of build_ids
+        """
+        self.auth.make()
+        return run_concurrently(self.delete, build_ids, concurrency)
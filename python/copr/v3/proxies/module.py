@@ -64,7 +64,8 @@ class ModuleProxy(BaseProxy):
         request = FileRequest(
             files=files,
             api_base_url=self.api_base_url,
-            connection_attempts=self.config.get("connection_attempts", 1)
+            connection_attempts=self.config.get("connection_attempts", 1),
+            session=self.session,
         )
         response = request.send(
             endpoint=endpoint,
@@ -1,8 +1,8 @@
 from __future__ import absolute_import
 from . import BaseProxy
-from .build import BuildProxy
 from ..requests import munchify, POST
 from ..helpers import for_all_methods, bind_proxy
+from ..bulk import run_concurrently, CONCURRENCY
 
 
 @for_all_methods(bind_proxy)
@@ -162,8 +162,7 @@ class PackageProxy(BaseProxy):
             "package_name": packagename,
             "project_dirname": project_dirname,
         }
-        build_proxy = BuildProxy(self.config)
-        return build_proxy._create(endpoint, data, buildopts=buildopts)
+        return self._create(endpoint, data, buildopts=buildopts)
 
     def delete(self, ownername, projectname, packagename):
         """
@@ -183,3 +182,79 @@ class PackageProxy(BaseProxy):
         response = self.request.send(
             endpoint=endpoint, data=data, method=POST, auth=self.auth)
         return munchify(response)
+
+    def get_many(self, ownername, projectname, packagenames,
+                 with_latest_build=False, with_latest_succeeded_build=False,
+                 concurrency=CONCURRENCY):
+        """
+        Return many packages from a project, fetched concurrently
+
+        :param str ownername:
+        :param str projectname:
+        :param list[str] packagenames:
+        :param bool with_latest_build: see `get`
+        :param bool with_latest_succeeded_build: see `get`
+        :param int concurrency: how many requests are sent in parallel
+        :return: list of BulkResult (with Munch results), in the order
+            of packagenames
+        """
+        def _get_one(packagename):
+            return self.get(ownername, projectname, packagename,
+                            with_latest_build=with_latest_build,
+                            with_latest_succeeded_build=with_latest_succeeded_build)
+        return run_concurrently(_get_one, packagenames, concurrency)
+
+    def add_many(self, ownername, projectname, packages, concurrency=CONCURRENCY):
+        """
+        Add many packages to a project concurrently
+
+        :param str ownername:
+        :param str projectname:
+        :param list[dict] packages: keyword arguments for each `add` call,
+            that is "packagename", "source_type" and "source_dict"
+        :param int concurrency: how many requests are sent in parallel
+        :return: list of BulkResult (with Munch results), in the order
+            of packages
+        """
+        def _add_one(package):
+            return self.add(ownername, projectname, **package)
+        self.auth.make()
+        return run_concurrently(_add_one, packages, concurrency)
+
+    def build_many(self, ownername, projectname, packagenames, buildopts=None,
+                   project_dirname=None, concurrency=CONCURRENCY):
+        """
+        Create builds from many package configurations concurrently
+
+        :param str ownername:
+        :param str projectname:
+        :param list[str] packagenames:
+        :param buildopts: http://python-copr.readthedocs.io/en/latest/client_v3/build_options.html
+        :param str project_dirname:
+        :param int concurrency: how many requests are sent in parallel
+        :return: list of BulkResult (with Munch results), in the order
+            of packagenames
+        """
+        def _build_one(packagename):
+            return self.build(ownername, projectname, packagename,
+                              buildopts=dict(buildopts or {}),
+                              project_dirname=project_dirname)
+        self.auth.make()
+        return run_concurrently(_build_one, packagenames, concurrency)
+
+    def delete_many(self, ownername, projectname, packagenames,
+                    concurrency=CONCURRENCY):
+        """
+        Delete many packages from a project concurrently
+
+        :param str ownername:
+        :param str projectname:
+        :param list[str] packagenames:
+        :param int concurrency: how many requests are sent in parallel
+        :return: list of BulkResult (with Munch results), in the order
+            of packagenames
+        """
+        def _delete_one(packagename):
+            return self.delete(ownername, projectname, packagename)
+        self.auth.make()
+        return run_concurrently(_delete_one, packagenames, concurrency)
@@ -4,6 +4,8 @@ import os
 import json
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from copr.v3.helpers import List
 from munch import Munch
 from requests_toolbelt.multipart.encoder import MultipartEncoder, MultipartEncoderMonitor
@@ -14,21 +16,63 @@ GET = "GET"
 POST = "POST"
 PUT = "PUT"
 
+# Defaults for the pooled HTTP session, see `create_session()`
+POOL_SIZE = 10
+RETRIES = 0
+RETRY_BACKOFF_FACTOR = 0.5
+
+
+def create_session(config=None):
+    """
+    Create a `requests.Session` object which keeps the HTTP connections to
+    Copr Frontend alive, and re-uses them for the subsequent API calls (no
+    TCP and TLS handshake per request).  The session is supposed to be shared
+    by all the proxies (see `copr.v3.Client`).
+
+    Configurable by the following (optional) CONFIG options:
+
+    - pool_size: the maximum number of connections kept alive (per host)
+    - retries: how many times to retry failed connections, and the idempotent
+      requests which failed with 5xx status codes (default no retries)
+    - retry_backoff_factor: sleep `backoff_factor * 2^(retry-1)` seconds
+      between the retries
+    """
+    config = config or {}
+    pool_size = int(config.get("pool_size", POOL_SIZE))
+    retries = Retry(
+        total=int(config.get("retries", RETRIES)),
+        backoff_factor=float(config.get("retry_backoff_factor",
+                                        RETRY_BACKOFF_FACTOR)),
+        status_forcelist=[500, 502, 503, 504],
+        # Let the caller see the final response, and handle it as usually
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retries)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 class Request(object):
     # This should be a replacement of the _fetch method from APIv1
     # We can have Request, FileRequest, AuthRequest/UnAuthRequest, ...
 
-    def __init__(self, api_base_url=None, connection_attempts=1):
+    def __init__(self, api_base_url=None, connection_attempts=1, session=None):
         """
         :param api_base_url:
         :param connection_attempts:
+        :param session: a `requests.Session` to send the request through (e.g.
+            one created by `create_session()`), by default a new connection is
+            opened for every request
 
         @TODO maybe don't have both params and data, but rather only one variable
         @TODO and send it as data on POST and as params on GET
         """
         self.api_base_url = api_base_url
         self.connection_attempts = connection_attempts
+        self.session = session
 
     def endpoint_url(self, endpoint, params=None):
         params = params or {}
@@ -53,7 +97,7 @@ class Request(object):
         sleep = 5
         for i in range(1, self.connection_attempts + 1):
             try:
-                response = requests.request(**request_params)
+                response = (self.session or requests).request(**request_params)
                 if response.status_code == 401 and i < self.connection_attempts:
                     # try to authenticate again, don't sleep!
                     self._update_auth_params(request_params, auth, reauth=True)
@@ -110,6 +154,22 @@ class FileRequest(Request):
         return params
 
 
+class RawRequest(Request):
+    """
+    Send the raw DATA (bytes) as the request body, instead of JSON
+    """
+    def __init__(self, data=None, **kwargs):
+        super(RawRequest, self).__init__(**kwargs)
+        self.data = data
+
+    def _request_params(self, *args, **kwargs):
+        params = super(RawRequest, self)._request_params(*args, **kwargs)
+        params["json"] = None
+        params["data"] = self.data
+        params["headers"] = {"Content-Type": "application/octet-stream"}
+        return params
+
+
 def munchify(response):
     data = response.json()
     if "items" in data:
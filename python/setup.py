@@ -46,6 +46,10 @@ setup(
         "Development Status :: 3 - Alpha",
     ],
     install_requires=requires,
+    extras_require={
+        # the asyncio client, copr.v3.aio
+        "aio": ["aiohttp"],
+    },
     packages=find_packages(),
     include_package_data=True,
     zip_safe=False,
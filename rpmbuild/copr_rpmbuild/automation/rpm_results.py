@@ -4,14 +4,27 @@ Create `results.json` file
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import rpm
 
 from copr_rpmbuild.automation.base import AutomationTool
 from copr_rpmbuild.helpers import get_rpm_header
+from copr_rpmbuild.manifest import file_checksum
+
+
+SIGNATURE_TAGS = [
+    "RPMTAG_RSAHEADER",
+    "RPMTAG_DSAHEADER",
+    "RPMTAG_SIGPGP",
+    "RPMTAG_SIGGPG",
+]
 
 
 class RPMResults(AutomationTool):
     """
-    Create `results.json` file containing NEVRAs for all built RPM files
+    Create `results.json` file containing NEVRAs (and file name, size, checksum
+    and signature status) for all built RPM files
     """
 
     @property
@@ -36,18 +49,40 @@ class RPMResults(AutomationTool):
     def find_results_nevras_dicts(self):
         """
         Find all RPM packages in the `resultdir` and return their NEVRAs
-        as `dicts`
+        as `dicts`.  The packages are examined in parallel, the checksum
+        calculation (the most expensive part for large packages) doesn't hold
+        the GIL.
         """
-        nevras = []
-        for result in os.listdir(self.resultdir):
-            if not result.endswith(".rpm"):
-                continue
-            package = os.path.join(self.resultdir, result)
-            nevras.append(self.get_nevra_dict(package))
-        return nevras
+        packages = sorted(
+            os.path.join(self.resultdir, result)
+            for result in os.listdir(self.resultdir)
+            if result.endswith(".rpm")
+        )
+        if not packages:
+            return []
+        workers = min(len(packages), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.get_package_dict, packages))
 
     @classmethod
-    def get_nevra_dict(cls, path):
+    def get_package_dict(cls, path):
+        """
+        Takes a package path and returns its NEVRA, together with the file
+        name, size, sha256 checksum and signature status as a `dict`
+        """
+        hdr = get_rpm_header(path)
+        package = cls.get_nevra_dict(path, hdr)
+        package.update({
+            "filename": os.path.basename(path),
+            "size": os.path.getsize(path),
+            "sha256": file_checksum(path),
+            "signed": any(hdr[getattr(rpm, tag)] for tag in SIGNATURE_TAGS
+                          if hasattr(rpm, tag)),
+        })
+        return package
+
+    @classmethod
+    def get_nevra_dict(cls, path, hdr=None):
         """
         Takes a package path and returns its NEVRA as a `dict`
         """
@@ -56,7 +91,8 @@ class RPMResults(AutomationTool):
             msg = "File name doesn't end with '.rpm': {}".format(path)
             raise ValueError(msg)
 
-        hdr = get_rpm_header(path)
+        if hdr is None:
+            hdr = get_rpm_header(path)
         arch = "src" if filename.endswith(".src.rpm") else hdr["arch"]
         return {
             "name": hdr["name"],
@@ -0,0 +1,205 @@
+"""
+Builder-local cache of git objects for SCM and DistGit clones.
+
+The cache keeps one bare mirror per clone URL.  Before every clone, the
+mirror is refreshed (only the new objects are downloaded) and then used as
+a `git clone --reference-if-able` source, so builders re-used across builds
+don't download the same upstream objects again and again.  The cache is
+strictly optional; any problem with it just results in a normal clone.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+
+from copr_rpmbuild.helpers import run_cmd
+
+
+log = logging.getLogger("__main__")
+
+STATS_FILE = "stats.json"
+
+
+def _directory_size(path):
+    """
+    Return the apparent size of all files below PATH, in bytes
+    """
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return size
+
+
+class GitReferenceCache:
+    """
+    Cache of bare git mirrors, keyed by clone URL.  Each mirror is guarded by
+    its own lock file so concurrent copr-rpmbuild processes (e.g. the
+    copr-rpmbuild --srpm and --rpm runs) don't update the same mirror in
+    parallel, and so eviction never removes a mirror that is being used.
+    """
+
+    def __init__(self, cachedir, max_size=None):
+        self.cachedir = cachedir
+        self.max_size = max_size
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Return a GitReferenceCache instance according to the [main] section
+        of copr-rpmbuild configuration, or None if the cache is not enabled.
+        """
+        cachedir = config.get("main", "git_cache_dir", fallback=None)
+        if not cachedir:
+            return None
+        max_size_mb = config.getint("main", "git_cache_max_size_mb",
+                                    fallback=None)
+        max_size = max_size_mb * 1024 * 1024 if max_size_mb else None
+        return cls(cachedir, max_size)
+
+    def mirror_path(self, url):
+        """
+        Path to the bare mirror for the given clone URL
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cachedir, key + ".git")
+
+    @contextmanager
+    def _lock(self, mirror, blocking=True):
+        lockfile = mirror + ".lock"
+        with open(lockfile, "a") as fd:
+            flags = fcntl.LOCK_EX
+            if not blocking:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(fd, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def reference(self, url):
+        """
+        Make sure there's an up-to-date mirror for URL in the cache, and yield
+        its path (to be used as a --reference-if-able argument).  The mirror
+        stays locked till the context is left, so it can not be evicted while
+        we clone from it.  Yield None if the mirror can not be used.
+        """
+        mirror = self.mirror_path(url)
+        try:
+            os.makedirs(self.cachedir, exist_ok=True)
+        except OSError as ex:
+            log.warning("Git cache %s is unusable: %s", self.cachedir, ex)
+            yield None
+            return
+
+        with self._lock(mirror):
+            try:
+                size_before = _directory_size(mirror)
+                self._update_mirror(url, mirror)
+                size_after = _directory_size(mirror)
+                # Touch the mirror, so the eviction is LRU.
+                os.utime(mirror)
+                self._record_stats(size_before,
+                                   max(0, size_after - size_before))
+            except (OSError, RuntimeError) as ex:
+                log.warning("Git cache for %s is unusable: %s", url, ex)
+                mirror = None
+            yield mirror
+
+        self.evict()
+
+    @staticmethod
+    def _update_mirror(url, mirror):
+        if os.path.exists(mirror):
+            try:
+                run_cmd(["git", "remote", "update", "--prune"], cwd=mirror)
+                return
+            except RuntimeError:
+                log.warning("Can not update %s, re-creating it", mirror)
+                shutil.rmtree(mirror)
+        run_cmd(["git", "clone", "--mirror", url, mirror])
+
+    def _record_stats(self, bytes_saved, bytes_fetched):
+        """
+        Accumulate the cache hit/miss counters and an estimate of transferred
+        bytes.  The estimate of saved bytes is the size of the mirror before
+        it was updated (that's what we would download without the cache).
+        """
+        stats_file = os.path.join(self.cachedir, STATS_FILE)
+        with self._lock(stats_file):
+            stats = {
+                "hits": 0,
+                "misses": 0,
+                "bytes_saved": 0,
+                "bytes_fetched": 0,
+            }
+            try:
+                with open(stats_file, "r", encoding="utf-8") as fd:
+                    stats.update(json.load(fd))
+            except (OSError, ValueError):
+                pass
+
+            stats["hits" if bytes_saved else "misses"] += 1
+            stats["bytes_saved"] += bytes_saved
+            stats["bytes_fetched"] += bytes_fetched
+
+            tmp_file = stats_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as fd:
+                json.dump(stats, fd, indent=4)
+            os.rename(tmp_file, stats_file)
+
+        log.info("Git cache: %s bytes re-used, %s bytes fetched",
+                 bytes_saved, bytes_fetched)
+        return stats
+
+    def evict(self):
+        """
+        Remove the least recently used mirrors until the whole cache fits
+        into self.max_size.  Mirrors locked by other processes are skipped.
+        This is best-effort, errors are only logged (the clone already
+        succeeded).
+        """
+        if not self.max_size:
+            return
+
+        try:
+            self._evict()
+        except OSError as ex:
+            log.warning("Git cache %s eviction failed: %s", self.cachedir, ex)
+
+    def _evict(self):
+        mirrors = []
+        for name in os.listdir(self.cachedir):
+            path = os.path.join(self.cachedir, name)
+            if not name.endswith(".git") or not os.path.isdir(path):
+                continue
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                # removed by a concurrent eviction
+                continue
+            mirrors.append((mtime, path, _directory_size(path)))
+
+        total = sum(size for _, _, size in mirrors)
+        for _, path, size in sorted(mirrors):
+            if total <= self.max_size:
+                break
+            with self._lock(path, blocking=False) as locked:
+                if not locked:
+                    continue
+                log.info("Git cache: evicting %s (%s bytes)", path, size)
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
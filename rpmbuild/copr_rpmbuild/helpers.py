@@ -8,6 +8,7 @@ import re
 import configparser
 import datetime
 import shlex
+import shutil
 from threading import Timer
 from collections import OrderedDict
 
@@ -17,6 +18,7 @@ import munch
 from specfile import Specfile
 
 from copr_common.enums import BuildSourceEnum
+from copr_rpmbuild.live_log import start_live_log
 
 log = logging.getLogger("__main__")
 
@@ -240,13 +242,11 @@ def parse_copr_name(name):
 
 
 def dump_live_log(logfile):
-    filter_continuing_lines = "/usr/bin/copr-rpmbuild-loggify"
-    tee_output = "tee -a {0}".format(shlex.quote(logfile))
-    cmd = filter_continuing_lines + "|" + tee_output
-    tee = subprocess.Popen(cmd, stdin=subprocess.PIPE, shell=True)
-    os.dup2(tee.stdin.fileno(), sys.stdout.fileno())
-    os.dup2(tee.stdin.fileno(), sys.stderr.fileno())
-    return tee.pid
+    """
+    Redirect our stdout and stderr to a logger process that filters the output
+    and appends it to LOGFILE.  Return the logger PID.
+    """
+    return start_live_log(logfile)
 
 
 class GentlyTimeoutedPopen(subprocess.Popen):
@@ -290,10 +290,18 @@ def git_clone_url_basepath(clone_url):
 @backoff.on_exception(
     wait_gen=backoff.expo, exception=RuntimeError, max_time=300, jitter=None, logger=log
 )
-def git_clone(url, repo_path, scm_type="git"):
+def git_clone(url, repo_path, scm_type="git", reference_cache=None):
     """
-    Clone given URL (SCM_TYPE=svn/git) into REPO_PATH
+    Clone given URL (SCM_TYPE=svn/git) into REPO_PATH.  When REFERENCE_CACHE
+    (a GitReferenceCache instance) is specified, git objects are taken from
+    the builder-local cache and only the missing ones are downloaded.
     """
+    if scm_type == 'git' and reference_cache:
+        with reference_cache.reference(url) as reference:
+            if reference:
+                _git_clone_with_reference(url, repo_path, reference)
+                return
+
     if scm_type == 'git':
         clone_cmd = ['git', 'clone', url,
                      repo_path, '--depth', '500',
@@ -314,12 +322,31 @@ def git_clone(url, repo_path, scm_type="git"):
             raise e
 
 
-def git_clone_and_checkout(url, committish, repo_path, scm_type="git"):
+def _git_clone_with_reference(url, repo_path, reference):
+    """
+    Full clone of URL into REPO_PATH, objects borrowed from the REFERENCE
+    repository.  The result is dissociated from the REFERENCE, so the cache
+    may be evicted later without breaking the clone.
+    """
+    clone_cmd = ['git', 'clone', url, repo_path,
+                 '--reference-if-able', reference, '--dissociate',
+                 '--no-single-branch', '--recursive']
+    try:
+        run_cmd(clone_cmd)
+    except RuntimeError as e:
+        log.error(str(e))
+        # re-try without the cache
+        shutil.rmtree(repo_path, ignore_errors=True)
+        run_cmd(['git', 'clone', url, repo_path])
+
+
+def git_clone_and_checkout(url, committish, repo_path, scm_type="git",
+                           reference_cache=None):
     """
     Clone given URL (SCM_TYPE=svn/git) into REPO_PATH, and checkout the
     COMMITTISH reference.
     """
-    git_clone(url, repo_path, scm_type)
+    git_clone(url, repo_path, scm_type, reference_cache)
 
     if committish:
         # Do the checkout only if explicitly requested, otherwise build against
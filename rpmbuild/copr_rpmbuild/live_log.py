@@ -0,0 +1,128 @@
+"""
+In-process replacement for the `copr-rpmbuild-loggify | tee -a` pipeline.
+
+The copr-rpmbuild output is filtered (live progress bars terminated by CR,
+terminal control sequences, and CR/SO/SI characters are dropped, the same
+way as bin/copr-rpmbuild-loggify does it) in bulk byte chunks, and then
+written to the live log and to the original stdout.
+"""
+
+import os
+import re
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Strings terminated by CR, aka "live progress bars"
+_PROGRESS_BAR = re.compile(rb"[^\n]*\r(?=[^\n])")
+# Terminal control sequences (e.g. colors)
+_CONTROL_SEQUENCE = re.compile(rb"\x1b\[[0-9;]*[a-zA-Z]")
+# Carriage Return, Shift Out, Shift In
+_DROPPED_CHARACTERS = b"\r\x0e\x0f"
+
+
+class LogFilter:
+    """
+    Streaming filter for the terminal output.  The filtering is line-based
+    (like sed), so the incomplete trailing line is kept in a buffer until the
+    rest of it arrives (or till the stream is finished by flush() call).
+    """
+
+    def __init__(self):
+        self._pending = b""
+
+    @staticmethod
+    def filter_lines(data):
+        """
+        Filter a bytes string containing complete lines.
+        """
+        data = _PROGRESS_BAR.sub(b"", data)
+        data = _CONTROL_SEQUENCE.sub(b"", data)
+        return data.translate(None, _DROPPED_CHARACTERS)
+
+    def feed(self, chunk):
+        """
+        Consume the next CHUNK of bytes, return the filtered output for all the
+        lines completed so far.
+        """
+        data = self._pending + chunk
+        end = data.rfind(b"\n") + 1
+        self._pending = data[end:]
+        if not end:
+            return b""
+        return self.filter_lines(data[:end])
+
+    def flush(self):
+        """
+        Return the filtered incomplete trailing line, if any.
+        """
+        data, self._pending = self._pending, b""
+        return self.filter_lines(data)
+
+
+class LiveLogSink:
+    """
+    Read the output from INPUT_FD till EOF and write the filtered result to
+    the LOGFILE (appending), and to the file descriptors in ECHO_FDS.
+    """
+
+    def __init__(self, input_fd, logfile, echo_fds=None):
+        self.input_fd = input_fd
+        self.logfile = logfile
+        self.echo_fds = echo_fds or []
+        self.filter = LogFilter()
+
+    def _write(self, data, log_fd):
+        if not data:
+            return
+        log_fd.write(data)
+        log_fd.flush()
+        for fd in self.echo_fds:
+            try:
+                os.write(fd, data)
+            except OSError:
+                # e.g. the terminal went away, keep logging to files
+                pass
+
+    def run(self):
+        """
+        Process the input stream, till all the writers close it
+        """
+        with open(self.logfile, "ab") as log_fd:
+            while True:
+                chunk = os.read(self.input_fd, CHUNK_SIZE)
+                if not chunk:
+                    break
+                self._write(self.filter.feed(chunk), log_fd)
+            self._write(self.filter.flush(), log_fd)
+
+
+def start_live_log(logfile):
+    """
+    Fork a logger process, and redirect our stdout and stderr to it.  Return
+    the logger PID.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(write_fd)
+        # Our stdout is still the original one, echo the output there
+        # similarly to `tee`.
+        echo_fd = os.dup(1)
+        devnull_fd = os.open(os.devnull, os.O_RDWR)
+        for fd in [0, 2]:
+            os.dup2(devnull_fd, fd)
+        os.close(devnull_fd)
+        exit_status = 0
+        try:
+            LiveLogSink(read_fd, logfile, echo_fds=[echo_fd]).run()
+        except Exception:  # pylint: disable=broad-except
+            exit_status = 1
+        finally:
+            os._exit(exit_status)  # pylint: disable=protected-access
+
+    os.close(read_fd)
+    os.dup2(write_fd, 1)
+    os.dup2(write_fd, 2)
+    os.close(write_fd)
+    return pid
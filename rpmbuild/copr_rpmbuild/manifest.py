@@ -0,0 +1,97 @@
+"""
+Create the `manifest.json` file describing all the files in resultdir, so
+copr-backend can download the results as one stream and verify them (and
+download only the missing or broken files when re-trying).
+"""
+
+import hashlib
+import json
+import os
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_checksum(path, blocksize=1024 * 1024):
+    """
+    Return sha256 hexdigest of the given file
+    """
+    checksum = hashlib.sha256()
+    with open(path, "rb") as fd:
+        while True:
+            block = fd.read(blocksize)
+            if not block:
+                break
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+def iter_result_files(resultdir):
+    """
+    Yield paths (relative to RESULTDIR) of all regular files in RESULTDIR,
+    recursively.  Symlinks and the manifest itself are skipped.
+    """
+    for root, dirs, files in os.walk(resultdir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, resultdir)
+            if relpath == MANIFEST_NAME or os.path.islink(path):
+                continue
+            yield relpath
+
+
+def _known_checksums(resultdir):
+    """
+    The RPM packages were already examined (in parallel) when `results.json`
+    was created, re-use their checksums.
+    """
+    try:
+        with open(os.path.join(resultdir, "results.json"), "r",
+                  encoding="utf-8") as fd:
+            packages = json.load(fd).get("packages", [])
+    except (OSError, ValueError, AttributeError):
+        return {}
+    return {
+        package["filename"]: package
+        for package in packages
+        if "filename" in package and "sha256" in package
+    }
+
+
+def generate_manifest(resultdir):
+    """
+    Return the manifest (dict) for all files in RESULTDIR
+    """
+    known = _known_checksums(resultdir)
+    files = {}
+    for relpath in iter_result_files(resultdir):
+        path = os.path.join(resultdir, relpath)
+        size = os.path.getsize(path)
+        package = known.get(relpath)
+        if package and package["size"] == size:
+            checksum = package["sha256"]
+        else:
+            checksum = file_checksum(path)
+        files[relpath] = {
+            "size": size,
+            "sha256": checksum,
+        }
+    return {
+        "version": MANIFEST_VERSION,
+        "files": files,
+    }
+
+
+def write_manifest(resultdir, log):
+    """
+    Create the RESULTDIR/manifest.json file.  This needs to be done as the very
+    last step of the build, once no other files are created in RESULTDIR.
+    """
+    manifest = generate_manifest(resultdir)
+    path = os.path.join(resultdir, MANIFEST_NAME)
+    with open(path, "w", encoding="utf-8") as dst:
+        json.dump(manifest, dst, indent=4)
+    log.info("Wrote manifest for %s files in resultdir",
+             len(manifest["files"]))
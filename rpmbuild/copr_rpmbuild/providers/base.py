@@ -10,6 +10,7 @@ from copr_common.request import SafeRequest
 from copr_rpmbuild.helpers import CONF_DIRS
 from copr_rpmbuild.helpers import run_cmd, mock_snippet_for_tags
 from copr_rpmbuild.config import Config
+from copr_rpmbuild.git_cache import GitReferenceCache
 
 
 log = logging.getLogger("__main__")
@@ -52,6 +53,9 @@ class Provider(object):
             if e.errno != errno.EEXIST:
                 raise
 
+        # Optional builder-local cache of git objects, used for cloning
+        self.git_cache = GitReferenceCache.from_config(config)
+
         self.copr_rpmbuild_config = Config()
         self.copr_rpmbuild_config.load_config()
 
@@ -32,7 +32,8 @@ class DistGitProvider(Provider):
         second for getting sources from our own "proxy" DistGit instance.
         """
         helpers.git_clone_and_checkout(self.clone_url, self.committish,
-                                       self.clone_to)
+                                       self.clone_to,
+                                       reference_cache=self.git_cache)
         helpers.run_cmd(["dist-git-client", "sources"], cwd=self.clone_to)
 
     def produce_srpm(self):
@@ -130,7 +130,8 @@ class ScmProvider(Provider):
             self.clone_url,
             self.committish,
             self.repo_path,
-            self.scm_type)
+            self.scm_type,
+            reference_cache=self.git_cache)
         cmd = {
             'rpkg': self.get_rpkg_command,
             'tito': self.get_tito_command,
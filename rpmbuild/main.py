@@ -18,6 +18,7 @@ from copr_common.request import SafeRequest, RequestError
 from copr_rpmbuild import providers
 from copr_rpmbuild.builders.mock import MockBuilder
 from copr_rpmbuild.automation import run_automation_tools
+from copr_rpmbuild.manifest import write_manifest
 from copr_rpmbuild.helpers import (
     read_config,
     parse_copr_name,
@@ -148,10 +149,24 @@ def main():
         log.exception("")
         sys.exit(1)
     finally:
+        if not args.dump_configs:
+            create_manifest(config)
         fcntl.lockf(lockfd, fcntl.LOCK_UN, 1)
         os.close(lockfd)
 
 
+def create_manifest(config):
+    """
+    Describe all the results in resultdir, even for failed builds, so
+    copr-backend can download them at once.  Never raise an exception.
+    """
+    resultdir = config.get("main", "resultdir")
+    try:
+        write_manifest(resultdir, log)
+    except OSError:
+        log.exception("Unable to create the results manifest")
+
+
 def init(args, config):
     resultdir = config.get("main", "resultdir")
     if os.path.exists(resultdir) and args.drop_resultdir:
@@ -0,0 +1,126 @@
+"""
+Test the builder-local git cache
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+from unittest import mock
+
+from copr_rpmbuild.git_cache import GitReferenceCache
+from copr_rpmbuild.helpers import git_clone
+from . import TestCase
+
+
+def _git(cwd, *args):
+    subprocess.check_output(["git"] + list(args), cwd=cwd,
+                            stderr=subprocess.STDOUT)
+
+
+class TestGitReferenceCache(TestCase):
+    def auto_test_setup(self):
+        self.workdir = tempfile.mkdtemp(prefix="copr-rpmbuild-git-cache-")
+        self.cachedir = os.path.join(self.workdir, "cache")
+        self.origin = os.path.join(self.workdir, "origin")
+        os.makedirs(self.origin)
+        _git(self.origin, "init")
+        _git(self.origin, "config", "user.email", "you@example.com")
+        _git(self.origin, "config", "user.name", "Your Name")
+        self.commit("initial")
+        self.url = "file://" + self.origin
+
+    def auto_test_cleanup(self):
+        shutil.rmtree(self.workdir)
+
+    def commit(self, message):
+        """ Add a new commit into the origin repository """
+        with open(os.path.join(self.origin, "file"), "a") as fd:
+            fd.write(message + "\n")
+        _git(self.origin, "add", "file")
+        _git(self.origin, "commit", "-m", message)
+
+    def stats(self):
+        with open(os.path.join(self.cachedir, "stats.json")) as fd:
+            return json.load(fd)
+
+    def test_from_config(self):
+        assert GitReferenceCache.from_config(self.config) is None
+        self.config.set("main", "git_cache_dir", self.cachedir)
+        self.config.set("main", "git_cache_max_size_mb", "2")
+        cache = GitReferenceCache.from_config(self.config)
+        assert cache.cachedir == self.cachedir
+        assert cache.max_size == 2 * 1024 * 1024
+
+    def test_clone_with_reference(self):
+        cache = GitReferenceCache(self.cachedir)
+        first = os.path.join(self.workdir, "first")
+        git_clone(self.url, first, reference_cache=cache)
+        assert os.path.exists(os.path.join(first, "file"))
+        assert self.stats()["misses"] == 1
+        assert self.stats()["hits"] == 0
+
+        self.commit("second")
+        second = os.path.join(self.workdir, "second")
+        git_clone(self.url, second, reference_cache=cache)
+        with open(os.path.join(second, "file")) as fd:
+            assert fd.read() == "initial\nsecond\n"
+
+        # the clone doesn't depend on the cache
+        assert not os.path.exists(
+            os.path.join(second, ".git", "objects", "info", "alternates"))
+        stats = self.stats()
+        assert stats["hits"] == 1
+        assert stats["bytes_saved"] > 0
+
+    @mock.patch("copr_rpmbuild.helpers.run_cmd")
+    def test_unusable_cache(self, run_cmd):
+        # cachedir can not be created (parent is a regular file)
+        cachefile = os.path.join(self.workdir, "cachefile")
+        open(cachefile, "w").close()
+        cache = GitReferenceCache(os.path.join(cachefile, "cache"))
+        git_clone("clone_url", "/dir", reference_cache=cache)
+        assert run_cmd.call_args_list == [
+            mock.call(['git', 'clone', 'clone_url', '/dir', '--depth', '500',
+                       '--no-single-branch', '--recursive']),
+        ]
+
+    def test_evict(self):
+        _git(self.workdir, "clone", "--bare", self.origin, "origin-b")
+        url_a = self.url
+        url_b = "file://" + os.path.join(self.workdir, "origin-b")
+
+        cache = GitReferenceCache(self.cachedir)
+        for url in [url_a, url_b]:
+            with cache.reference(url) as reference:
+                assert reference == cache.mirror_path(url)
+        mirror_a = cache.mirror_path(url_a)
+        mirror_b = cache.mirror_path(url_b)
+        os.utime(mirror_a, (0, 0))
+
+        cache.max_size = 1
+        with cache._lock(mirror_a):  # pylint: disable=protected-access
+            cache.evict()
+        # "a" was locked, so "b" is removed, even though it is newer
+        assert os.path.exists(mirror_a)
+        assert not os.path.exists(mirror_b)
+
+        cache.evict()
+        assert not os.path.exists(mirror_a)
+
+    def test_evict_best_effort(self):
+        cache = GitReferenceCache(self.cachedir, max_size=1)
+        with cache.reference(self.url) as reference:
+            assert reference == cache.mirror_path(self.url)
+
+        # the mirror vanishes (concurrent eviction) between listdir and stat
+        with mock.patch("copr_rpmbuild.git_cache.os.stat",
+                        side_effect=FileNotFoundError):
+            cache.evict()
+
+        # other errors are just logged, too
+        with mock.patch("copr_rpmbuild.git_cache.os.listdir",
+                        side_effect=PermissionError("denied")):
+            cache.evict()
@@ -1,5 +1,5 @@
 """
-Test the bin/copr-rpmbuild-loggify filter
+Test the bin/copr-rpmbuild-loggify filter, and its in-process counterpart
 """
 
 import os
@@ -7,6 +7,10 @@ import shutil
 import subprocess
 import tempfile
 
+import pytest
+
+from copr_rpmbuild.live_log import LogFilter, LiveLogSink
+
 INPUT = """
 This is \x1b\x5b\x33\x34\x6dblue\x1b\x5b\x30\x6d text
 WIP progress-bar\x0dprogress-bar
@@ -42,3 +46,44 @@ def test_loggify():
 
     assert output == OUTPUT
     shutil.rmtree(tmpdir)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, len(INPUT)])
+def test_log_filter(chunk_size):
+    data = INPUT.encode("utf-8")
+    log_filter = LogFilter()
+    output = b""
+    for start in range(0, len(data), chunk_size):
+        output += log_filter.feed(data[start:start+chunk_size])
+    output += log_filter.flush()
+    assert output.decode("utf-8") == OUTPUT
+
+
+def test_log_filter_incomplete_line():
+    log_filter = LogFilter()
+    assert log_filter.feed(b"10%\r20%") == b""
+    assert log_filter.feed(b"\r100%") == b""
+    assert log_filter.flush() == b"100%"
+
+
+def test_live_log_sink():
+    tmpdir = tempfile.mkdtemp(prefix="copr-rpmbuild-test-live-log-")
+    logfile = os.path.join(tmpdir, "main.log")
+    with open(logfile, "w") as fd:
+        fd.write("existing\n")
+
+    read_fd, write_fd = os.pipe()
+    echo_read_fd, echo_write_fd = os.pipe()
+    os.write(write_fd, INPUT.encode("utf-8") + b"no newline")
+    os.close(write_fd)
+
+    LiveLogSink(read_fd, logfile, echo_fds=[echo_write_fd]).run()
+    os.close(read_fd)
+    os.close(echo_write_fd)
+
+    expected = OUTPUT + "no newline"
+    with open(logfile, "r") as fd:
+        assert fd.read() == "existing\n" + expected
+    assert os.read(echo_read_fd, 4096).decode("utf-8") == expected
+    os.close(echo_read_fd)
+    shutil.rmtree(tmpdir)
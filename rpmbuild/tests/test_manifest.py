@@ -0,0 +1,52 @@
+"""
+Test the resultdir manifest
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from copr_rpmbuild.manifest import generate_manifest, write_manifest
+
+
+class TestManifest:
+    resultdir = None
+
+    def setup_method(self, _method):
+        self.resultdir = tempfile.mkdtemp(prefix="copr-rpmbuild-manifest-")
+        os.makedirs(os.path.join(self.resultdir, "fedora-review"))
+        for relpath, content in [("success", b"done"),
+                                 ("fedora-review/review.txt", b"review")]:
+            with open(os.path.join(self.resultdir, relpath), "wb") as fd:
+                fd.write(content)
+        os.symlink("success", os.path.join(self.resultdir, "link"))
+
+    def teardown_method(self, _method):
+        shutil.rmtree(self.resultdir)
+
+    def test_generate_manifest(self):
+        assert generate_manifest(self.resultdir) == {
+            "version": 1,
+            "files": {
+                "fedora-review/review.txt": {
+                    "size": 6,
+                    "sha256": hashlib.sha256(b"review").hexdigest(),
+                },
+                "success": {
+                    "size": 4,
+                    "sha256": hashlib.sha256(b"done").hexdigest(),
+                },
+            },
+        }
+
+    def test_write_manifest(self):
+        log = logging.getLogger()
+        write_manifest(self.resultdir, log)
+        # re-generating doesn't include the manifest itself
+        write_manifest(self.resultdir, log)
+        with open(os.path.join(self.resultdir, "manifest.json")) as fd:
+            manifest = json.load(fd)
+        assert set(manifest["files"]) == {"success", "fedora-review/review.txt"}
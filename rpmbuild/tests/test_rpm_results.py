@@ -0,0 +1,76 @@
+"""
+Test the results.json generator for RPM builds
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from unittest import mock
+
+from copr_rpmbuild.automation.rpm_results import RPMResults
+from copr_rpmbuild.manifest import generate_manifest
+
+
+def _fake_header(path):
+    name = os.path.basename(path).rsplit("-", 2)[0]
+    return {
+        "name": name,
+        "epoch": None,
+        "version": "1.0",
+        "release": "1.fc40",
+        "arch": "x86_64",
+        "rsaheader": name == "signed",
+    }
+
+
+class TestRPMResults:
+    resultdir = None
+
+    def setup_method(self, _method):
+        self.resultdir = tempfile.mkdtemp(prefix="copr-rpmbuild-rpm-results-")
+        for filename in ["foo-1.0-1.fc40.src.rpm",
+                         "foo-1.0-1.fc40.x86_64.rpm",
+                         "signed-1.0-1.fc40.x86_64.rpm",
+                         "builder-live.log"]:
+            with open(os.path.join(self.resultdir, filename), "w") as fd:
+                fd.write(filename)
+
+    def teardown_method(self, _method):
+        shutil.rmtree(self.resultdir)
+
+    @mock.patch("copr_rpmbuild.automation.rpm_results.SIGNATURE_TAGS",
+                ["RPMTAG_RSAHEADER"])
+    @mock.patch("copr_rpmbuild.automation.rpm_results.rpm")
+    @mock.patch("copr_rpmbuild.automation.rpm_results.get_rpm_header")
+    def test_results_json(self, get_rpm_header, rpm):
+        get_rpm_header.side_effect = _fake_header
+        rpm.RPMTAG_RSAHEADER = "rsaheader"
+        task = {"package_name": "foo", "chroot": "fedora-40-x86_64",
+                "source_type": None}
+        RPMResults(task, self.resultdir, None, logging.getLogger(), None).run()
+
+        with open(os.path.join(self.resultdir, "results.json")) as fd:
+            packages = json.load(fd)["packages"]
+
+        assert [(p["name"], p["arch"], p["signed"]) for p in packages] == [
+            ("foo", "src", False),
+            ("foo", "x86_64", False),
+            ("signed", "x86_64", True),
+        ]
+        filename = "foo-1.0-1.fc40.x86_64.rpm"
+        assert packages[1]["filename"] == filename
+        assert packages[1]["size"] == len(filename)
+        assert packages[1]["sha256"] == \
+            hashlib.sha256(filename.encode("utf-8")).hexdigest()
+
+        # the manifest re-uses the checksums
+        with mock.patch("copr_rpmbuild.manifest.file_checksum") as checksum:
+            checksum.return_value = "computed"
+            manifest = generate_manifest(self.resultdir)
+        assert manifest["files"][filename]["sha256"] == packages[1]["sha256"]
+        assert manifest["files"]["builder-live.log"]["sha256"] == "computed"
+        assert manifest["files"]["results.json"]["sha256"] == "computed"